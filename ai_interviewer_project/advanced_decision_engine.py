@@ -1,6 +1,6 @@
 import numpy as np
 import json
-from textblob import TextBlob
+from sentiment import polarity_batch
 import re
 from datetime import datetime
 
@@ -61,21 +61,21 @@ class AdvancedDecisionEngine:
             return 0.5  # Default neutral score
         
         # Analyze communication patterns
+        texts = [answer.get('answer', '') for answer in interview_answers]
+        texts = [text for text in texts if text]
+        # Sentiment analysis for all answers in one batch
+        sentiments = polarity_batch(texts)
         communication_scores = []
-        for answer in interview_answers:
-            text = answer.get('answer', '')
-            if text:
-                # Sentiment analysis
-                sentiment = TextBlob(text).sentiment.polarity
-                # Length appropriateness (not too short, not too long)
-                length_score = min(len(text.split()) / 30, 1.0)
-                # Professional language detection
-                professional_words = ['collaborate', 'team', 'project', 'develop', 'implement', 'optimize']
-                professional_score = sum(1 for word in professional_words if word.lower() in text.lower()) / len(professional_words)
-                
-                # Combine scores
-                answer_score = (sentiment + 1) / 2 * 0.4 + length_score * 0.3 + professional_score * 0.3
-                communication_scores.append(answer_score)
+        for text, sentiment in zip(texts, sentiments):
+            # Length appropriateness (not too short, not too long)
+            length_score = min(len(text.split()) / 30, 1.0)
+            # Professional language detection
+            professional_words = ['collaborate', 'team', 'project', 'develop', 'implement', 'optimize']
+            professional_score = sum(1 for word in professional_words if word.lower() in text.lower()) / len(professional_words)
+            
+            # Combine scores
+            answer_score = (sentiment + 1) / 2 * 0.4 + length_score * 0.3 + professional_score * 0.3
+            communication_scores.append(answer_score)
         
         return np.mean(communication_scores) if communication_scores else 0.5
     
@@ -1,28 +1,71 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-import pickle
+from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV, RandomizedSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.model_selection import HalvingGridSearchCV
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, brier_score_loss
 import os
 import json
 import re
-from textblob import TextBlob
+import time
+from contextlib import contextmanager
+from joblib import Parallel, delayed
+from resume_pipeline import (
+    ResumeFeatureAssembler, EnsemblePredictor, ENSEMBLE_WEIGHTS, CALIBRATION_METHODS,
+    PIPELINE_FILENAME, build_pipeline, non_negative, save_pipeline
+)
 import warnings
 warnings.filterwarnings('ignore')
 
+SEARCH_MODES = ('grid', 'halving', 'random')
+
+def _fit_member(name, model, X_train, y_train, X_test):
+    """Fit one ensemble member (runs in a worker process)"""
+    start = time.perf_counter()
+    if name == 'naive_bayes':
+        # Naive Bayes works better with non-negative features
+        model.fit(non_negative(X_train), y_train)
+        y_pred = model.predict(non_negative(X_test))
+    else:
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+    return name, model, y_pred, time.perf_counter() - start
+
 class EnhancedResumeTrainer:
-    def __init__(self):
+    def __init__(self, dtype=np.float64, n_jobs=-1, search='grid', calibration='none'):
+        # float32 halves feature memory; float64 reproduces the original numbers
+        self.dtype = np.dtype(dtype)
+        # Worker processes for ensemble fitting and search folds (-1 = all cores)
+        self.n_jobs = n_jobs
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search}")
+        self.search = search
+        # 'sigmoid'/'isotonic' hold out part of the training split to
+        # calibrate the ensemble probabilities; 'none' trains on all of it
+        if calibration != 'none' and calibration not in CALIBRATION_METHODS:
+            raise ValueError(f"Unknown calibration method: {calibration}")
+        self.calibration = calibration
+        self.stage_times = {}
         self.models = {}
-        self.vectorizers = {}
-        self.scalers = {}
-        self.label_encoders = {}
+        self.features = None
+        self.ensemble = None
         self.feature_importance = {}
-        
+        self.ensemble_accuracy = None
+        self.tuned_params = None
+        
+    @contextmanager
+    def _stage(self, name):
+        """Record the wall-clock time of a pipeline stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[name] = round(time.perf_counter() - start, 3)
+            print(f"⏱️  {name}: {self.stage_times[name]:.2f}s")
+    
     def create_sample_dataset(self, num_samples=1000):
         """Create a comprehensive sample dataset for demonstration"""
         print("🔄 Creating enhanced sample dataset...")
@@ -101,7 +144,7 @@ class EnhancedResumeTrainer:
         return list(set(skills))[:8]
     
     def load_and_preprocess_data(self, filepath='data/enhanced_resumes.csv'):
-        """Load and preprocess the enhanced dataset"""
+        """Load the enhanced dataset (derived columns are added by the feature pipeline)"""
         print("🔄 Loading and preprocessing data...")
         
         if not os.path.exists(filepath):
@@ -110,67 +153,20 @@ class EnhancedResumeTrainer:
         else:
             df = pd.read_csv(filepath)
         
-        # Text preprocessing
-        df['resume_text_clean'] = df['resume_text'].apply(self._clean_text)
-        
-        # Feature engineering
-        df['text_length'] = df['resume_text'].str.len()
-        df['word_count'] = df['resume_text'].str.split().str.len()
-        df['skill_diversity'] = df['technical_skills'].apply(lambda x: len(x) if isinstance(x, list) else 0)
-        
-        # Sentiment analysis
-        df['sentiment_score'] = df['resume_text'].apply(lambda x: TextBlob(x).sentiment.polarity)
-        
-        print(f"✅ Loaded {len(df)} resumes with {len(df.columns)} features")
+        print(f"✅ Loaded {len(df)} resumes with {len(df.columns)} columns")
         return df
     
-    def _clean_text(self, text):
-        """Clean and normalize text"""
-        if pd.isna(text):
-            return ""
-        text = str(text).lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    
     def create_advanced_features(self, df):
         """Create advanced features for ML models"""
         print("🔧 Creating advanced features...")
         
-        # TF-IDF for resume text
-        tfidf = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 2))
-        tfidf_features = tfidf.fit_transform(df['resume_text_clean'])
-        self.vectorizers['tfidf'] = tfidf
-        
-        # Numerical features
-        numerical_features = [
-            'years_experience', 'project_count', 'certification_count',
-            'github_projects', 'text_length', 'word_count', 'skill_diversity',
-            'sentiment_score'
-        ]
+        # Cleaning, derived columns, TF-IDF, label encoding and scaling are
+        # fitted in one transformer that is shipped with the ensemble
+        self.features = ResumeFeatureAssembler(max_features=1000, dtype=self.dtype)
+        X_combined = self.features.fit_transform(df)
         
-        # Categorical features
-        categorical_features = ['industry', 'experience_level', 'education_level', 'location']
-        
-        # Encode categorical variables
-        for feature in categorical_features:
-            le = LabelEncoder()
-            df[f'{feature}_encoded'] = le.fit_transform(df[feature].astype(str))
-            self.label_encoders[feature] = le
-        
-        # Combine all features
-        numerical_data = df[numerical_features].values
-        categorical_data = df[[f'{f}_encoded' for f in categorical_features]].values
-        
-        # Scale numerical features
-        scaler = StandardScaler()
-        numerical_scaled = scaler.fit_transform(numerical_data)
-        self.scalers['numerical'] = scaler
-        
-        # Combine features
-        X_combined = np.hstack([tfidf_features.toarray(), numerical_scaled, categorical_data])
-        
-        print(f"✅ Created feature matrix with shape: {X_combined.shape}")
+        print(f"✅ Created sparse feature matrix with shape: {X_combined.shape} "
+              f"({X_combined.nnz} non-zeros, {X_combined.dtype})")
         return X_combined
     
     def train_ensemble_models(self, X, y):
@@ -179,6 +175,8 @@ class EnhancedResumeTrainer:
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if self.calibration != 'none':
+            X_train, X_cal, y_train, y_cal = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
         
         # Define models
         models = {
@@ -188,58 +186,51 @@ class EnhancedResumeTrainer:
             'logistic_regression': LogisticRegression(random_state=42, max_iter=1000)
         }
         
-        # Train each model
-        for name, model in models.items():
-            print(f"🔄 Training {name}...")
-            
-            if name == 'naive_bayes':
-                # Naive Bayes works better with non-negative features
-                X_train_nb = X_train.copy()
-                X_train_nb[X_train_nb < 0] = 0
-                X_test_nb = X_test.copy()
-                X_test_nb[X_test_nb < 0] = 0
-                
-                model.fit(X_train_nb, y_train)
-                y_pred = model.predict(X_test_nb)
-            else:
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-            
+        # Fit the members concurrently, one worker process per model
+        print(f"🔄 Training {', '.join(models)} (n_jobs={self.n_jobs})...")
+        results = Parallel(n_jobs=min(len(models), self._effective_jobs()))(
+            delayed(_fit_member)(name, model, X_train, y_train, X_test)
+            for name, model in models.items()
+        )
+        
+        for name, model, y_pred, fit_seconds in results:
             # Evaluate model
             accuracy = accuracy_score(y_test, y_pred)
-            print(f"   {name} accuracy: {accuracy:.4f}")
+            print(f"   {name} accuracy: {accuracy:.4f} ({fit_seconds:.2f}s)")
+            self.stage_times[f'fit_{name}'] = round(fit_seconds, 3)
             
             # Store model and feature importance
             self.models[name] = model
             if hasattr(model, 'feature_importances_'):
                 self.feature_importance[name] = model.feature_importances_
         
+        self.ensemble = EnsemblePredictor(
+            {name: model for name, model in self.models.items() if name in ENSEMBLE_WEIGHTS},
+            weights=ENSEMBLE_WEIGHTS
+        )
+        if self.calibration != 'none':
+            raw_brier = brier_score_loss(y_test, self.ensemble.raw_proba(X_test)[:, 1], pos_label=True)
+            self.ensemble.calibrate(X_cal, y_cal, method=self.calibration)
+            calibrated_brier = brier_score_loss(y_test, self.ensemble.predict_proba(X_test)[:, 1], pos_label=True)
+            print(f"📐 Calibrated ensemble ({self.calibration}, {X_cal.shape[0]} rows): "
+                  f"Brier score {raw_brier:.4f} -> {calibrated_brier:.4f}")
+        
         # Create ensemble prediction
         ensemble_pred = self._ensemble_predict(X_test)
         ensemble_accuracy = accuracy_score(y_test, ensemble_pred)
         print(f"🎯 Ensemble accuracy: {ensemble_accuracy:.4f}")
+        self.ensemble_accuracy = ensemble_accuracy
         
         return X_test, y_test
     
+    def _effective_jobs(self):
+        if self.n_jobs is None or self.n_jobs < 0:
+            return os.cpu_count() or 1
+        return max(self.n_jobs, 1)
+    
     def _ensemble_predict(self, X):
-        """Make ensemble predictions"""
-        predictions = []
-        weights = {'naive_bayes': 0.2, 'random_forest': 0.3, 'gradient_boosting': 0.3, 'logistic_regression': 0.2}
-        
-        for name, model in self.models.items():
-            # Skip tuned models in ensemble prediction
-            if name == 'random_forest_tuned':
-                continue
-                
-            if name == 'naive_bayes':
-                X_nb = X.copy()
-                X_nb[X_nb < 0] = 0
-                pred = model.predict_proba(X_nb)[:, 1]
-            else:
-                pred = model.predict_proba(X)[:, 1]
-            predictions.append(pred * weights[name])
-        
-        ensemble_pred = np.sum(predictions, axis=0)
+        """Make ensemble predictions (tuned model excluded)"""
+        ensemble_pred = self.ensemble.predict_proba(X)[:, 1]
         return (ensemble_pred > 0.5).astype(int)
     
     def hyperparameter_tuning(self, X, y):
@@ -253,40 +244,50 @@ class EnhancedResumeTrainer:
             'min_samples_split': [2, 5, 10]
         }
         
-        rf_grid = GridSearchCV(RandomForestClassifier(random_state=42), rf_params, cv=5, scoring='accuracy')
+        # Folds/candidates run in parallel; 'halving' discards weak candidates
+        # on small samples first and 'random' tries a fixed number of them
+        estimator = RandomForestClassifier(random_state=42)
+        if self.search == 'halving':
+            rf_grid = HalvingGridSearchCV(estimator, rf_params, cv=5, scoring='accuracy',
+                                          factor=3, random_state=42, n_jobs=self.n_jobs)
+        elif self.search == 'random':
+            rf_grid = RandomizedSearchCV(estimator, rf_params, n_iter=10, cv=5, scoring='accuracy',
+                                         random_state=42, n_jobs=self.n_jobs)
+        else:
+            rf_grid = GridSearchCV(estimator, rf_params, cv=5, scoring='accuracy', n_jobs=self.n_jobs)
         rf_grid.fit(X, y)
         
-        print(f"✅ Best Random Forest params: {rf_grid.best_params_}")
+        print(f"✅ Best Random Forest params ({self.search} search): {rf_grid.best_params_}")
         print(f"   Best score: {rf_grid.best_score_:.4f}")
         
         # Update with best model
         self.models['random_forest_tuned'] = rf_grid.best_estimator_
+        self.tuned_params = rf_grid.best_params_
     
-    def save_models(self):
-        """Save all trained models and preprocessing objects"""
-        print("💾 Saving models and preprocessing objects...")
+    def save_models(self, compress=0):
+        """Save the feature pipeline and ensemble as one versioned artifact
+
+        ``compress=0`` keeps the arrays memory-mappable for serving; a joblib
+        compression level (e.g. 3) gives a smaller file that is fully loaded
+        into each process instead.
+        """
+        print("💾 Saving resume pipeline...")
         
         os.makedirs("model", exist_ok=True)
         
-        # Save models
-        for name, model in self.models.items():
-            with open(f"model/{name}.pkl", "wb") as f:
-                pickle.dump(model, f)
-        
-        # Save vectorizers
-        for name, vectorizer in self.vectorizers.items():
-            with open(f"model/{name}.pkl", "wb") as f:
-                pickle.dump(vectorizer, f)
-        
-        # Save scalers
-        for name, scaler in self.scalers.items():
-            with open(f"model/{name}.pkl", "wb") as f:
-                pickle.dump(scaler, f)
-        
-        # Save label encoders
-        for name, encoder in self.label_encoders.items():
-            with open(f"model/{name}_encoder.pkl", "wb") as f:
-                pickle.dump(encoder, f)
+        pipeline = build_pipeline(self.features, self.ensemble)
+        path = os.path.join("model", PIPELINE_FILENAME)
+        save_pipeline(pipeline, path, metadata={
+            'members': list(pipeline.named_steps['ensemble'].estimators),
+            'weights': ENSEMBLE_WEIGHTS,
+            'n_features': self.features.n_features_out_,
+            'dtype': self.dtype.name,
+            'calibration': self.calibration,
+            'ensemble_accuracy': self.ensemble_accuracy,
+            'random_forest_tuned_params': self.tuned_params,
+            'stage_times': dict(self.stage_times)
+        }, compress=compress)
+        print(f"   {path}: {os.path.getsize(path) / 1024:.0f} KB (compress={compress})")
         
         # Save feature importance
         with open("model/feature_importance.json", "w") as f:
@@ -300,12 +301,13 @@ class EnhancedResumeTrainer:
         
         report = {
             'dataset_info': {
-                'total_samples': len(X_test) * 5,  # Approximate total
+                'total_samples': X_test.shape[0] * 5,  # Approximate total
                 'features': X_test.shape[1],
-                'test_samples': len(X_test)
+                'test_samples': X_test.shape[0]
             },
             'model_performance': {},
-            'ensemble_performance': {}
+            'ensemble_performance': {},
+            'stage_times': self.stage_times
         }
         
         # Individual model performance
@@ -314,9 +316,7 @@ class EnhancedResumeTrainer:
                 continue
                 
             if name == 'naive_bayes':
-                X_test_nb = X_test.copy()
-                X_test_nb[X_test_nb < 0] = 0
-                y_pred = model.predict(X_test_nb)
+                y_pred = model.predict(non_negative(X_test))
             else:
                 y_pred = model.predict(X_test)
             
@@ -331,6 +331,8 @@ class EnhancedResumeTrainer:
         ensemble_accuracy = accuracy_score(y_test, ensemble_pred)
         report['ensemble_performance'] = {
             'accuracy': ensemble_accuracy,
+            'brier_score': brier_score_loss(y_test, self.ensemble.predict_proba(X_test)[:, 1], pos_label=True),
+            'calibration': self.calibration,
             'classification_report': classification_report(y_test, ensemble_pred, output_dict=True)
         }
         
@@ -345,31 +347,43 @@ def main():
     """Main training pipeline"""
     print("🚀 Starting Enhanced Resume Training Pipeline...")
     
-    # Initialize trainer
-    trainer = EnhancedResumeTrainer()
+    # Initialize trainer (TRAINING_DTYPE=float32 halves feature memory,
+    # TRAINING_N_JOBS sets worker processes, TRAINING_SEARCH=grid|halving|random,
+    # TRAINING_CALIBRATION=none|sigmoid|isotonic)
+    trainer = EnhancedResumeTrainer(
+        dtype=os.environ.get('TRAINING_DTYPE', 'float64'),
+        n_jobs=int(os.environ.get('TRAINING_N_JOBS', -1)),
+        search=os.environ.get('TRAINING_SEARCH', 'grid'),
+        calibration=os.environ.get('TRAINING_CALIBRATION', 'none')
+    )
     
     # Load and preprocess data
-    df = trainer.load_and_preprocess_data()
+    with trainer._stage('load_data'):
+        df = trainer.load_and_preprocess_data()
     
     # Create advanced features
-    X = trainer.create_advanced_features(df)
+    with trainer._stage('features'):
+        X = trainer.create_advanced_features(df)
     y = df['selected'].values
     
     # Train models
-    X_test, y_test = trainer.train_ensemble_models(X, y)
+    with trainer._stage('train_ensemble'):
+        X_test, y_test = trainer.train_ensemble_models(X, y)
     
     # Hyperparameter tuning
-    trainer.hyperparameter_tuning(X, y)
+    with trainer._stage('hyperparameter_tuning'):
+        trainer.hyperparameter_tuning(X, y)
     
     # Save models
-    trainer.save_models()
+    with trainer._stage('save_models'):
+        trainer.save_models(compress=int(os.environ.get('PIPELINE_COMPRESS', 0)))
     
     # Generate report
     report = trainer.generate_training_report(X_test, y_test)
     
     print("\n🎉 Enhanced Training Pipeline Complete!")
     print(f"📊 Final Ensemble Accuracy: {report['ensemble_performance']['accuracy']:.4f}")
-    print("💾 Models saved in 'model/' directory")
+    print(f"💾 Pipeline saved as 'model/{PIPELINE_FILENAME}'")
     print("📋 Training report saved as 'model/training_report.json'")
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
+import os
 import PyPDF2
 
-def extract_text_from_pdf(file_path):
+MAX_PDF_BYTES = 10 * 1024 * 1024
+MAX_PDF_PAGES = 50
+
+def extract_text_from_pdf(file_path, max_pages=MAX_PDF_PAGES, max_bytes=MAX_PDF_BYTES):
+    if os.path.getsize(file_path) > max_bytes:
+        raise ValueError(f"PDF exceeds {max_bytes} bytes")
     with open(file_path, "rb") as f:
         reader = PyPDF2.PdfReader(f)
-        text = ''
-        for page in reader.pages:
-            text += page.extract_text()
-        return text
+        if len(reader.pages) > max_pages:
+            raise ValueError(f"PDF has {len(reader.pages)} pages (limit {max_pages})")
+        return ''.join(page.extract_text() or '' for page in reader.pages)
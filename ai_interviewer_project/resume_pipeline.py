@@ -0,0 +1,314 @@
+"""
+Resume selection pipeline shared by training and serving.
+
+Feature assembly (text cleaning, derived columns, TF-IDF, label encoding,
+scaling) and the weighted, optionally calibrated ensemble are fitted by enhanced_training.py and
+saved together as one joblib artifact (model/resume_pipeline.joblib). The
+backend loads that file and calls ``predict_proba`` on raw resume records, so
+serving applies exactly the transforms fitted at training time. The role
+classifier (train_resume_model.py) is saved the same way, as a TF-IDF +
+classifier Pipeline in model/role_pipeline.joblib.
+
+The artifact is written uncompressed by default so numpy arrays can be
+memory-mapped on load (``mmap_mode='r'``): the pages live in the OS page cache
+and are shared by every worker process. A compressed artifact is smaller on
+disk but has to be fully decompressed into each process.
+"""
+import os
+import re
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+from sklearn.base import BaseEstimator, ClassifierMixin, TransformerMixin
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+from sentiment import polarity_batch
+
+FORMAT_VERSION = 2
+PIPELINE_FILENAME = 'resume_pipeline.joblib'
+# TF-IDF + role classifier from train_resume_model.py, saved the same way
+ROLE_PIPELINE_FILENAME = 'role_pipeline.joblib'
+
+NUMERICAL_FEATURES = [
+    'years_experience', 'project_count', 'certification_count',
+    'github_projects', 'text_length', 'word_count', 'skill_diversity',
+    'sentiment_score'
+]
+CATEGORICAL_FEATURES = ['industry', 'experience_level', 'education_level', 'location']
+# Used at fit time for columns the training records don't have at all
+MISSING_CATEGORY = 'unknown'
+MISSING_NUMBER = 0.0
+ENSEMBLE_WEIGHTS = {'naive_bayes': 0.2, 'random_forest': 0.3, 'gradient_boosting': 0.3, 'logistic_regression': 0.2}
+# Members that need non-negative features
+NON_NEGATIVE_MEMBERS = {'naive_bayes'}
+CALIBRATION_METHODS = ('sigmoid', 'isotonic')
+
+
+def non_negative(X):
+    """Copy of ``X`` with negative entries clipped to 0 (for Naive Bayes)"""
+    if sparse.issparse(X):
+        X = X.copy()
+        np.maximum(X.data, 0, out=X.data)
+        X.eliminate_zeros()
+        return X
+    return np.maximum(X, 0)
+
+
+def non_negative_view(X):
+    """``X`` with negative entries clipped to 0, for Naive Bayes at prediction time
+
+    Unlike non_negative this does not copy the sparse structure: only the data
+    array is clipped into a new buffer and indices/indptr are shared with
+    ``X``, so the result must be treated as read-only. Returns ``X`` itself
+    when it has no negative entries.
+    """
+    if sparse.issparse(X):
+        X = X.tocsr()
+        if not X.data.size or X.data.min() >= 0:
+            return X
+        return sparse.csr_matrix((np.maximum(X.data, 0), X.indices, X.indptr), shape=X.shape, copy=False)
+    return np.maximum(X, 0)
+
+
+def _log_odds(p):
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    return np.log(p / (1 - p))
+
+
+def clean_text(text):
+    """Clean and normalize text"""
+    if pd.isna(text):
+        return ""
+    text = str(text).lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def derive_columns(df):
+    """Copy of ``df`` with the columns computed from the raw resume fields"""
+    df = df.copy()
+    text = df['resume_text'] if 'resume_text' in df else pd.Series('', index=df.index)
+    df['resume_text_clean'] = text.apply(clean_text)
+    df['text_length'] = text.str.len()
+    df['word_count'] = text.str.split().str.len()
+    skills = df['technical_skills'] if 'technical_skills' in df else pd.Series(None, index=df.index, dtype=object)
+    df['skill_diversity'] = skills.apply(lambda x: len(x) if isinstance(x, list) else 0)
+    # Batched; repeated texts are scored once
+    df['sentiment_score'] = polarity_batch(text.tolist())
+    return df
+
+
+class ResumeFeatureAssembler(BaseEstimator, TransformerMixin):
+    """Raw resume records -> sparse matrix of TF-IDF | scaled numbers | category codes
+
+    Columns missing at prediction time (the API only has the resume text) are
+    filled with the training median or most frequent category; unseen
+    categories map to the most frequent one. Columns missing from the training
+    records altogether (e.g. retraining data with only resume text) are fitted
+    as one constant value, so the model learns from the columns it has.
+    """
+
+    def __init__(self, max_features=1000, dtype=np.float64):
+        self.max_features = max_features
+        self.dtype = dtype
+
+    def fit(self, df, y=None):
+        self.fit_transform(df, y)
+        return self
+
+    def fit_transform(self, df, y=None):
+        missing = [feature for feature in CATEGORICAL_FEATURES + NUMERICAL_FEATURES if feature not in df]
+        if missing:
+            df = df.copy()
+            for feature in missing:
+                df[feature] = MISSING_CATEGORY if feature in CATEGORICAL_FEATURES else MISSING_NUMBER
+        df = derive_columns(df)
+        dtype = np.dtype(self.dtype)
+
+        self.tfidf_ = TfidfVectorizer(max_features=self.max_features, stop_words='english',
+                                      ngram_range=(1, 2), dtype=dtype)
+        tfidf_features = self.tfidf_.fit_transform(df['resume_text_clean'])
+
+        self.fill_values_ = {feature: float(df[feature].median()) for feature in NUMERICAL_FEATURES}
+        self.label_encoders_ = {}
+        for feature in CATEGORICAL_FEATURES:
+            values = df[feature].astype(str)
+            self.label_encoders_[feature] = LabelEncoder().fit(values)
+            self.fill_values_[feature] = values.mode().iloc[0]
+        self._build_code_maps()
+
+        self.scaler_ = StandardScaler()
+        numerical_scaled = self.scaler_.fit_transform(df[NUMERICAL_FEATURES].values)
+        X = self._combine(tfidf_features, numerical_scaled, self._encode(df), dtype)
+        self.n_features_out_ = X.shape[1]
+        return X
+
+    def transform(self, df):
+        df = derive_columns(self._fill_missing(df))
+        dtype = np.dtype(self.dtype)
+        tfidf_features = self.tfidf_.transform(df['resume_text_clean'])
+        numerical = df[NUMERICAL_FEATURES].astype(float).fillna(self.fill_values_)
+        numerical_scaled = self.scaler_.transform(numerical.values)
+        return self._combine(tfidf_features, numerical_scaled, self._encode(df), dtype)
+
+    def _build_code_maps(self):
+        self.codes_ = {
+            feature: {value: code for code, value in enumerate(encoder.classes_)}
+            for feature, encoder in self.label_encoders_.items()
+        }
+
+    def _fill_missing(self, df):
+        df = df.copy()
+        for feature in CATEGORICAL_FEATURES + NUMERICAL_FEATURES:
+            if feature not in df:
+                df[feature] = self.fill_values_[feature]
+        return df
+
+    def _encode(self, df):
+        columns = []
+        for feature in CATEGORICAL_FEATURES:
+            codes = self.codes_[feature]
+            default = codes[self.fill_values_[feature]]
+            columns.append(df[feature].astype(str).map(codes).fillna(default).to_numpy())
+        return np.column_stack(columns)
+
+    def _combine(self, tfidf_features, numerical_scaled, categorical_data, dtype):
+        # Keep the TF-IDF block sparse, so memory scales with the number of
+        # non-zeros rather than rows x vocabulary
+        return sparse.hstack([
+            tfidf_features,
+            sparse.csr_matrix(numerical_scaled.astype(dtype, copy=False)),
+            sparse.csr_matrix(categorical_data.astype(dtype, copy=False))
+        ], format='csr', dtype=dtype)
+
+
+class EnsemblePredictor(BaseEstimator, ClassifierMixin):
+    """Weighted soft vote of fitted members, optionally calibrated
+
+    Member probabilities are written into one preallocated
+    (members, rows, classes) array and combined with a single weighted sum.
+    Naive Bayes members get a non-negative view of the batch that is built
+    once per call and shares the sparse index arrays with the input.
+    """
+
+    def __init__(self, estimators, weights=None):
+        self.estimators = estimators
+        self.weights = weights
+
+    def fit(self, X, y):
+        for name, model in self.estimators.items():
+            model.fit(non_negative(X) if name in NON_NEGATIVE_MEMBERS else X, y)
+        return self
+
+    @property
+    def classes_(self):
+        return next(iter(self.estimators.values())).classes_
+
+    def __sklearn_is_fitted__(self):
+        return all(hasattr(model, 'classes_') for model in self.estimators.values())
+
+    def _weight_vector(self):
+        weights = self.weights or ENSEMBLE_WEIGHTS
+        return np.array([weights[name] for name in self.estimators], dtype=np.float64)
+
+    def member_proba(self, X):
+        """Stacked member probabilities, shape (members, rows, classes)"""
+        stack = np.empty((len(self.estimators), X.shape[0], len(self.classes_)), dtype=np.float64)
+        X_non_negative = None
+        for i, (name, model) in enumerate(self.estimators.items()):
+            if name in NON_NEGATIVE_MEMBERS:
+                if X_non_negative is None:
+                    X_non_negative = non_negative_view(X)
+                stack[i] = model.predict_proba(X_non_negative)
+            else:
+                stack[i] = model.predict_proba(X)
+        return stack
+
+    def raw_proba(self, X):
+        """Weighted ensemble probabilities before calibration"""
+        return np.tensordot(self._weight_vector(), self.member_proba(X), axes=1)
+
+    def predict_proba(self, X):
+        proba = self.raw_proba(X)
+        if getattr(self, 'calibrator_', None) is not None:
+            proba[:, 1] = self._calibrate_positive(proba[:, 1])
+            proba[:, 0] = 1.0 - proba[:, 1]
+        return proba
+
+    def predict(self, X):
+        # Ties go to the first class, matching "positive probability > 0.5"
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def calibrate(self, X, y, method='sigmoid'):
+        """Fit a map from the raw positive-class probability to observed outcomes
+
+        ``X``/``y`` must be held out from member training. 'sigmoid' is Platt
+        scaling on the log-odds; 'isotonic' needs more data but no shape
+        assumption. Binary targets only.
+        """
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(f"Unknown calibration method: {method}")
+        if len(self.classes_) != 2:
+            raise ValueError("Calibration is only supported for binary targets")
+
+        scores = self.raw_proba(X)[:, 1]
+        outcomes = (np.asarray(y) == self.classes_[1]).astype(int)
+        if method == 'isotonic':
+            calibrator = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+            calibrator.fit(scores, outcomes)
+        else:
+            calibrator = LogisticRegression(C=1e6)
+            calibrator.fit(_log_odds(scores).reshape(-1, 1), outcomes)
+        self.calibrator_ = calibrator
+        self.calibration_ = method
+        return self
+
+    def _calibrate_positive(self, positive):
+        if self.calibration_ == 'isotonic':
+            return self.calibrator_.predict(positive)
+        return self.calibrator_.predict_proba(_log_odds(positive).reshape(-1, 1))[:, 1]
+
+
+def build_pipeline(features, ensemble):
+    """Chain a fitted feature assembler and ensemble into one Pipeline"""
+    return Pipeline([('features', features), ('ensemble', ensemble)])
+
+
+def save_pipeline(pipeline, path, metadata=None, compress=0):
+    """Write the versioned artifact atomically
+
+    ``compress=0`` keeps arrays memory-mappable; the file is written next to
+    the target and renamed over it so readers never see a partial file and
+    processes that mapped the old version keep a valid mapping.
+    """
+    artifact = {
+        'format_version': FORMAT_VERSION,
+        'metadata': dict(
+            metadata or {},
+            created_at=time.time(),
+            sklearn_version=sklearn.__version__,
+            numpy_version=np.__version__
+        ),
+        'pipeline': pipeline
+    }
+    tmp_path = f"{path}.tmp"
+    joblib.dump(artifact, tmp_path, compress=compress)
+    os.replace(tmp_path, path)
+    return artifact
+
+
+def load_pipeline(path, mmap_mode='r'):
+    """Load an artifact written by save_pipeline"""
+    artifact = joblib.load(path, mmap_mode=mmap_mode)
+    if not isinstance(artifact, dict) or artifact.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported resume pipeline artifact: {path}")
+    return artifact
@@ -0,0 +1,330 @@
+"""
+Sentiment polarity compatible with TextBlob, without TextBlob.
+
+TextBlob's default PatternAnalyzer scores a string by tokenizing it and
+averaging the polarity of the words found in pattern's en-sentiment.xml
+lexicon, with adverb modifiers ("very good"), negations ("not good") and
+emoticons. This module replays exactly that algorithm, but:
+
+* the lexicon is compiled once into a flat ``{word: (polarity,
+  subjectivity, intensity, is_modifier)}`` dict (the part-of-speech averaging
+  and the "-ly" adverb expansion are done up front),
+* importing it does not import textblob/nltk (a ~2 s import), and
+* ``polarity_batch`` scores a list of texts, deduplicating repeats, into a
+  numpy array.
+
+Results match ``TextBlob(text).sentiment.polarity`` to within
+``POLARITY_TOLERANCE``: the same floating point operations run in the same
+order, and over the training CSVs plus a few thousand generated texts the
+values were identical. The one known divergence is emoticons typed with
+inner spaces (": o )"), where TextBlob's own regex alternation order -- and
+so its result -- depends on string hash seeding; here the order is fixed.
+
+The lexicon is read from the installed textblob package data (or from
+SENTIMENT_LEXICON_PATH); only the file is used, not the library.
+"""
+import os
+import re
+import threading
+import importlib.util
+from xml.etree import ElementTree
+
+import numpy as np
+
+# Documented maximum absolute difference from TextBlob's polarity
+POLARITY_TOLERANCE = 1e-9
+
+NEGATIONS = ("no", "not", "n't", "never")
+
+# --- Tokenizer (pattern's find_tokens) ---------------------------------------
+
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+# Periods are handled separately from the other punctuation
+PUNCTUATION_NO_PERIOD = tuple(PUNCTUATION.replace(".", ""))
+PUNCTUATION_ALL = PUNCTUATION_NO_PERIOD + (".",)
+# Tokens that neither start nor end with one of these need no splitting
+LEADING_CHARS = frozenset(PUNCTUATION_NO_PERIOD)
+TRAILING_CHARS = frozenset(PUNCTUATION_ALL)
+
+ABBREVIATIONS = frozenset((
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/",
+))
+RE_ABBR1 = re.compile(r"^[A-Za-z]\.$")
+RE_ABBR2 = re.compile(r"^([A-Za-z]\.)+$")
+RE_ABBR3 = re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+
+# Contractions, applied in this order
+REPLACEMENTS = (
+    ("'d", " 'd"), ("'m", " 'm"), ("'s", " 's"), ("'ll", " 'll"),
+    ("'re", " 're"), ("'ve", " 've"), ("n't", " n't"),
+)
+REPLACEMENT_KEYS = frozenset(a for a, _ in REPLACEMENTS)
+
+EOS = "END-OF-SENTENCE"
+SENTENCE_END = ("...", ".", "!", "?", EOS)
+SENTENCE_TRAIL = ("'", '"', "”", "’", "...", ".", "!", "?", ")", EOS)
+
+RE_LINEBREAK = re.compile(r"\n{2,}")
+RE_WHITESPACE = re.compile(r"\s+")
+
+# (polarity, emoticons) for each facial expression
+EMOTICONS = (
+    (+1.00, ("<3", "♥")),
+    (+1.00, (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D")),
+    (+0.75, (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)")),
+    (+0.50, (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)")),
+    (+0.25, (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)")),
+    (+0.05, (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°")),
+    (-0.25, (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>")),
+    (-0.75, (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/")),
+    (-1.00, (":'(", ":'''(", ";'(")),
+)
+RE_EMOTICONS = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(re.escape(ch) for ch in e) for _, group in EMOTICONS for e in group
+))
+RE_SARCASM = re.compile(r"\( ?\! ?\)")
+
+# Lowercased emoticon -> polarity; the first expression listing it wins
+EMOTICON_POLARITY = {}
+for _polarity, _group in EMOTICONS:
+    for _e in _group:
+        EMOTICON_POLARITY.setdefault(_e.lower(), _polarity)
+
+
+def _split_token(t, tokens):
+    tail = []
+    while t.startswith(PUNCTUATION_NO_PERIOD) and t not in REPLACEMENT_KEYS:
+        # Split leading punctuation
+        tokens.append(t[0])
+        t = t[1:]
+    while t.endswith(PUNCTUATION_ALL) and t not in REPLACEMENT_KEYS:
+        # Split trailing punctuation
+        if t.endswith(PUNCTUATION_NO_PERIOD):
+            tail.append(t[-1])
+            t = t[:-1]
+        # Split ellipsis (...) before splitting period
+        if t.endswith("..."):
+            tail.append("...")
+            t = t[:-3].rstrip(".")
+        # Split period (if not an abbreviation)
+        if t.endswith("."):
+            if (t in ABBREVIATIONS or RE_ABBR1.match(t) is not None
+                    or RE_ABBR2.match(t) is not None or RE_ABBR3.match(t) is not None):
+                break
+            tail.append(t[-1])
+            t = t[:-1]
+    if t != "":
+        tokens.append(t)
+    tokens.extend(reversed(tail))
+
+
+def find_tokens(string):
+    """Split ``string`` into sentences of space-separated tokens, as pattern does"""
+    for a, b in REPLACEMENTS:
+        string = string.replace(a, b)
+    string = (string.replace("“", " “ ").replace("”", " ” ")
+              .replace("‘", " ‘ ").replace("’", " ’ ")
+              .replace("'", " ' ").replace('"', ' " '))
+    string = string.replace("\r\n", "\n")
+    string = RE_LINEBREAK.sub(" %s " % EOS, string)
+    string = RE_WHITESPACE.sub(" ", string)
+
+    tokens = []
+    for t in string.split(" "):
+        if t:
+            if t[0] in LEADING_CHARS or t[-1] in TRAILING_CHARS:
+                _split_token(t, tokens)
+            else:
+                tokens.append(t)
+
+    sentences, i, j = [[]], 0, 0
+    while j < len(tokens):
+        if tokens[j] in SENTENCE_END:
+            # Citations, trailing parenthesis, repeated punctuation (!?)
+            while j < len(tokens) and tokens[j] in SENTENCE_TRAIL:
+                if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                    break  # Balanced quotes
+                j += 1
+            sentences[-1].extend(t for t in tokens[i:j] if t != EOS)
+            sentences.append([])
+            i = j
+        j += 1
+    sentences[-1].extend(tokens[i:j])
+
+    result = []
+    for s in sentences:
+        if s:
+            s = RE_SARCASM.sub("(!)", " ".join(s))
+            result.append(RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), s))
+    return result
+
+
+# --- Lexicon ------------------------------------------------------------------
+
+def _avg(values):
+    return sum(values) / float(len(values) or 1)
+
+
+def default_lexicon_path():
+    """en-sentiment.xml from SENTIMENT_LEXICON_PATH or the installed textblob package"""
+    path = os.environ.get('SENTIMENT_LEXICON_PATH')
+    if path:
+        return path
+    # Locate the package data without importing textblob (and nltk)
+    spec = importlib.util.find_spec('textblob')
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError("en-sentiment.xml not found: install textblob or set SENTIMENT_LEXICON_PATH")
+    return os.path.join(list(spec.submodule_search_locations)[0], 'en', 'en-sentiment.xml')
+
+
+def compile_lexicon(path=None):
+    """Compile en-sentiment.xml into ``{word: (polarity, subjectivity, intensity, is_modifier)}``
+
+    Scores are averaged per part-of-speech and then across parts of speech,
+    and every adjective gets an "-ly" adverb entry, exactly as pattern's
+    English Sentiment.load does; only the tag-independent averages are kept
+    because plain text is scored without part-of-speech tags.
+    """
+    words = {}
+    for w in ElementTree.parse(path or default_lexicon_path()).getroot().findall("word"):
+        form = w.attrib.get("form")
+        if form:
+            psi = (
+                float(w.attrib.get("polarity", 0.0)),
+                float(w.attrib.get("subjectivity", 0.0)),
+                float(w.attrib.get("intensity", 1.0)),
+            )
+            words.setdefault(form, {}).setdefault(w.attrib.get("pos"), []).append(psi)
+
+    # Average all senses per part-of-speech tag, then all tags
+    for form in words:
+        words[form] = {pos: [_avg(each) for each in zip(*psi)] for pos, psi in words[form].items()}
+    for form, pos in list(words.items()):
+        words[form][None] = [_avg(each) for each in zip(*pos.values())]
+
+    # Map "terrible" to the adverb "terribly"
+    for form, pos in list(words.items()):
+        if "JJ" in pos:
+            if form.endswith("y"):
+                form = form[:-1] + "i"
+            if form.endswith("le"):
+                form = form[:-2]
+            entry = words.setdefault(form + "ly", {})
+            entry["RB"] = entry[None] = tuple(pos["JJ"])
+
+    return {
+        form: (pos[None][0], pos[None][1], pos[None][2], "RB" in pos)
+        for form, pos in words.items()
+    }
+
+
+# --- Scorer -------------------------------------------------------------------
+
+class SentimentScorer:
+    """Score text polarity (-1.0 to 1.0) with a precompiled pattern lexicon"""
+
+    def __init__(self, lexicon=None, lexicon_path=None):
+        self.lexicon = lexicon if lexicon is not None else compile_lexicon(lexicon_path)
+
+    def assessments(self, words):
+        """Return ``[(polarity, subjectivity), ...]`` for the scored chunks of ``words``"""
+        lexicon = self.lexicon
+        a = []
+        m = None  # Preceding modifier (adverb)
+        n = None  # Preceding negation
+        for w in words:
+            entry = lexicon.get(w)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if m is None:
+                    # Known word not preceded by a modifier ("good")
+                    a.append([p, s, i, 1])
+                else:
+                    # Known word preceded by a modifier ("really good")
+                    last = a[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if n is not None:
+                    # Known word preceded by a negation ("not really good")
+                    a[-1][2] = 1.0 / a[-1][2]
+                    a[-1][3] = -1
+                m = w if is_modifier else None
+                n = w if w in NEGATIONS else None
+            else:
+                if w in NEGATIONS:
+                    # Unknown word may be a negation ("not good")
+                    n = w
+                elif n and len(w.strip("'")) > 1:
+                    # Retain negation across small words ("not a good")
+                    n = None
+                if n is not None and m is not None and m.endswith("ly"):
+                    # Negation preceded by a modifier ("really not good")
+                    a[-1][3] = -1
+                    n = None
+                elif m and len(w) > 2:
+                    # Retain modifier across small words ("really is a good")
+                    m = None
+                if w == "!" and a:
+                    # Exclamation marks boost the previous word
+                    a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+                if w == "(!)":
+                    # Exclamation marks in parentheses indicate irony
+                    a.append([0.0, 1.0, 1.0, 1])
+                if w.isalpha() is False and len(w) <= 5 and w not in PUNCTUATION:
+                    p = EMOTICON_POLARITY.get(w)
+                    if p is not None:
+                        a.append([p, 1.0, 1.0, 1])
+        # "not good" = slightly bad, "not bad" = slightly good
+        return [(p * -0.5 if neg < 0 else p, s) for p, s, _, neg in a]
+
+    def polarity(self, text):
+        """Polarity of ``text`` (same value as TextBlob(text).sentiment.polarity)"""
+        a = self.assessments(" ".join(find_tokens(str(text))).lower().split())
+        total = 0
+        for p, _ in a:
+            total += p
+        return total / float(len(a) or 1)
+
+    def polarity_batch(self, texts):
+        """Polarity of every text as a float64 array
+
+        Repeated texts are scored once; None and NaN score 0.0.
+        """
+        scores = np.zeros(len(texts), dtype=np.float64)
+        seen = {}
+        for index, text in enumerate(texts):
+            if text is None or (isinstance(text, float) and text != text):
+                continue
+            score = seen.get(text)
+            if score is None:
+                score = seen[text] = self.polarity(text)
+            scores[index] = score
+        return scores
+
+
+_default_scorer = None
+_default_lock = threading.Lock()
+
+
+def get_scorer():
+    """Process-wide scorer; the lexicon is compiled on first use"""
+    global _default_scorer
+    if _default_scorer is None:
+        with _default_lock:
+            if _default_scorer is None:
+                _default_scorer = SentimentScorer()
+    return _default_scorer
+
+
+def polarity(text):
+    """Polarity of a single text with the shared scorer"""
+    return get_scorer().polarity(text)
+
+
+def polarity_batch(texts):
+    """Polarities of a list of texts with the shared scorer"""
+    return get_scorer().polarity_batch(texts)
@@ -0,0 +1,236 @@
+"""
+Out-of-core training for resume CSVs larger than memory.
+
+The CSV is read in chunks and never held in full. Resume text goes through a
+HashingVectorizer (no vocabulary to keep), categorical columns through a
+FeatureHasher, and numeric columns are standardized with statistics gathered
+incrementally. MultinomialNB and SGDClassifier are trained with partial_fit,
+so memory is bounded by the chunk size regardless of the number of rows.
+
+Three passes over the file:
+  1. scaler statistics and the label set; sentiment is scored here once and
+     spilled to a temporary file that the later passes memory-map
+  2. partial_fit on training rows
+  3. accuracy on held-out rows (every ``holdout_every``-th row)
+
+Usage:
+    python3 streaming_training.py [data/enhanced_resumes.csv]
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.preprocessing import StandardScaler
+
+from resume_pipeline import non_negative
+from sentiment import polarity_batch
+
+NUMERICAL_FEATURES = [
+    'years_experience', 'project_count', 'certification_count',
+    'github_projects', 'text_length', 'word_count', 'sentiment_score'
+]
+CATEGORICAL_FEATURES = ['industry', 'experience_level', 'education_level', 'location']
+CSV_COLUMNS = ['resume_text', 'selected'] + CATEGORICAL_FEATURES + NUMERICAL_FEATURES[:4]
+
+
+class StreamingResumeTrainer:
+    """Train resume selection models chunk by chunk with partial_fit"""
+
+    def __init__(self, chunk_size=10000, n_text_features=2 ** 18, n_categorical_features=2 ** 8,
+                 holdout_every=5, dtype=np.float64):
+        self.chunk_size = chunk_size
+        self.holdout_every = holdout_every
+        self.dtype = np.dtype(dtype)
+        # alternate_sign=False keeps features non-negative for MultinomialNB
+        self.text_vectorizer = HashingVectorizer(
+            n_features=n_text_features, stop_words='english', ngram_range=(1, 2),
+            alternate_sign=False, norm='l2', dtype=self.dtype
+        )
+        self.categorical_hasher = FeatureHasher(
+            n_features=n_categorical_features, input_type='string',
+            alternate_sign=False, dtype=self.dtype
+        )
+        self.scaler = StandardScaler()
+        self.classes = None
+        self.models = {
+            'naive_bayes': MultinomialNB(),
+            'sgd': SGDClassifier(loss='log_loss', random_state=42)
+        }
+        self.stage_times = {}
+        self.rows = {'train': 0, 'holdout': 0}
+        # Per-row sentiment from pass 1, read back by row offset
+        self._sentiment_file = None
+        self._sentiment = None
+
+    @contextmanager
+    def _stage(self, name):
+        """Record the wall-clock time of a pipeline stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[name] = round(time.perf_counter() - start, 3)
+            print(f"⏱️  {name}: {self.stage_times[name]:.2f}s")
+
+    def iter_chunks(self, filepath):
+        """Yield ``(chunk, holdout_mask)`` with derived columns added"""
+        offset = 0
+        for chunk in pd.read_csv(filepath, chunksize=self.chunk_size, usecols=CSV_COLUMNS):
+            text = chunk['resume_text'].fillna('').astype(str)
+            # Column-wise equivalent of resume_pipeline.clean_text
+            chunk['resume_text_clean'] = (
+                text.str.lower()
+                .str.replace(r'[^\w\s]', ' ', regex=True)
+                .str.replace(r'\s+', ' ', regex=True)
+                .str.strip()
+            )
+            chunk['text_length'] = text.str.len()
+            chunk['word_count'] = text.str.split().str.len()
+            chunk['sentiment_score'] = self._sentiment_scores(text, offset)
+
+            holdout = (np.arange(offset, offset + len(chunk)) % self.holdout_every) == 0
+            offset += len(chunk)
+            yield chunk, holdout
+
+    def _sentiment_scores(self, text, offset):
+        """Sentiment of one chunk: scored in pass 1, read from the spill file afterwards"""
+        if self._sentiment is not None:
+            return np.asarray(self._sentiment[offset:offset + len(text)])
+        scores = np.asarray(polarity_batch(text.tolist()), dtype=np.float64)
+        if self._sentiment_file is not None:
+            scores.tofile(self._sentiment_file)
+        return scores
+
+    def _numerical(self, chunk):
+        return chunk[NUMERICAL_FEATURES].to_numpy(dtype=np.float64)
+
+    def transform(self, chunk):
+        """Sparse feature matrix for one chunk: hashed text | scaled numbers | hashed categories"""
+        text = self.text_vectorizer.transform(chunk['resume_text_clean'])
+        numerical = self.scaler.transform(self._numerical(chunk)).astype(self.dtype, copy=False)
+        categorical = self.categorical_hasher.transform(
+            [f"{feature}={value}" for feature, value in zip(CATEGORICAL_FEATURES, row)]
+            for row in chunk[CATEGORICAL_FEATURES].astype(str).itertuples(index=False)
+        )
+        return sparse.hstack([text, sparse.csr_matrix(numerical), categorical], format='csr', dtype=self.dtype)
+
+    def fit_statistics(self, filepath):
+        """Pass 1: incremental scaler statistics and the label set"""
+        labels = set()
+        self.close()
+        self._sentiment_file = tempfile.TemporaryFile(prefix='sentiment-', suffix='.f8')
+        for chunk, holdout in self.iter_chunks(filepath):
+            train = chunk[~holdout]
+            if len(train):
+                self.scaler.partial_fit(self._numerical(train))
+                labels.update(train['selected'].unique().tolist())
+        if not labels:
+            raise ValueError(f"No training rows in {filepath}")
+        self.classes = np.array(sorted(labels))
+        self._sentiment_file.flush()
+        self._sentiment = np.memmap(self._sentiment_file, dtype=np.float64, mode='r')
+
+    def close(self):
+        """Drop the sentiment spill file from the last fit_statistics"""
+        self._sentiment = None
+        if self._sentiment_file is not None:
+            self._sentiment_file.close()
+            self._sentiment_file = None
+
+    def train(self, filepath):
+        """Pass 2: partial_fit every model on each chunk's training rows"""
+        for chunk, holdout in self.iter_chunks(filepath):
+            train = chunk[~holdout]
+            if not len(train):
+                continue
+            X = self.transform(train)
+            y = train['selected'].to_numpy()
+            for name, model in self.models.items():
+                # Naive Bayes needs non-negative features
+                model.partial_fit(non_negative(X) if name == 'naive_bayes' else X, y, classes=self.classes)
+            self.rows['train'] += len(train)
+            print(f"   trained on {self.rows['train']} rows")
+
+    def evaluate(self, filepath):
+        """Pass 3: accuracy of every model on the held-out rows"""
+        correct = {name: 0 for name in self.models}
+        for chunk, holdout in self.iter_chunks(filepath):
+            test = chunk[holdout]
+            if not len(test):
+                continue
+            X = self.transform(test)
+            y = test['selected'].to_numpy()
+            for name, model in self.models.items():
+                y_pred = model.predict(non_negative(X) if name == 'naive_bayes' else X)
+                correct[name] += int((y_pred == y).sum())
+            self.rows['holdout'] += len(test)
+        return {
+            name: count / self.rows['holdout'] if self.rows['holdout'] else None
+            for name, count in correct.items()
+        }
+
+    def save(self, accuracies, model_dir="model"):
+        """Save models, the preprocessing objects and a report"""
+        os.makedirs(model_dir, exist_ok=True)
+        for name, model in self.models.items():
+            with open(f"{model_dir}/streaming_{name}.pkl", "wb") as f:
+                pickle.dump(model, f)
+        with open(f"{model_dir}/streaming_preprocessing.pkl", "wb") as f:
+            pickle.dump({
+                'text_vectorizer': self.text_vectorizer,
+                'categorical_hasher': self.categorical_hasher,
+                'scaler': self.scaler,
+                'numerical_features': NUMERICAL_FEATURES,
+                'categorical_features': CATEGORICAL_FEATURES
+            }, f)
+        with open(f"{model_dir}/streaming_training_report.json", "w") as f:
+            json.dump({
+                'rows': self.rows,
+                'chunk_size': self.chunk_size,
+                'accuracy': accuracies,
+                'stage_times': self.stage_times
+            }, f, indent=2)
+
+
+def main():
+    """Streaming training pipeline"""
+    filepath = sys.argv[1] if len(sys.argv) > 1 else 'data/enhanced_resumes.csv'
+    print(f"🚀 Starting streaming training on {filepath}...")
+
+    trainer = StreamingResumeTrainer(
+        chunk_size=int(os.environ.get('STREAMING_CHUNK_SIZE', 10000)),
+        n_text_features=2 ** int(os.environ.get('STREAMING_HASH_BITS', 18)),
+        dtype=os.environ.get('TRAINING_DTYPE', 'float64')
+    )
+
+    try:
+        with trainer._stage('statistics'):
+            trainer.fit_statistics(filepath)
+        with trainer._stage('train'):
+            trainer.train(filepath)
+        with trainer._stage('evaluate'):
+            accuracies = trainer.evaluate(filepath)
+    finally:
+        trainer.close()
+    for name, accuracy in accuracies.items():
+        # None when there were no held-out rows
+        print(f"   {name} holdout accuracy: {f'{accuracy:.4f}' if accuracy is not None else 'n/a'}")
+
+    trainer.save(accuracies)
+    print(f"🎉 Trained on {trainer.rows['train']} rows, evaluated on {trainer.rows['holdout']}")
+    print("💾 Models saved in 'model/' as streaming_*.pkl")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,34 @@
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
 import pickle
 import os
 
+from resume_pipeline import ROLE_PIPELINE_FILENAME, save_pipeline
+
 # 1. Load and prepare data
 df = pd.read_csv("data/resumes.csv")  # Columns: Role, ResumeText, Selected, Skills
 
-# Use ResumeText for vectorization, predict Role
-vectorizer = TfidfVectorizer()
-X = vectorizer.fit_transform(df['ResumeText'])
-y = df['Role']
-
-# 2. Train model (multi-class classification)
-model = MultinomialNB()
-model.fit(X, y)
+# 2. Train model (multi-class classification): TF-IDF on ResumeText, predict Role
+pipeline = Pipeline([('tfidf', TfidfVectorizer()), ('classifier', MultinomialNB())])
+pipeline.fit(df['ResumeText'], df['Role'])
 
 # 3. Save models
 os.makedirs("model", exist_ok=True)
+
+# One artifact for the backend, so the vectorizer and classifier it serves
+# always come from the same fit
+save_pipeline(pipeline, os.path.join("model", ROLE_PIPELINE_FILENAME), metadata={
+    'classes': [str(role) for role in pipeline.classes_],
+    'train_rows': len(df)
+})
+
+# Separate pickles for streamlit_app.py
 with open("model/tfidf_vectorizer.pkl", "wb") as f:
-    pickle.dump(vectorizer, f)
+    pickle.dump(pipeline.named_steps['tfidf'], f)
 
 with open("model/resume_classifier.pkl", "wb") as f:
-    pickle.dump(model, f)
+    pickle.dump(pipeline.named_steps['classifier'], f)
 
 print("✅ Enhanced resume model trained and saved.")
@@ -1,17 +1,12 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import os
 import sys
-import pickle
 import pandas as pd
 import re
-from textblob import TextBlob
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 import json
-from difflib import get_close_matches
-import PyPDF2
-from io import BytesIO
 
 # Load environment variables from .env file
 try:
@@ -30,15 +25,46 @@ try:
         analyze_resume_with_gemini,
         generate_interview_questions_with_gemini,
         analyze_answer_with_gemini,
-        is_gemini_available
+        analyze_answers_with_gemini,
+        is_gemini_available,
+        gemini_status
     )
     GEMINI_AVAILABLE = is_gemini_available()
 except Exception as e:
     print(f"Warning: Gemini service not available: {e}")
     GEMINI_AVAILABLE = False
 
+from model_registry import ModelRegistry
+from session_store import create_session_store
+from keyword_matcher import KeywordMatcher
+from role_scorer import RoleScorer
+from resume_cache import ResumeAnalysisCache
+from pdf_extraction import PDFExtractor, PDFExtractionError, PDFTooLargeError
+from batch_screening import BatchScreeningError, spool_sources, screen, to_ndjson, close_items
+from template_store import TemplateStore
+from job_queue import JobFailed, create_job_queue, job_events
+
 # Add the parent directory to the path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The training modules too: the resume pipeline artifact references classes
+# by the module names they had at training time (e.g. resume_pipeline)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ai_interviewer_project'))
+
+# TextBlob-compatible polarity from a precompiled lexicon, without building a
+# TextBlob (or importing nltk); falls back to TextBlob when the shared module
+# or the lexicon is not deployed alongside the backend
+try:
+    from ai_interviewer_project.sentiment import get_scorer
+    sentiment_polarity = get_scorer().polarity
+    sentiment_polarity_batch = get_scorer().polarity_batch
+except Exception as e:
+    print(f"Sentiment scorer unavailable, using TextBlob: {e}")
+    from textblob import TextBlob
+
+    def sentiment_polarity(text):
+        return TextBlob(text).sentiment.polarity
+
+    sentiment_polarity_batch = None
 
 app = Flask(__name__)
 CORS(app)
@@ -51,176 +77,212 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Create uploads directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Global variables to store session data (in production, use a proper database)
-session_data = {}
+# Trained models are loaded once per process (or once in the gunicorn master
+# when started with --preload) and hot-swapped when files in model/ change
+# resume_pipeline.joblib (features + selection ensemble from enhanced_training.py)
+# and role_pipeline.joblib (TF-IDF + role classifier from train_resume_model.py)
+# are memory-mapped, so their arrays are shared by all workers via the page cache.
+# tfidf_vectorizer.pkl/resume_classifier.pkl are only used without role_pipeline,
+# and are loaded and hot-swapped as a pair
+MODEL_ARTIFACTS = ['role_pipeline', 'resume_pipeline']
+LEGACY_ROLE_ARTIFACTS = ('tfidf_vectorizer', 'resume_classifier')
+model_registry = ModelRegistry(
+    check_interval=float(os.environ.get('MODEL_CHECK_INTERVAL', 5)),
+    mmap_mode=os.environ.get('MODEL_MMAP_MODE', 'r') or None
+)
+model_registry.preload(MODEL_ARTIFACTS)
 
-# Enhanced session management for Railway deployment
-import json
+# PDF uploads are spooled and extracted with byte/page limits; large PDFs are
+# extracted page-parallel in a small process pool
+pdf_extractor = PDFExtractor.from_env()
+# Allow for multipart form overhead on top of the PDF itself
+MAX_UPLOAD_BYTES = pdf_extractor.max_bytes + 64 * 1024
+
+# /api/batch-screen limits: files per batch (after unzipping), whole request
+# size, zip size, and resumes scored per vectorizer/model call
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+BATCH_MAX_UPLOAD_BYTES = int(os.environ.get('BATCH_MAX_MB', 200)) * 1024 * 1024
+BATCH_MAX_ZIP_BYTES = int(os.environ.get('BATCH_MAX_ZIP_MB', 200)) * 1024 * 1024
+BATCH_GROUP_SIZE = int(os.environ.get('BATCH_GROUP_SIZE', 64))
+
+# Per-file analyses shared by all roles, keyed by SHA-256 of the PDF bytes
+resume_cache = ResumeAnalysisCache(
+    max_entries=int(os.environ.get('RESUME_CACHE_MAX_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('RESUME_CACHE_MAX_MB', 64)) * 1024 * 1024
+)
+
+# Interview sessions live in a per-key store (SQLite by default, Redis when
+# SESSION_BACKEND=redis) so every worker sees the same sessions
+session_store = create_session_store()
+
+# Uploads sent with async=true are analyzed by background jobs; job state is
+# shared like sessions (SQLite by default, Redis when JOB_BACKEND=redis)
+job_queue = create_job_queue()
+JOB_EVENTS_TIMEOUT = float(os.environ.get('JOB_EVENTS_TIMEOUT', 300))
+
+# Role/question templates parsed once and reloaded when the JSON file changes
+template_store = TemplateStore(check_interval=float(os.environ.get('TEMPLATE_CHECK_INTERVAL', 5)))
+
+import io
+import base64
 import hashlib
 import time
 
-# Get cross-platform session data file path
-def get_session_data_path():
-    """Get the path to session data file (cross-platform)"""
-    # Use backend directory for session storage (works on all platforms)
-    backend_dir = os.path.dirname(os.path.abspath(__file__))
-    session_file = os.path.join(backend_dir, 'session_data.json')
-    return session_file
-
 def create_session_key(candidate_name, selected_role):
     """Create a unique session key"""
     key_string = f"{candidate_name}_{selected_role}_{int(time.time())}"
     return hashlib.md5(key_string.encode()).hexdigest()[:8]
 
-def save_session_data():
-    """Save session data to a file with timestamp (cross-platform)"""
-    try:
-        session_data_with_timestamp = {
-            'data': session_data,
-            'timestamp': time.time()
-        }
-        session_file = get_session_data_path()
-        with open(session_file, 'w') as f:
-            json.dump(session_data_with_timestamp, f)
-    except Exception as e:
-        print(f"Error saving session data: {e}")
+def role_classifier():
+    """``(vectorizer, classifier, version)`` for role prediction, or None
 
-def load_session_data():
-    """Load session data from file (cross-platform)"""
-    global session_data
-    try:
-        session_file = get_session_data_path()
-        if os.path.exists(session_file):
-            with open(session_file, 'r') as f:
-                session_data_with_timestamp = json.load(f)
-                # Check if session is not too old (1 hour)
-                if time.time() - session_data_with_timestamp.get('timestamp', 0) < 3600:
-                    session_data = session_data_with_timestamp.get('data', {})
-                else:
-                    session_data = {}
-        else:
-            session_data = {}
-    except Exception as e:
-        print(f"Error loading session data: {e}")
-        session_data = {}
+    Prefers role_pipeline.joblib, whose vectorizer and classifier were fitted
+    together; falls back to the separate tfidf_vectorizer/resume_classifier
+    pickles from older training runs.
+    """
+    handle = model_registry.get('role_pipeline')
+    if handle is not None:
+        pipeline = handle.model['pipeline']
+        return pipeline.named_steps['tfidf'], pipeline.named_steps['classifier'], ('role_pipeline', handle.version)
+    pair = model_registry.get_group(LEGACY_ROLE_ARTIFACTS, validate=role_pair_matches)
+    if pair is None:
+        return None
+    vectorizer_handle, model_handle = pair
+    return vectorizer_handle.model, model_handle.model, (vectorizer_handle.version, model_handle.version)
+
+def role_pair_matches(vectorizer, classifier):
+    """True if ``classifier`` was fitted on this vectorizer's feature space"""
+    n_features = len(vectorizer.vocabulary_)
+    return getattr(classifier, 'n_features_in_', n_features) == n_features
+
+# Load whichever role classifier is deployed before gunicorn forks the workers
+role_classifier()
 
 def load_models():
-    """Load the trained AI models"""
+    """Get the trained AI models from the process-wide model registry"""
+    classifier = role_classifier()
+    if classifier is None:
+        return None, None
+    return classifier[0], classifier[1]
+
+def selection_probabilities(pipeline_handle, resume_texts):
+    """Selection probabilities from the trained resume pipeline (None if unavailable)
+
+    Fields the API does not collect (industry, experience, ...) are filled by
+    the pipeline with the training-time defaults.
+    """
+    if pipeline_handle is None:
+        return [None] * len(resume_texts)
     try:
-        # First try local directory (for Railway deployment)
-        model_path = os.path.join(os.path.dirname(__file__), 'model')
-        if not os.path.exists(model_path):
-            # Fallback to parent directory (for local development)
-            model_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ai_interviewer_project', 'model')
-        
-        with open(os.path.join(model_path, 'tfidf_vectorizer.pkl'), 'rb') as f:
-            vectorizer = pickle.load(f)
-        with open(os.path.join(model_path, 'resume_classifier.pkl'), 'rb') as f:
-            model = pickle.load(f)
-        return vectorizer, model
+        pipeline = pipeline_handle.model['pipeline']
+        probabilities = pipeline.predict_proba(pd.DataFrame({'resume_text': resume_texts}))
+        positive = list(pipeline.classes_).index(True)
+        return [round(float(p), 4) for p in probabilities[:, positive]]
     except Exception as e:
-        print(f"Error loading models: {e}")
-        return None, None
+        print(f"Error scoring resume with the pipeline: {e}")
+        return [None] * len(resume_texts)
+
+def selection_probability(pipeline_handle, resume_text):
+    return selection_probabilities(pipeline_handle, [resume_text])[0]
+
+def score_resume_batch(resume_texts, selected_role):
+    """Role prediction, ATS score, skills and selection probability for many resumes
+
+    The vectorizer, role classifier and pipeline each run once for the batch.
+    """
+    classifier = role_classifier()
+    
+    predicted_roles = [None] * len(resume_texts)
+    if classifier is not None:
+        vectorizer, model, _ = classifier
+        probabilities = model.predict_proba(vectorizer.transform(resume_texts))
+        predicted_roles = [str(role) for role in model.classes_[np.argmax(probabilities, axis=1)]]
+    
+    selection = selection_probabilities(model_registry.get('resume_pipeline'), resume_texts)
+    return [
+        {
+            'predicted_role': predicted_role or selected_role,
+            'ats_score': ats_score(text, selected_role),
+            'skills': extract_skills(text, selected_role),
+            'selection_probability': probability
+        }
+        for text, predicted_role, probability in zip(resume_texts, predicted_roles, selection)
+    ]
+
+def cached_resume_text(digest):
+    analysis = resume_cache.get(digest)
+    return analysis['resume_text'] if analysis is not None else None
+
+def screen_resume_batch(items, selected_role):
+    """Results for spooled batch items as they complete (shared with the CLI)"""
+    return screen(
+        items, pdf_extractor,
+        lambda texts: score_resume_batch(texts, selected_role),
+        cached_text=cached_resume_text,
+        group_size=BATCH_GROUP_SIZE
+    )
 
 def get_roles():
     """Get available job roles from question templates"""
-    try:
-        # First try local directory (for Railway deployment)
-        templates_path = os.path.join(os.path.dirname(__file__), 'data', 'question_templates.json')
-        if not os.path.exists(templates_path):
-            # Fallback to parent directory (for local development)
-            templates_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ai_interviewer_project', 'data', 'question_templates.json')
-        
-        with open(templates_path) as f:
-            templates = json.load(f)
-        return list(templates.keys())
-    except Exception as e:
-        print(f"Error loading roles: {e}")
-        return []
+    return template_store.roles()
+
+ROLE_KEYWORDS = {
+    "Frontend Developer": ["react", "javascript", "html", "css", "frontend", "ui", "web"],
+    "Backend Developer": ["python", "django", "rest", "api", "backend", "sql", "database"],
+    "DevOps Engineer": ["ci/cd", "docker", "kubernetes", "aws", "devops", "cloud", "infrastructure"],
+    "ML Engineer": ["machine learning", "ml", "scikit-learn", "tensorflow", "model", "data pipeline"],
+    "Data Scientist": ["python", "pandas", "tableau", "data analysis", "excel", "visualization"],
+    "Full Stack Developer": ["full stack", "frontend", "backend", "javascript", "python", "react", "django", "api", "sql", "css", "html"],
+    "UI/UX Designer": ["ui", "ux", "design", "figma", "sketch", "adobe xd", "wireframe", "prototype", "user research", "usability", "aesthetics"],
+    "Android Developer": ["android", "kotlin", "java", "jetpack", "compose", "xml", "android studio", "mobile", "api", "gradle"],
+    "QA Tester": ["qa", "testing", "test case", "automation", "selenium", "regression", "bug", "coverage", "manual", "script"],
+    "Project Manager": ["project", "manager", "scrum", "agile", "kanban", "timeline", "stakeholder", "risk", "collaboration", "communication"]
+}
+
+# Every role's keywords compiled into one automaton; ATS_MATCH_MODE=compat
+# restores the original substring + difflib scoring
+keyword_matcher = KeywordMatcher(ROLE_KEYWORDS)
+ATS_MATCH_MODE = os.environ.get('ATS_MATCH_MODE', 'indexed')
+
+# Per-role keyword sets and word-boundary patterns compiled once, shared by
+# ATS scoring, skill extraction and answer scoring (compat mode keeps
+# substring matching for answers too)
+role_scorer = RoleScorer(keyword_matcher, sentiment_polarity, sentiment_polarity_batch, mode=ATS_MATCH_MODE)
 
 def get_keywords_for_role(role):
     """Get relevant keywords for a specific role"""
-    keywords = {
-        "Frontend Developer": ["react", "javascript", "html", "css", "frontend", "ui", "web"],
-        "Backend Developer": ["python", "django", "rest", "api", "backend", "sql", "database"],
-        "DevOps Engineer": ["ci/cd", "docker", "kubernetes", "aws", "devops", "cloud", "infrastructure"],
-        "ML Engineer": ["machine learning", "ml", "scikit-learn", "tensorflow", "model", "data pipeline"],
-        "Data Scientist": ["python", "pandas", "tableau", "data analysis", "excel", "visualization"],
-        "Full Stack Developer": ["full stack", "frontend", "backend", "javascript", "python", "react", "django", "api", "sql", "css", "html"],
-        "UI/UX Designer": ["ui", "ux", "design", "figma", "sketch", "adobe xd", "wireframe", "prototype", "user research", "usability", "aesthetics"],
-        "Android Developer": ["android", "kotlin", "java", "jetpack", "compose", "xml", "android studio", "mobile", "api", "gradle"],
-        "QA Tester": ["qa", "testing", "test case", "automation", "selenium", "regression", "bug", "coverage", "manual", "script"],
-        "Project Manager": ["project", "manager", "scrum", "agile", "kanban", "timeline", "stakeholder", "risk", "collaboration", "communication"]
-    }
-    return keywords.get(role, [])
+    return list(role_scorer.keywords(role))
 
 def ats_score(resume_text, role):
-    """Calculate ATS compatibility score using the actual working logic"""
-    keywords = get_keywords_for_role(role)
-    resume_text_lower = resume_text.lower()
-    
-    # Tokenize resume text (words and phrases)
-    tokens = set(re.findall(r"\b\w+[\w\s\-/\.]*\w*\b", resume_text_lower))
-    found = 0
-    
-    for kw in keywords:
-        kw_lower = kw.lower()
-        # Direct word/phrase match
-        if any(kw_lower in token for token in tokens):
-            found += 1
-            continue
-        # Fuzzy match (for typos, plurals, etc.)
-        close = get_close_matches(kw_lower, tokens, n=1, cutoff=0.85)
-        if close:
-            found += 1
-    
-    return int(100 * found / len(keywords)) if keywords else 0
+    """Calculate ATS compatibility score with the compiled keyword matcher"""
+    return role_scorer.ats_score(resume_text, role)
 
 def extract_skills(resume_text, role):
-    """Extract skills from resume text using the actual working logic"""
-    role_keywords = set(get_keywords_for_role(role))
-    
-    # Basic word extraction
-    words = re.findall(r"\b\w+\b", resume_text.lower())
-    freq = {}
-    for w in words:
-        if len(w) > 2:
-            freq[w] = freq.get(w, 0) + 1
-    
-    # Top N frequent words not in stopwords
-    stopwords = set(["the", "and", "for", "with", "you", "are", "but", "all", "can", "has", "have", "from", "that", "this", "was", "will", "your", "not", "use", "our", "who", "his", "her", "she", "him", "their", "they", "them", "its", "it's", "had", "been", "were", "which", "what", "how", "why", "when", "where", "also", "more", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"])
-    top_resume_skills = [w for w, c in sorted(freq.items(), key=lambda x: -x[1]) if w not in stopwords and not w.isdigit()][:10]
-    
-    # Combine role keywords and resume skills
-    combined = list(role_keywords) + [w for w in top_resume_skills if w not in role_keywords]
-    return combined[:5]
+    """Role keywords, topped up with frequent resume words for roles with fewer than 5"""
+    return role_scorer.extract_skills(resume_text, role)
 
 def generate_questions(resume_text, selected_role):
     """Generate role-specific questions using the actual working logic"""
     try:
-        # First try local directory (for Railway deployment)
-        templates_path = os.path.join(os.path.dirname(__file__), 'data', 'question_templates.json')
-        if not os.path.exists(templates_path):
-            # Fallback to parent directory (for local development)
-            templates_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ai_interviewer_project', 'data', 'question_templates.json')
-        
-        with open(templates_path) as f:
-            templates = json.load(f)
+        snapshot = template_store.snapshot()
+        role_templates = snapshot.templates.get(selected_role, ())
+        if not snapshot.skill_templates.get(selected_role):
+            # No {skill} slots to fill, so skill extraction can be skipped
+            return [tmpl.text for tmpl in role_templates[:5]]
         
-        role_templates = templates.get(selected_role, [])
         skills = extract_skills(resume_text, selected_role)
         questions = []
         used_skills = set()
         
         for tmpl in role_templates:
-            if "{skill}" in tmpl and skills:
+            if tmpl.has_skill and skills:
                 for skill in skills:
                     if skill not in used_skills:
-                        questions.append(tmpl.replace("{skill}", skill))
+                        questions.append(tmpl.render(skill))
                         used_skills.add(skill)
                         break
             else:
-                questions.append(tmpl)
+                questions.append(tmpl.text)
             if len(questions) >= 5:
                 break
         
@@ -230,22 +292,85 @@ def generate_questions(resume_text, selected_role):
         return []
 
 def analyze_answer(answer, role):
-    """Analyze interview answer using the actual working logic"""
-    # Length score
-    length_score = min(len(answer.split()) / 20, 1.0)  # 20+ words = full score
+    """Score an answer: 0.4 length + 0.4 keyword relevance + 0.2 clarity (sentiment)
     
-    # Relevance score (keyword overlap)
-    keywords = get_keywords_for_role(role)
-    overlap = sum(1 for kw in keywords if kw.lower() in answer.lower())
-    relevance_score = overlap / len(keywords) if keywords else 0
+    Returns ``(total, length_score, relevance_score, clarity_score)``.
+    """
+    return role_scorer.score_answer(answer, role)
+
+def score_answers(answers, role):
+    """analyze_answer for a list of answers, with one batched sentiment call"""
+    return role_scorer.score_answers(answers, role)
+
+def traditional_answer_feedback(answer, role, scores=None):
+    """Score an answer with analyze_answer (unless ``scores`` is given) and build the basic feedback text"""
+    score, length_score, relevance_score, clarity_score = scores or analyze_answer(answer, role)
+    
+    # Generate basic feedback
+    feedback = []
+    if length_score < 0.5:
+        feedback.append("Try to give a more detailed answer.")
+    if relevance_score < 0.5:
+        feedback.append("Include more relevant technical keywords.")
+    if clarity_score > 0.7:
+        feedback.append("Answer was confident and clear.")
+    elif clarity_score < 0.3:
+        feedback.append("Try to sound more positive and clear.")
+    
+    return {
+        'score': round(score * 10, 2),
+        'feedback': " ".join(feedback) if feedback else "Good answer!",
+        'length_score': round(length_score, 2),
+        'relevance_score': round(relevance_score, 2),
+        'clarity_score': round(clarity_score, 2)
+    }
+
+def build_answer_result(question, answer, role, gemini_feedback=None, scores=None):
+    """Build the (session record, API response) for one answer
     
-    # Clarity (sentiment)
-    polarity = TextBlob(answer).sentiment.polarity
-    clarity_score = (polarity + 1) / 2  # scale to 0-1
+    Uses the Gemini feedback when given, otherwise scores the answer locally
+    (or takes precomputed analyze_answer ``scores``).
+    """
+    if gemini_feedback:
+        analysis = {
+            'technical_accuracy': gemini_feedback.get('technical_accuracy', ''),
+            'communication_clarity': gemini_feedback.get('communication_clarity', ''),
+            'strengths': gemini_feedback.get('strengths', []),
+            'improvements': gemini_feedback.get('improvements', []),
+            'overall_assessment': gemini_feedback.get('overall_assessment', '')
+        }
+        score10 = gemini_feedback['score']
+        feedback_text = gemini_feedback['feedback']
+        answer_extra = dict(analysis, analyzed_by='gemini')
+    else:
+        traditional = traditional_answer_feedback(answer, role, scores)
+        analysis = {
+            'length_score': traditional['length_score'],
+            'relevance_score': traditional['relevance_score'],
+            'clarity_score': traditional['clarity_score']
+        }
+        score10 = traditional['score']
+        feedback_text = traditional['feedback']
+        answer_extra = {
+            'sentiment': traditional['clarity_score'],
+            'length': traditional['length_score'],
+            'relevance': traditional['relevance_score'],
+            'analyzed_by': 'traditional'
+        }
     
-    # Weighted sum
-    total = 0.4 * length_score + 0.4 * relevance_score + 0.2 * clarity_score
-    return total, length_score, relevance_score, clarity_score
+    answer_data = dict({
+        'question': question,
+        'answer': answer,
+        'score': score10,
+        'feedback': feedback_text
+    }, **answer_extra)
+    response_data = {
+        'score': score10,
+        'feedback': feedback_text,
+        'analysis': analysis,
+        'analyzed_by': answer_extra['analyzed_by']
+    }
+    return answer_data, response_data
 
 def final_decision(predicted_role, selected_role, ats, interview, ats_thr=60, int_thr=0.5):
     """Make final decision using the actual working logic"""
@@ -276,31 +401,101 @@ def final_decision(predicted_role, selected_role, ats, interview, ats_thr=60, in
     
     return result, "; ".join(reasons)
 
+def wants_fresh(value):
+    """True if a boolean form flag (``fresh``, ``async``) is set"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def extract_text_from_pdf(file):
-    """Extract text from PDF file using the actual working logic"""
+    """Extract text from a PDF file object with the bounded extraction engine"""
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        with pdf_extractor.spool(file) as upload:
+            return pdf_extractor.extract(upload)['text']
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
 
+def analyze_resume(upload):
+    """Role-independent analysis of a spooled PDF upload, served from the resume cache
+
+    Returns ``(digest, analysis)``; ``analysis`` is None when no text could be
+    extracted. Model-dependent fields are recomputed if the registry has
+    hot-swapped the vectorizer or classifier since the entry was cached.
+    Raises PDFExtractionError for PDFs over the page limit or unreadable files.
+    """
+    digest = upload.digest
+    classifier = role_classifier()
+    pipeline_handle = model_registry.get('resume_pipeline')
+    model_versions = (
+        classifier[2] if classifier else None,
+        pipeline_handle.version if pipeline_handle else None
+    )
+    
+    analysis = resume_cache.get(digest)
+    if analysis is not None and analysis['model_versions'] == model_versions:
+        return digest, analysis
+    
+    if analysis is None:
+        extraction = pdf_extractor.extract(upload)
+        resume_text = extraction.pop('text')
+        print(f"Extracted {extraction['page_count']} PDF pages in {extraction['total_ms']}ms")
+        if not resume_text.strip():
+            return digest, None
+        
+        roles = get_roles()
+        role_scores = keyword_matcher.score_all(resume_text, mode=ATS_MATCH_MODE)
+        analysis = {
+            'resume_text': resume_text,
+            'extraction': extraction,
+            'ats_scores': {
+                role: role_scores[role]['score'] if role in role_scores else 0
+                for role in roles
+            },
+            'skills': {role: extract_skills(resume_text, role) for role in roles},
+            'gemini_analysis': {}
+        }
+    
+    # Classifier outputs depend on the loaded model versions
+    tfidf_vector = None
+    role_probabilities = {}
+    predicted_role = None
+    if classifier is not None:
+        vectorizer, model, _ = classifier
+        tfidf_vector = vectorizer.transform([analysis['resume_text']])
+        probabilities = model.predict_proba(tfidf_vector)[0]
+        role_probabilities = {str(role): float(p) for role, p in zip(model.classes_, probabilities)}
+        predicted_role = str(model.classes_[int(np.argmax(probabilities))])
+    
+    analysis = dict(
+        analysis,
+        model_versions=model_versions,
+        tfidf_vector=tfidf_vector,
+        role_probabilities=role_probabilities,
+        predicted_role=predicted_role,
+        selection_probability=selection_probability(pipeline_handle, analysis['resume_text'])
+    )
+    resume_cache.put(digest, analysis)
+    return digest, analysis
+
 @app.route('/api/upload-resume', methods=['POST'])
 def upload_resume():
     """Handle resume upload and analysis using the actual working AI logic"""
     try:
+        # Reject oversized bodies before the multipart parser buffers them
+        if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+            return jsonify({'error': 'Resume file is too large'}), 413
+        
         if 'resume' not in request.files:
             return jsonify({'error': 'No resume file provided'}), 400
         
         file = request.files['resume']
         candidate_name = request.form.get('candidate_name', '')
         selected_role = request.form.get('selected_role', '')
+        fresh = wants_fresh(request.form.get('fresh'))
         
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
@@ -311,77 +506,191 @@ def upload_resume():
         if not candidate_name or not selected_role:
             return jsonify({'error': 'Candidate name and role are required'}), 400
         
-        # Extract text from PDF using the actual working logic
-        resume_text = extract_text_from_pdf(file)
-        if not resume_text.strip():
-            return jsonify({'error': 'Could not extract text from PDF'}), 400
-        
-        # Load models and predict role using the actual working AI models
-        vectorizer, model = load_models()
-        if vectorizer is None or model is None:
-            # Fallback: use basic role prediction without ML models
-            print("ML models not available, using fallback prediction")
-            predicted_role = selected_role  # Use selected role as fallback
-        else:
-            # Predict role using the actual trained model
-            X = vectorizer.transform([resume_text])
-            predicted_role = model.predict(X)[0]
-        
-        # Try Gemini for enhanced ATS scoring and analysis
-        gemini_analysis = None
-        if GEMINI_AVAILABLE:
+        # Role-independent analysis (text, vector, probabilities, ATS for all
+        # roles) is cached by file hash, so re-uploads and role switches are free
+        try:
+            upload = pdf_extractor.spool(file.stream)
+        except PDFTooLargeError as e:
+            return jsonify({'error': str(e)}), 413
+        try:
+            if wants_fresh(request.form.get('async')):
+                # Answer at once; the client polls status_url or listens on events_url
+                job = job_queue.submit('analyze_resume', {
+                    'pdf': base64.b64encode(upload.open().read()).decode('ascii'),
+                    'candidate_name': candidate_name,
+                    'selected_role': selected_role,
+                    'fresh': fresh
+                })
+                return jsonify(job_accepted(job)), 202
+            body, status = process_resume(upload, candidate_name, selected_role, fresh)
+        finally:
+            upload.close()
+        return jsonify(body), status
+        
+    except Exception as e:
+        print(f"Error processing resume: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def process_resume(upload, candidate_name, selected_role, fresh=False):
+    """Analyze a spooled resume for one role and start its interview session
+
+    Returns ``(body, status_code)`` for the upload response; shared by the
+    synchronous endpoint and background 'analyze_resume' jobs.
+    """
+    try:
+        digest, analysis = analyze_resume(upload)
+    except PDFTooLargeError as e:
+        return {'error': str(e)}, 413
+    except PDFExtractionError:
+        return {'error': 'Could not extract text from PDF'}, 400
+    if analysis is None:
+        return {'error': 'Could not extract text from PDF'}, 400
+    
+    resume_text = analysis['resume_text']
+    predicted_role = analysis['predicted_role']
+    if predicted_role is None:
+        # Fallback: use basic role prediction without ML models
+        print("ML models not available, using fallback prediction")
+        predicted_role = selected_role  # Use selected role as fallback
+    
+    # Try Gemini for enhanced ATS scoring and analysis
+    gemini_analysis = None
+    if GEMINI_AVAILABLE:
+        gemini_analysis = None if fresh else analysis['gemini_analysis'].get(selected_role)
+        if gemini_analysis is None:
             try:
-                gemini_analysis = analyze_resume_with_gemini(resume_text, selected_role)
+                gemini_analysis = analyze_resume_with_gemini(resume_text, selected_role, bypass_cache=fresh)
                 if gemini_analysis:
-                    ats_score_value = gemini_analysis['ats_score']
-                    predicted_role = gemini_analysis['predicted_role']
-                    skills = gemini_analysis['skills']
+                    resume_cache.put(digest, dict(
+                        analysis,
+                        gemini_analysis=dict(analysis['gemini_analysis'], **{selected_role: gemini_analysis})
+                    ))
                     print("✅ Used Gemini for resume analysis")
             except Exception as e:
                 print(f"Gemini analysis failed, using fallback: {e}")
                 gemini_analysis = None
-        
-        # Fallback to traditional methods if Gemini unavailable or failed
-        if gemini_analysis is None:
+        if gemini_analysis:
+            ats_score_value = gemini_analysis['ats_score']
+            predicted_role = gemini_analysis['predicted_role']
+            skills = gemini_analysis['skills']
+    
+    # Fallback to traditional methods if Gemini unavailable or failed
+    if gemini_analysis is None:
+        ats_score_value = analysis['ats_scores'].get(selected_role)
+        if ats_score_value is None:
             ats_score_value = ats_score(resume_text, selected_role)
+        skills = analysis['skills'].get(selected_role)
+        if skills is None:
             skills = extract_skills(resume_text, selected_role)
+    
+    # Store data for later use (in production, use a proper database)
+    session_key = f"{candidate_name}_{selected_role}"
+    session_store.set(session_key, {
+        'candidate_name': candidate_name,
+        'selected_role': selected_role,
+        'predicted_role': predicted_role,
+        'ats_score': ats_score_value,
+        'resume_text': resume_text,
+        'skills': skills,
+        'gemini_analysis': gemini_analysis  # Store Gemini analysis if available
+    })
+    
+    return {
+        'candidate_name': candidate_name,
+        'selected_role': selected_role,
+        'predicted_role': predicted_role,
+        'ats_score': ats_score_value,
+        'skills': skills,
+        'selection_probability': analysis['selection_probability'],
+        'extraction': analysis['extraction'],
+        'message': 'Resume analyzed successfully using AI models',
+        'session_key': session_key
+    }, 200
+
+def run_resume_job(payload):
+    """Job handler for asynchronous uploads: same analysis as the synchronous path"""
+    upload = pdf_extractor.spool(io.BytesIO(base64.b64decode(payload['pdf'])))
+    try:
+        body, status = process_resume(upload, payload['candidate_name'], payload['selected_role'], payload['fresh'])
+    finally:
+        upload.close()
+    if status != 200:
+        raise JobFailed(body['error'], status)
+    return body
+
+job_queue.register('analyze_resume', run_resume_job)
+
+def job_accepted(job):
+    """202 body for a submitted job: the client polls status_url or listens on events_url"""
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'status_url': f"/api/jobs/{job['id']}",
+        'events_url': f"/api/jobs/{job['id']}/events"
+    }
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a background job, with its result once done"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def get_job_events(job_id):
+    """Server-sent events with the job record on every status change"""
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return Response(
+        job_events(job_queue, job_id, timeout=JOB_EVENTS_TIMEOUT),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/jobs/metrics', methods=['GET'])
+def get_job_metrics():
+    """Queue depth plus wait and run times of recent jobs in this worker"""
+    return jsonify(job_queue.stats())
+
+@app.route('/api/batch-screen', methods=['POST'])
+def batch_screen():
+    """Screen many resumes (PDFs and/or ZIPs of PDFs) and stream NDJSON results"""
+    try:
+        if request.content_length and request.content_length > BATCH_MAX_UPLOAD_BYTES:
+            return jsonify({'error': 'Batch is too large'}), 413
         
-        # Store data for later use (in production, use a proper database)
-        session_key = f"{candidate_name}_{selected_role}"
-        session_data[session_key] = {
-            'candidate_name': candidate_name,
-            'selected_role': selected_role,
-            'predicted_role': predicted_role,
-            'ats_score': ats_score_value,
-            'resume_text': resume_text,
-            'skills': skills,
-            'gemini_analysis': gemini_analysis  # Store Gemini analysis if available
-        }
-        
-        # Save session data to file
-        save_session_data()
-        
-        return jsonify({
-            'candidate_name': candidate_name,
-            'selected_role': selected_role,
-            'predicted_role': predicted_role,
-            'ats_score': ats_score_value,
-            'skills': skills,
-            'message': 'Resume analyzed successfully using AI models',
-            'session_key': session_key
-        })
+        selected_role = request.form.get('selected_role', '')
+        files = [f for f in request.files.getlist('resumes') if f.filename]
+        if not selected_role:
+            return jsonify({'error': 'Role is required'}), 400
+        if not files:
+            return jsonify({'error': 'No resume files provided'}), 400
         
+        try:
+            items = spool_sources(
+                ((f.filename, f.stream) for f in files),
+                pdf_extractor, BATCH_MAX_FILES, BATCH_MAX_ZIP_BYTES
+            )
+        except BatchScreeningError as e:
+            return jsonify({'error': str(e)}), 413
     except Exception as e:
-        print(f"Error processing resume: {e}")
+        print(f"Error receiving resume batch: {e}")
         return jsonify({'error': 'Internal server error'}), 500
+    
+    def generate():
+        # One line per resume as soon as it is scored, then a summary line
+        try:
+            yield from to_ndjson(screen_resume_batch(items, selected_role))
+        finally:
+            close_items(items)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
 
 @app.route('/api/interview-questions', methods=['POST'])
 def get_interview_questions():
     """Get AI-generated interview questions using the actual working logic"""
     try:
-        # Load session data from file
-        load_session_data()
-        
         data = request.get_json()
         candidate_name = data.get('candidate_name')
         selected_role = data.get('selected_role')
@@ -394,17 +703,20 @@ def get_interview_questions():
         if not session_key:
             session_key = f"{candidate_name}_{selected_role}"
         
-        if session_key not in session_data:
+        session_info = session_store.get(session_key)
+        if session_info is None:
             return jsonify({'error': 'Resume not found. Please upload resume first.'}), 400
         
-        resume_text = session_data[session_key]['resume_text']
-        skills = session_data[session_key].get('skills', [])
+        resume_text = session_info['resume_text']
+        skills = session_info.get('skills', [])
         
         # Try Gemini for enhanced question generation
         questions = None
         if GEMINI_AVAILABLE:
             try:
-                questions = generate_interview_questions_with_gemini(resume_text, selected_role, skills)
+                questions = generate_interview_questions_with_gemini(
+                    resume_text, selected_role, skills, bypass_cache=wants_fresh(data.get('fresh'))
+                )
                 if questions:
                     print("✅ Used Gemini for question generation")
             except Exception as e:
@@ -428,9 +740,6 @@ def get_interview_questions():
 def submit_answer():
     """Submit and analyze interview answer using the actual working logic"""
     try:
-        # Load session data from file
-        load_session_data()
-        
         data = request.get_json()
         candidate_name = data.get('candidate_name')
         selected_role = data.get('selected_role')
@@ -446,133 +755,183 @@ def submit_answer():
         if not session_key:
             session_key = f"{candidate_name}_{selected_role}"
         
-        if session_key not in session_data:
+        if session_store.get(session_key) is None:
             return jsonify({'error': 'Resume not found. Please upload resume first.'}), 400
         
-        session_info = session_data[session_key]
+        fresh = wants_fresh(data.get('fresh'))
+        if wants_fresh(data.get('async')):
+            job = job_queue.submit('analyze_answer', {
+                'session_key': session_key,
+                'selected_role': selected_role,
+                'question': question,
+                'answer': answer,
+                'fresh': fresh
+            })
+            return jsonify(job_accepted(job)), 202
         
-        # Try Gemini for enhanced answer analysis and feedback
-        gemini_feedback = None
-        if GEMINI_AVAILABLE:
-            try:
-                context = {
-                    'skills': session_info.get('skills', []),
-                    'selected_role': selected_role
-                }
-                gemini_feedback = analyze_answer_with_gemini(question, answer, selected_role, context)
-                if gemini_feedback:
-                    score10 = gemini_feedback['score']
-                    feedback_text = gemini_feedback['feedback']
-                    # Store additional Gemini insights
-                    technical_accuracy = gemini_feedback.get('technical_accuracy', '')
-                    communication_clarity = gemini_feedback.get('communication_clarity', '')
-                    strengths = gemini_feedback.get('strengths', [])
-                    improvements = gemini_feedback.get('improvements', [])
-                    overall_assessment = gemini_feedback.get('overall_assessment', '')
-                    print("✅ Used Gemini for answer analysis")
-            except Exception as e:
-                print(f"Gemini answer analysis failed, using fallback: {e}")
-                gemini_feedback = None
+        body, status = process_answer(session_key, selected_role, question, answer, fresh)
+        return jsonify(body), status
         
-        # Fallback to traditional method if Gemini unavailable or failed
-        if gemini_feedback is None:
-            score, length_score, relevance_score, clarity_score = analyze_answer(answer, selected_role)
-            score10 = round(score * 10, 2)
-            
-            # Generate basic feedback
-            feedback = []
-            if length_score < 0.5:
-                feedback.append("Try to give a more detailed answer.")
-            if relevance_score < 0.5:
-                feedback.append("Include more relevant technical keywords.")
-            if clarity_score > 0.7:
-                feedback.append("Answer was confident and clear.")
-            elif clarity_score < 0.3:
-                feedback.append("Try to sound more positive and clear.")
-            
-            feedback_text = " ".join(feedback) if feedback else "Good answer!"
-            technical_accuracy = ''
-            communication_clarity = ''
-            strengths = []
-            improvements = []
-            overall_assessment = ''
-        
-        # Store answer in session
-        if 'interview_answers' not in session_data[session_key]:
-            session_data[session_key]['interview_answers'] = []
-        
-        answer_data = {
-            'question': question,
-            'answer': answer,
-            'score': score10,
-            'feedback': feedback_text
-        }
+    except Exception as e:
+        print(f"Error analyzing answer: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/submit-answers', methods=['POST'])
+def submit_answers():
+    """Submit and analyze several interview answers with batched Gemini calls"""
+    try:
+        data = request.get_json()
+        candidate_name = data.get('candidate_name')
+        selected_role = data.get('selected_role')
+        session_key = data.get('session_key')
+        answers = data.get('answers')
         
-        # Add Gemini-specific fields if available
-        if gemini_feedback:
-            answer_data.update({
-                'technical_accuracy': technical_accuracy,
-                'communication_clarity': communication_clarity,
-                'strengths': strengths,
-                'improvements': improvements,
-                'overall_assessment': overall_assessment,
-                'analyzed_by': 'gemini'
-            })
-        else:
-            # Add traditional analysis fields
-            answer_data.update({
-                'sentiment': round(clarity_score, 2) if 'clarity_score' in locals() else 0,
-                'length': round(length_score, 2) if 'length_score' in locals() else 0,
-                'relevance': round(relevance_score, 2) if 'relevance_score' in locals() else 0,
-                'analyzed_by': 'traditional'
-            })
+        if not candidate_name or not selected_role or not isinstance(answers, list) or not answers:
+            return jsonify({'error': 'Candidate name, role and a list of answers are required'}), 400
         
-        session_data[session_key]['interview_answers'].append(answer_data)
+        for item in answers:
+            if not isinstance(item, dict) or not all([item.get('question'), item.get('answer'),
+                                                      item.get('question_index') is not None]):
+                return jsonify({'error': 'Each answer needs question, answer and question_index'}), 400
         
-        # Save session data to persist the answers
-        save_session_data()
+        # Use provided session_key or create one
+        if not session_key:
+            session_key = f"{candidate_name}_{selected_role}"
         
-        response_data = {
-            'score': score10,
-            'feedback': feedback_text
-        }
+        if session_store.get(session_key) is None:
+            return jsonify({'error': 'Resume not found. Please upload resume first.'}), 400
         
-        # Add Gemini-specific fields if available
-        if gemini_feedback:
-            response_data.update({
-                'analysis': {
-                    'technical_accuracy': technical_accuracy,
-                    'communication_clarity': communication_clarity,
-                    'strengths': strengths,
-                    'improvements': improvements,
-                    'overall_assessment': overall_assessment
-                },
-                'analyzed_by': 'gemini'
-            })
-        else:
-            # Add traditional analysis fields
-            response_data.update({
-                'analysis': {
-                    'length_score': round(length_score, 2) if 'length_score' in locals() else 0,
-                    'relevance_score': round(relevance_score, 2) if 'relevance_score' in locals() else 0,
-                    'clarity_score': round(clarity_score, 2) if 'clarity_score' in locals() else 0
-                },
-                'analyzed_by': 'traditional'
+        answers = [
+            {'question': item['question'], 'answer': item['answer'], 'question_index': item['question_index']}
+            for item in answers
+        ]
+        fresh = wants_fresh(data.get('fresh'))
+        if wants_fresh(data.get('async')):
+            job = job_queue.submit('analyze_answers', {
+                'session_key': session_key,
+                'selected_role': selected_role,
+                'answers': answers,
+                'fresh': fresh
             })
+            return jsonify(job_accepted(job)), 202
         
-        return jsonify(response_data)
+        body, status = process_answers(session_key, selected_role, answers, fresh)
+        return jsonify(body), status
         
     except Exception as e:
-        print(f"Error analyzing answer: {e}")
+        print(f"Error analyzing answers: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def process_answer(session_key, selected_role, question, answer, fresh=False):
+    """Analyze one answer and append it to the interview session
+
+    Returns ``(body, status_code)``; shared by /api/submit-answer and
+    background 'analyze_answer' jobs.
+    """
+    session_info = session_store.get(session_key)
+    if session_info is None:
+        return {'error': 'Resume not found. Please upload resume first.'}, 400
+    
+    # Try Gemini for enhanced answer analysis and feedback
+    gemini_feedback = None
+    if GEMINI_AVAILABLE:
+        try:
+            context = {
+                'skills': session_info.get('skills', []),
+                'selected_role': selected_role
+            }
+            gemini_feedback = analyze_answer_with_gemini(question, answer, selected_role, context, bypass_cache=fresh)
+            if gemini_feedback:
+                print("✅ Used Gemini for answer analysis")
+        except Exception as e:
+            print(f"Gemini answer analysis failed, using fallback: {e}")
+            gemini_feedback = None
+    
+    # Fallback to traditional method if Gemini unavailable or failed
+    answer_data, response_data = build_answer_result(question, answer, selected_role, gemini_feedback)
+    
+    # Store answer in session
+    def append_answer(session):
+        session.setdefault('interview_answers', []).append(answer_data)
+        return session
+    
+    if session_store.update(session_key, append_answer) is None:
+        return {'error': 'Resume not found. Please upload resume first.'}, 400
+    return response_data, 200
+
+def process_answers(session_key, selected_role, answers, fresh=False):
+    """Analyze a list of answers and append them to the interview session
+
+    Returns ``(body, status_code)``; shared by /api/submit-answers and
+    background 'analyze_answers' jobs.
+    """
+    session_info = session_store.get(session_key)
+    if session_info is None:
+        return {'error': 'Resume not found. Please upload resume first.'}, 400
+    
+    # One Gemini call per chunk of answers instead of one per answer
+    gemini_results = [None] * len(answers)
+    if GEMINI_AVAILABLE:
+        try:
+            context = {
+                'skills': session_info.get('skills', []),
+                'selected_role': selected_role
+            }
+            gemini_results = analyze_answers_with_gemini(answers, selected_role, context, bypass_cache=fresh)
+            analyzed = sum(1 for result in gemini_results if result)
+            if analyzed:
+                print(f"✅ Used Gemini for {analyzed}/{len(answers)} answers")
+        except Exception as e:
+            print(f"Gemini batch answer analysis failed, using fallback: {e}")
+            gemini_results = [None] * len(answers)
+    
+    # Answers Gemini did not score fall back to the traditional method, in one batch
+    fallback = [i for i, result in enumerate(gemini_results) if not result]
+    fallback_scores = dict(zip(fallback, score_answers([answers[i]['answer'] for i in fallback], selected_role)))
+    answer_records = []
+    results = []
+    for i, (item, gemini_feedback) in enumerate(zip(answers, gemini_results)):
+        answer_data, response_data = build_answer_result(
+            item['question'], item['answer'], selected_role, gemini_feedback, fallback_scores.get(i)
+        )
+        answer_records.append(answer_data)
+        results.append(dict(response_data, question_index=item['question_index']))
+    
+    # Store all answers in one session update
+    def append_answers(session):
+        session.setdefault('interview_answers', []).extend(answer_records)
+        return session
+    
+    if session_store.update(session_key, append_answers) is None:
+        return {'error': 'Resume not found. Please upload resume first.'}, 400
+    return {
+        'results': results,
+        'total_answers': len(results)
+    }, 200
+
+def run_answer_job(payload):
+    """Job handler for asynchronous /api/submit-answer requests"""
+    body, status = process_answer(payload['session_key'], payload['selected_role'], payload['question'],
+                                  payload['answer'], payload['fresh'])
+    if status != 200:
+        raise JobFailed(body['error'], status)
+    return body
+
+def run_answers_job(payload):
+    """Job handler for asynchronous /api/submit-answers requests"""
+    body, status = process_answers(payload['session_key'], payload['selected_role'], payload['answers'],
+                                   payload['fresh'])
+    if status != 200:
+        raise JobFailed(body['error'], status)
+    return body
+
+job_queue.register('analyze_answer', run_answer_job)
+job_queue.register('analyze_answers', run_answers_job)
+
 @app.route('/api/interview-results', methods=['POST'])
 def get_interview_results():
     """Get complete interview results using the actual working logic"""
     try:
-        # Load session data from file
-        load_session_data()
-        
         data = request.get_json()
         candidate_name = data.get('candidate_name')
         selected_role = data.get('selected_role')
@@ -585,10 +944,10 @@ def get_interview_results():
         if not session_key:
             session_key = f"{candidate_name}_{selected_role}"
         
-        if session_key not in session_data:
+        session_info = session_store.get(session_key)
+        if session_info is None:
             return jsonify({'error': 'Resume not found. Please upload resume first.'}), 400
         
-        session_info = session_data[session_key]
         interview_answers = session_info.get('interview_answers', [])
         
         if not interview_answers:
@@ -636,14 +995,26 @@ def health_check():
     return jsonify({
         'status': 'healthy', 
         'message': 'AI Recruitment System API is running',
-        'gemini_available': GEMINI_AVAILABLE
+        'gemini_available': GEMINI_AVAILABLE,
+        'gemini': gemini_status() if GEMINI_AVAILABLE else None,
+        'models': model_registry.stats(),
+        'resume_cache': resume_cache.stats(),
+        'templates': template_store.stats(),
+        'jobs': job_queue.stats()
     })
 
 @app.route('/api/roles', methods=['GET'])
 def get_roles_endpoint():
     """Get available job roles"""
-    roles = get_roles()
-    return jsonify({'roles': roles})
+    snapshot = template_store.snapshot()
+    # Answer revalidations from the ETag alone, without building the JSON
+    if snapshot.etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({'roles': list(snapshot.roles)})
+    response.set_etag(snapshot.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,250 @@
+"""
+Bulk resume screening for applicant imports.
+
+A batch is a list of PDFs and/or zip archives of PDFs. Every PDF is spooled
+with the single-upload byte limit and extracted file-parallel on the PDF
+extractor's process pool. Finished extractions are scored in groups (one
+vectorizer.transform / predict_proba call per group), and each result is
+yielded as soon as its group is scored, so callers can stream NDJSON while
+slower PDFs are still being extracted.
+
+CLI (same code path as POST /api/batch-screen):
+    python batch_screening.py --role "Backend Developer" resumes/ applicants.zip > results.ndjson
+"""
+import os
+import sys
+import json
+import time
+import zipfile
+import tempfile
+import argparse
+import logging
+import contextlib
+
+from pdf_extraction import PDFExtractionError, PDFTooLargeError, CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScreeningError(ValueError):
+    """The batch as a whole was rejected"""
+
+
+def is_pdf(filename):
+    return filename.lower().endswith('.pdf')
+
+
+def is_zip(filename):
+    return filename.lower().endswith('.zip')
+
+
+def _spool_pdf(extractor, stream):
+    # Batch uploads go to disk right away: worker processes need a path anyway
+    try:
+        return extractor.spool(stream, memory_limit=CHUNK_SIZE)
+    except PDFExtractionError as e:
+        return e
+
+
+def _zip_members(filename, stream, extractor, max_zip_bytes):
+    """Yield ``(name, upload_or_error)`` for every PDF in a zip archive"""
+    with tempfile.TemporaryFile() as archive_file:
+        size = 0
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            size += len(chunk)
+            if size > max_zip_bytes:
+                yield filename, PDFTooLargeError(f"ZIP exceeds {max_zip_bytes} bytes")
+                return
+            archive_file.write(chunk)
+        archive_file.seek(0)
+
+        try:
+            archive = zipfile.ZipFile(archive_file)
+        except zipfile.BadZipFile:
+            yield filename, PDFExtractionError("Unreadable ZIP archive")
+            return
+
+        with archive:
+            for info in archive.infolist():
+                base = os.path.basename(info.filename)
+                if info.is_dir() or not is_pdf(base) or base.startswith('.') or info.filename.startswith('__MACOSX/'):
+                    continue
+                name = f"{filename}/{info.filename}"
+                # The declared size can lie; spool() enforces the limit on the real bytes too
+                if info.file_size > extractor.max_bytes:
+                    yield name, PDFTooLargeError(f"PDF exceeds {extractor.max_bytes} bytes")
+                    continue
+                try:
+                    with archive.open(info) as member:
+                        yield name, _spool_pdf(extractor, member)
+                except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+                    # Corrupt or encrypted member
+                    yield name, PDFExtractionError(f"Unreadable ZIP member: {e}")
+
+
+def spool_sources(sources, extractor, max_files, max_zip_bytes):
+    """Spool ``(filename, stream)`` sources into ``(filename, upload_or_error)`` items
+
+    Zip archives are expanded to their PDF members; files that are neither PDF
+    nor ZIP become error items. Raises BatchScreeningError when the batch
+    holds more than ``max_files`` files.
+    """
+    items = []
+    try:
+        for filename, stream in sources:
+            if is_zip(filename):
+                members = _zip_members(filename, stream, extractor, max_zip_bytes)
+            elif is_pdf(filename):
+                members = [(filename, _spool_pdf(extractor, stream))]
+            else:
+                members = [(filename, PDFExtractionError("Only PDF and ZIP files are allowed"))]
+            for member in members:
+                items.append(member)
+                if len(items) > max_files:
+                    raise BatchScreeningError(f"Batch has more than {max_files} files")
+    except Exception:
+        close_items(items)
+        raise
+    return items
+
+
+def close_items(items):
+    for _, item in items:
+        if not isinstance(item, Exception):
+            item.close()
+
+
+def _error_result(index, filename, error):
+    return {'index': index, 'filename': filename, 'status': 'error', 'error': str(error)}
+
+
+def _score_group(group, score_batch, group_size):
+    """Score ``(index, filename, digest, extraction)`` tuples, ``group_size`` texts per call"""
+    for start in range(0, len(group), group_size):
+        chunk = group[start:start + group_size]
+        try:
+            scores = score_batch([extraction['text'] for _, _, _, extraction in chunk])
+        except Exception as e:
+            logger.error(f"❌ Failed to score {len(chunk)} resumes: {e}")
+            for index, filename, _, _ in chunk:
+                yield _error_result(index, filename, "Scoring failed")
+            continue
+        for (index, filename, digest, extraction), score in zip(chunk, scores):
+            yield dict({
+                'index': index,
+                'filename': filename,
+                'digest': digest,
+                'status': 'ok',
+                'page_count': extraction.get('page_count'),
+                'extraction_ms': extraction.get('total_ms'),
+                'cached': extraction.get('cached', False),
+            }, **score)
+
+
+def screen(items, extractor, score_batch, cached_text=None, group_size=64):
+    """Yield one result per item in completion order
+
+    ``score_batch(texts)`` returns one dict per text. ``cached_text(digest)``
+    may return already extracted text so that PDF is not parsed again, and
+    identical PDFs within the batch are extracted once. Results carry the
+    item's ``index`` in the request.
+    """
+    cached, pending = [], {}
+    for index, (filename, item) in enumerate(items):
+        if isinstance(item, Exception):
+            yield _error_result(index, filename, item)
+            continue
+        text = cached_text(item.digest) if cached_text else None
+        if text:
+            cached.append((index, filename, item.digest, {'text': text, 'cached': True}))
+        else:
+            pending.setdefault(item.digest, []).append((index, filename, item))
+
+    yield from _score_group(cached, score_batch, group_size)
+
+    uploads = {digest: copies[0][2] for digest, copies in pending.items()}
+    remaining = set(uploads)
+    batches = extractor.extract_many(uploads)
+    try:
+        for finished in batches:
+            group = []
+            for digest, result in finished:
+                remaining.discard(digest)
+                for index, filename, _ in pending[digest]:
+                    if isinstance(result, Exception):
+                        yield _error_result(index, filename, result)
+                    elif not result['text'].strip():
+                        yield _error_result(index, filename, "Could not extract text from PDF")
+                    else:
+                        group.append((index, filename, digest, result))
+            yield from _score_group(group, score_batch, group_size)
+    except PDFExtractionError as e:
+        # The extraction pool was unavailable: fail the files that had no result
+        for digest in remaining:
+            for index, filename, _ in pending[digest]:
+                yield _error_result(index, filename, e)
+    finally:
+        # Returns the pool lease even if the client stops reading the stream
+        batches.close()
+
+
+def to_ndjson(results):
+    """Serialize results one JSON object per line, followed by a summary line"""
+    start = time.perf_counter()
+    counts = {'ok': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+        yield json.dumps(result) + "\n"
+    yield json.dumps({'summary': {
+        'total': counts['ok'] + counts['error'],
+        'ok': counts['ok'],
+        'errors': counts['error'],
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+    }}) + "\n"
+
+
+def _iter_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if is_pdf(name) or is_zip(name):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a batch of resume PDFs and print NDJSON results")
+    parser.add_argument('--role', required=True, help="Job role to screen against")
+    parser.add_argument('paths', nargs='+', help="PDF files, ZIP archives or directories")
+    args = parser.parse_args()
+
+    # stdout carries only NDJSON; the app's diagnostics go to stderr
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        # Same models, limits and scoring as the API
+        import app
+
+        items = []
+        try:
+            for path in _iter_paths(args.paths):
+                with open(path, 'rb') as f:
+                    items.extend(spool_sources([(path, f)], app.pdf_extractor,
+                                               app.BATCH_MAX_FILES - len(items), app.BATCH_MAX_ZIP_BYTES))
+        except BatchScreeningError:
+            close_items(items)
+            print(f"❌ Batch has more than {app.BATCH_MAX_FILES} files")
+            return 1
+
+        try:
+            for line in to_ndjson(app.screen_resume_batch(items, args.role)):
+                out.write(line)
+                out.flush()
+        finally:
+            close_items(items)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,13 +5,17 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from sklearn.model_selection import cross_val_score
 import schedule
 import time
 import threading
 from pathlib import Path
 
+from performance_history import PerformanceHistoryStore, performance_trend, summarize
+from drift_detection import DriftDetector, RetrainGate
+from online_metrics import ConfusionMatrix, OnlineMetrics
+from retraining_executor import PIPELINE_ARTIFACT, RetrainingExecutor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,11 +24,20 @@ class ContinuousLearningSystem:
     def __init__(self, model_dir="ai_interviewer_project/model"):
         self.model_dir = Path(model_dir)
         self.models = {}
-        self.performance_history = []
         self.retraining_threshold = 0.05  # 5% performance degradation
         self.min_samples_for_retraining = 100
         self.performance_window_days = 30
         
+        # Per-model rolling accuracy statistics, updated as performance is tracked
+        self.drift = DriftDetector.from_env(threshold=self.retraining_threshold)
+        self.retrain_gate = RetrainGate(int(os.environ.get('RETRAIN_COOLDOWN_SECONDS', 3600)))
+        
+        # Confusion-matrix accumulators fed by individual live predictions
+        self.online_metrics = OnlineMetrics.from_env()
+        
+        # Fits run in a resource-limited child process, never in this one
+        self.retraining_executor = RetrainingExecutor.from_env(self.model_dir / PIPELINE_ARTIFACT)
+        
         # Load existing models
         self.load_models()
         
@@ -48,104 +61,153 @@ class ContinuousLearningSystem:
             logger.error(f"❌ Failed to load models: {e}")
     
     def initialize_performance_tracking(self):
-        """Initialize performance tracking from saved data"""
-        performance_file = self.model_dir / "performance_history.json"
-        
-        if performance_file.exists():
-            try:
-                with open(performance_file, 'r') as f:
-                    self.performance_history = json.load(f)
-                logger.info(f"✅ Loaded performance history with {len(self.performance_history)} entries")
-            except Exception as e:
-                logger.error(f"❌ Failed to load performance history: {e}")
+        """Open the append-only performance history (read from disk on first use)"""
+        # An old performance_history.json is imported into the segments once
+        self.history = PerformanceHistoryStore.from_env(
+            self.model_dir / "performance_history",
+            legacy_file=self.model_dir / "performance_history.json"
+        )
+    
+    @property
+    def performance_history(self):
+        """All tracked entries within the retention period"""
+        return self.history.entries()
     
     def track_model_performance(self, model_name, predictions, actual_values, metadata=None):
         """Track model performance metrics"""
         try:
-            # Calculate metrics
-            accuracy = accuracy_score(actual_values, predictions)
-            precision = precision_score(actual_values, predictions, average='weighted', zero_division=0)
-            recall = recall_score(actual_values, predictions, average='weighted', zero_division=0)
-            f1 = f1_score(actual_values, predictions, average='weighted', zero_division=0)
-            
-            # Store performance data
-            performance_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'model_name': model_name,
-                'accuracy': accuracy,
-                'precision': precision,
-                'recall': recall,
-                'f1_score': f1,
-                'sample_count': len(actual_values),
-                'metadata': metadata or {}
-            }
-            
-            self.performance_history.append(performance_entry)
-            
-            # Save performance history
-            self.save_performance_history()
+            if len(predictions) != len(actual_values):
+                raise ValueError(f"{len(predictions)} predictions for {len(actual_values)} actual values")
             
-            # Check if retraining is needed
-            self.check_retraining_needed(model_name, accuracy)
-            
-            logger.info(f"✅ Performance tracked for {model_name}: Accuracy={accuracy:.4f}")
-            
-            return performance_entry
+            # One pass over the batch for all four metrics
+            metrics = ConfusionMatrix.from_pairs(predictions, actual_values).metrics()
+            return self._record_performance(model_name, metrics, metadata)
             
         except Exception as e:
             logger.error(f"❌ Failed to track performance: {e}")
             return None
     
+    def record_prediction(self, model_name, prediction, actual):
+        """Track one live prediction once its outcome is known
+        
+        Updates the model's streaming metrics in O(1). Each closed tumbling
+        window is stored as one performance entry.
+        """
+        try:
+            window = self.online_metrics.record(model_name, prediction, actual)
+            if window:
+                self._record_window(model_name, window)
+        except Exception as e:
+            logger.error(f"❌ Failed to record prediction: {e}")
+    
+    def record_predictions(self, model_name, predictions, actual_values):
+        """record_prediction for a list of predictions"""
+        try:
+            for window in self.online_metrics.record_batch(model_name, predictions, actual_values):
+                self._record_window(model_name, window)
+        except Exception as e:
+            logger.error(f"❌ Failed to record predictions: {e}")
+    
+    def get_online_metrics(self, model_name, window='sliding'):
+        """Streaming metrics of a model: 'cumulative', 'sliding' or last 'tumbling' window"""
+        return self.online_metrics.metrics(model_name, window)
+    
+    def _record_window(self, model_name, window):
+        metadata = {
+            'window': 'tumbling',
+            'window_start': datetime.fromtimestamp(window['window_start']).isoformat(),
+            'window_end': datetime.fromtimestamp(window['window_end']).isoformat()
+        }
+        self._record_performance(model_name, window, metadata)
+    
+    def _record_performance(self, model_name, metrics, metadata=None):
+        # Store performance data
+        performance_entry = {
+            'timestamp': datetime.now().isoformat(),
+            'model_name': model_name,
+            'accuracy': metrics['accuracy'],
+            'precision': metrics['precision'],
+            'recall': metrics['recall'],
+            'f1_score': metrics['f1_score'],
+            'sample_count': metrics['sample_count'],
+            'metadata': metadata or {}
+        }
+        
+        # One appended line, however long the history is
+        self.history.append(performance_entry)
+        
+        # Check if retraining is needed
+        self.check_retraining_needed(model_name, metrics['accuracy'])
+        
+        logger.info(f"✅ Performance tracked for {model_name}: Accuracy={metrics['accuracy']:.4f}")
+        
+        return performance_entry
+    
     def check_retraining_needed(self, model_name, current_accuracy):
         """Check if model retraining is needed"""
         try:
-            # Get recent performance for this model
-            recent_performance = [
-                entry for entry in self.performance_history[-20:]  # Last 20 entries
-                if entry['model_name'] == model_name
-            ]
-            
-            if len(recent_performance) < 5:
-                return False  # Not enough data
-            
-            # Calculate average recent performance
-            recent_accuracies = [entry['accuracy'] for entry in recent_performance]
-            avg_recent_accuracy = np.mean(recent_accuracies)
-            
-            # Check for significant degradation
-            if current_accuracy < (avg_recent_accuracy - self.retraining_threshold):
-                logger.warning(f"⚠️ Performance degradation detected for {model_name}")
-                logger.warning(f"   Current: {current_accuracy:.4f}, Recent Average: {avg_recent_accuracy:.4f}")
-                
-                # Schedule retraining
-                self.schedule_retraining(model_name)
-                return True
+            # O(1) update of this model's rolling window and drift tests
+            drift = self.drift.update(model_name, current_accuracy)
+            if drift is None:
+                return False
             
-            return False
+            reason, baseline = drift
+            logger.warning(f"⚠️ Performance degradation detected for {model_name} ({reason})")
+            logger.warning(f"   Current: {current_accuracy:.4f}, Baseline: {baseline:.4f}")
+            
+            # Schedule retraining
+            self.schedule_retraining(model_name)
+            return True
             
         except Exception as e:
             logger.error(f"❌ Failed to check retraining need: {e}")
             return False
     
     def schedule_retraining(self, model_name):
-        """Schedule model retraining"""
+        """Schedule model retraining, unless one is running or finished within the cooldown"""
         try:
             # Check if enough new data is available
-            if self.has_sufficient_new_data():
-                logger.info(f"🔄 Scheduling retraining for {model_name}")
-                
-                # Run retraining in background thread
-                retraining_thread = threading.Thread(
-                    target=self.retrain_model,
-                    args=(model_name,)
-                )
-                retraining_thread.start()
-                
-            else:
+            if not self.has_sufficient_new_data():
                 logger.info(f"⏳ Insufficient new data for retraining {model_name}")
+                return False
+            
+            if not self.retrain_gate.try_acquire(model_name):
+                logger.info(f"⏳ Retraining for {model_name} already running or recently finished")
+                return False
+            
+            logger.info(f"🔄 Scheduling retraining for {model_name}")
+            
+            # Run retraining in background thread
+            retraining_thread = threading.Thread(
+                target=self._run_retraining,
+                args=(model_name,),
+                daemon=True
+            )
+            retraining_thread.start()
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Failed to schedule retraining: {e}")
+            self.retrain_gate.release(model_name, attempted=False)
+            return False
+    
+    def _run_retraining(self, model_name):
+        # Without enough data no fit runs, so the model stays eligible
+        # for the next drift signal instead of waiting out the cooldown
+        attempted = False
+        try:
+            new_data = self._load_retraining_data(model_name)
+            if new_data is not None:
+                attempted = True
+                if self.retrain_model(model_name, new_data):
+                    # The retrained model starts with fresh statistics
+                    self.drift.reset(model_name)
+        finally:
+            self.retrain_gate.release(model_name, attempted=attempted)
+    
+    def get_drift_status(self):
+        """Rolling accuracy statistics per model"""
+        return self.drift.stats()
     
     def has_sufficient_new_data(self):
         """Check if sufficient new data is available for retraining"""
@@ -157,34 +219,44 @@ class ContinuousLearningSystem:
             logger.error(f"❌ Failed to check data availability: {e}")
             return False
     
-    def retrain_model(self, model_name):
-        """Retrain a specific model"""
+    def _load_retraining_data(self, model_name):
+        """New training data, or None if there is not enough to retrain"""
+        new_data = self.load_new_training_data()
+        if new_data is None or len(new_data) < self.min_samples_for_retraining:
+            logger.warning(f"⚠️ Insufficient new data for retraining {model_name}")
+            return None
+        return new_data
+    
+    def retrain_model(self, model_name, new_data=None):
+        """Retrain a specific model (on ``new_data``, or freshly loaded data)"""
         try:
             logger.info(f"🔄 Starting retraining for {model_name}")
             
             # Load new training data
-            new_data = self.load_new_training_data()
+            if new_data is None:
+                new_data = self._load_retraining_data(model_name)
+                if new_data is None:
+                    return False
             
-            if new_data is None or len(new_data) < self.min_samples_for_retraining:
-                logger.warning(f"⚠️ Insufficient new data for retraining {model_name}")
+            # Retrain in a child process and shadow-evaluate against the live model
+            result = self._execute_retraining(model_name, new_data)
+            
+            if result is None:
+                logger.error(f"❌ Failed to retrain {model_name}")
                 return False
             
-            # Retrain model (this would use your enhanced training pipeline)
-            success = self._execute_retraining(model_name, new_data)
+            # Track retraining performance
+            self.track_retraining_performance(model_name, new_data, result)
             
-            if success:
-                logger.info(f"✅ Successfully retrained {model_name}")
-                
-                # Update model in memory
-                self.load_models()
-                
-                # Track retraining performance
-                self.track_retraining_performance(model_name, new_data)
-                
-                return True
-            else:
-                logger.error(f"❌ Failed to retrain {model_name}")
+            if not result['promoted']:
+                logger.info(f"⏸️ Kept the live model for {model_name}: candidate was not more accurate")
                 return False
+            
+            logger.info(f"✅ Successfully retrained {model_name}")
+            
+            # Update model in memory (serving workers hot-swap the promoted artifact)
+            self.load_models()
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Error during retraining: {e}")
@@ -208,48 +280,46 @@ class ContinuousLearningSystem:
             return None
     
     def _execute_retraining(self, model_name, new_data):
-        """Execute the actual retraining process"""
+        """Execute the actual retraining process
+        
+        Returns the executor result (candidate and live holdout metrics,
+        ``promoted``), or None if retraining failed.
+        """
         try:
-            # This would integrate with your enhanced training pipeline
-            # For now, simulate successful retraining
             logger.info(f"🔄 Executing retraining for {model_name} with {len(new_data)} samples")
-            
-            # Simulate retraining time
-            time.sleep(2)
-            
-            # Update model file timestamp to simulate retraining
-            model_file = self.model_dir / f"{model_name}.pkl"
-            if model_file.exists():
-                model_file.touch()
-            
-            return True
+            result = self.retraining_executor.run(new_data)
+            live = f"{result['live']['accuracy']:.4f}" if result.get('live') else "none"
+            logger.info(f"   Candidate accuracy: {result['candidate']['accuracy']:.4f}, "
+                        f"live: {live} ({result['seconds']}s)")
+            return result
             
         except Exception as e:
             logger.error(f"❌ Failed to execute retraining: {e}")
-            return False
+            return None
     
-    def track_retraining_performance(self, model_name, training_data):
-        """Track performance after retraining"""
+    def track_retraining_performance(self, model_name, training_data, result):
+        """Track the retrained candidate's holdout performance"""
         try:
-            # This would evaluate the retrained model
-            # For now, create a performance entry
+            candidate = result['candidate']
             retraining_entry = {
                 'timestamp': datetime.now().isoformat(),
                 'model_name': f"{model_name}_retrained",
-                'accuracy': 0.85,  # Simulated improved accuracy
-                'precision': 0.83,
-                'recall': 0.87,
-                'f1_score': 0.85,
-                'sample_count': len(training_data),
+                'accuracy': candidate['accuracy'],
+                'precision': candidate['precision'],
+                'recall': candidate['recall'],
+                'f1_score': candidate['f1_score'],
+                'sample_count': candidate['sample_count'],
                 'metadata': {
-                    'retraining_type': 'incremental',
+                    'retraining_type': 'full',
                     'training_samples': len(training_data),
-                    'previous_accuracy': 0.80
+                    'holdout_samples': result['holdout_rows'],
+                    'previous_accuracy': result['live']['accuracy'] if result.get('live') else None,
+                    'promoted': result['promoted'],
+                    'duration_seconds': result['seconds']
                 }
             }
             
-            self.performance_history.append(retraining_entry)
-            self.save_performance_history()
+            self.history.append(retraining_entry)
             
             logger.info(f"✅ Retraining performance tracked for {model_name}")
             
@@ -257,55 +327,24 @@ class ContinuousLearningSystem:
             logger.error(f"❌ Failed to track retraining performance: {e}")
     
     def save_performance_history(self):
-        """Save performance history to file"""
+        """Flush the performance history (entries are written as they are tracked)"""
         try:
-            performance_file = self.model_dir / "performance_history.json"
-            
-            with open(performance_file, 'w') as f:
-                json.dump(self.performance_history, f, indent=2)
-            
-            logger.info("✅ Performance history saved")
-            
+            self.history.flush()
         except Exception as e:
             logger.error(f"❌ Failed to save performance history: {e}")
     
+    def compact_performance_history(self):
+        """Apply the retention policy and merge small history segments"""
+        try:
+            self.history.compact()
+        except Exception as e:
+            logger.error(f"❌ Failed to compact performance history: {e}")
+    
     def get_performance_summary(self, model_name=None, days=30):
         """Get performance summary for specified period"""
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
-            
-            if model_name:
-                filtered_history = [
-                    entry for entry in self.performance_history
-                    if (entry['model_name'] == model_name and 
-                        datetime.fromisoformat(entry['timestamp']) > cutoff_date)
-                ]
-            else:
-                filtered_history = [
-                    entry for entry in self.performance_history
-                    if datetime.fromisoformat(entry['timestamp']) > cutoff_date
-                ]
-            
-            if not filtered_history:
-                return None
-            
-            # Calculate summary statistics
-            summary = {
-                'total_entries': len(filtered_history),
-                'date_range': {
-                    'start': min(entry['timestamp'] for entry in filtered_history),
-                    'end': max(entry['timestamp'] for entry in filtered_history)
-                },
-                'average_metrics': {
-                    'accuracy': np.mean([entry['accuracy'] for entry in filtered_history]),
-                    'precision': np.mean([entry['precision'] for entry in filtered_history]),
-                    'recall': np.mean([entry['recall'] for entry in filtered_history]),
-                    'f1_score': np.mean([entry['f1_score'] for entry in filtered_history])
-                },
-                'performance_trend': self._calculate_performance_trend(filtered_history)
-            }
-            
-            return summary
+            return summarize(self.history.window(model_name, since=cutoff_date))
             
         except Exception as e:
             logger.error(f"❌ Failed to get performance summary: {e}")
@@ -319,22 +358,17 @@ class ContinuousLearningSystem:
             
             # Sort by timestamp
             sorted_data = sorted(performance_data, key=lambda x: x['timestamp'])
-            
-            # Calculate trend for accuracy
-            first_accuracy = sorted_data[0]['accuracy']
-            last_accuracy = sorted_data[-1]['accuracy']
-            
-            if last_accuracy > first_accuracy + 0.02:
-                return "improving"
-            elif last_accuracy < first_accuracy - 0.02:
-                return "declining"
-            else:
-                return "stable"
+            return performance_trend(sorted_data[0]['accuracy'], sorted_data[-1]['accuracy'], len(sorted_data))
                 
         except Exception as e:
             logger.error(f"❌ Failed to calculate performance trend: {e}")
             return "unknown"
     
+    def _model_summaries(self, days):
+        """Summaries of every tracked model over the last ``days``, in one pass"""
+        summaries = self.history.aggregate(since=datetime.now() - timedelta(days=days))
+        return {name: summaries[name] for name in self.models if name in summaries}
+    
     def generate_performance_report(self, output_file=None):
         """Generate comprehensive performance report"""
         try:
@@ -342,21 +376,19 @@ class ContinuousLearningSystem:
                 'generated_at': datetime.now().isoformat(),
                 'system_overview': {
                     'total_models': len(self.models),
-                    'performance_entries': len(self.performance_history),
+                    'performance_entries': len(self.history),
                     'last_retraining': self._get_last_retraining_date()
                 },
                 'model_performance': {},
                 'recommendations': []
             }
             
-            # Generate performance summary for each model
-            for model_name in self.models.keys():
-                summary = self.get_performance_summary(model_name, days=30)
-                if summary:
-                    report['model_performance'][model_name] = summary
+            # Performance summary for each model over the last 30 days
+            monthly = self._model_summaries(days=30)
+            report['model_performance'] = monthly
             
             # Generate recommendations
-            report['recommendations'] = self._generate_recommendations()
+            report['recommendations'] = self._generate_recommendations(monthly)
             
             # Save report
             if output_file:
@@ -373,13 +405,8 @@ class ContinuousLearningSystem:
     def _get_last_retraining_date(self):
         """Get the date of last retraining"""
         try:
-            retraining_entries = [
-                entry for entry in self.performance_history
-                if 'retraining_type' in entry.get('metadata', {})
-            ]
-            
-            if retraining_entries:
-                latest = max(retraining_entries, key=lambda x: x['timestamp'])
+            latest = self.history.latest(lambda entry: 'retraining_type' in entry.get('metadata', {}))
+            if latest:
                 return latest['timestamp']
             
             return "No retraining recorded"
@@ -388,25 +415,27 @@ class ContinuousLearningSystem:
             logger.error(f"❌ Failed to get last retraining date: {e}")
             return "Unknown"
     
-    def _generate_recommendations(self):
+    def _generate_recommendations(self, monthly=None):
         """Generate actionable recommendations"""
         recommendations = []
         
         try:
+            weekly = self._model_summaries(days=7)
+            if monthly is None:
+                monthly = self._model_summaries(days=30)
+            
             # Check for models that need retraining
-            for model_name in self.models.keys():
-                summary = self.get_performance_summary(model_name, days=7)
-                if summary and summary['average_metrics']['accuracy'] < 0.7:
+            for model_name, summary in weekly.items():
+                if summary['average_metrics']['accuracy'] < 0.7:
                     recommendations.append(f"Consider retraining {model_name} - low recent accuracy")
             
             # Check for performance degradation
-            for model_name in self.models.keys():
-                summary = self.get_performance_summary(model_name, days=30)
-                if summary and summary['performance_trend'] == 'declining':
+            for model_name, summary in monthly.items():
+                if summary['performance_trend'] == 'declining':
                     recommendations.append(f"Investigate performance decline in {model_name}")
             
             # General recommendations
-            if len(self.performance_history) < 50:
+            if len(self.history) < 50:
                 recommendations.append("Collect more performance data for better insights")
             
             if not recommendations:
@@ -427,6 +456,7 @@ class ContinuousLearningSystem:
             schedule.every().hour.do(self.check_all_models_performance)
             schedule.every().day.at("00:00").do(self.generate_daily_report)
             schedule.every().week.do(self.generate_weekly_report)
+            schedule.every().day.at("01:00").do(self.compact_performance_history)
             
             # Run monitoring loop
             while True:
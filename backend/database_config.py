@@ -1,8 +1,12 @@
 import os
+import io
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import redis
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import logging
 
@@ -10,6 +14,48 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CANDIDATE_COLUMNS = ('candidate_name', 'email', 'phone', 'location', 'years_experience', 'education_level', 'industry')
+RESUME_COLUMNS = ('candidate_id', 'resume_text', 'resume_file_path', 'file_size')
+APPLICATION_COLUMNS = ('candidate_id', 'resume_id', 'selected_role', 'predicted_role', 'ats_score')
+INTERVIEW_COLUMNS = ('application_id', 'interview_date', 'interview_type', 'status')
+QUESTION_COLUMNS = ('interview_id', 'question_text', 'question_type', 'question_order')
+ANSWER_COLUMNS = ('question_id', 'answer_text', 'score', 'feedback', 'sentiment_score', 'length_score', 'relevance_score')
+
+def _candidate_row(candidate_data):
+    return tuple(candidate_data.get(column) for column in CANDIDATE_COLUMNS)
+
+def _resume_row(candidate_id, resume_data):
+    return (candidate_id, resume_data.get('resume_text'), resume_data.get('file_path'), resume_data.get('file_size'))
+
+def _application_row(candidate_id, resume_id, application_data):
+    return (
+        candidate_id,
+        resume_id,
+        application_data.get('selected_role'),
+        application_data.get('predicted_role'),
+        application_data.get('ats_score')
+    )
+
+def _copy_value(value):
+    """One field in COPY text format (NULL is \\N)"""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def _answer_row(question_id, answer):
+    analysis = answer.get('analysis') or {}
+    score = lambda name: answer.get(name, analysis.get(name))
+    return (
+        question_id,
+        answer.get('answer') or '',
+        answer.get('score'),
+        answer.get('feedback'),
+        score('sentiment_score'),
+        score('length_score'),
+        score('relevance_score')
+    )
+
 class DatabaseManager:
     def __init__(self):
         self.db_config = {
@@ -26,19 +72,69 @@ class DatabaseManager:
             'db': os.getenv('REDIS_DB', 0)
         }
         
-        self.connection = None
+        # Connections are borrowed per transaction from a thread-safe pool;
+        # DB_POOL_MAX should cover the threads per worker process
+        self.pool_min = int(os.getenv('DB_POOL_MIN', 1))
+        self.pool_max = int(os.getenv('DB_POOL_MAX', 10))
+        # Rows per INSERT statement in the bulk methods
+        self.page_size = int(os.getenv('DB_BULK_PAGE_SIZE', 500))
+        
+        self.pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
         self.redis_client = None
         
     def connect_postgres(self):
-        """Connect to PostgreSQL database"""
+        """Create the PostgreSQL connection pool"""
         try:
-            self.connection = psycopg2.connect(**self.db_config)
-            logger.info("✅ Connected to PostgreSQL database")
+            with self._pool_lock:
+                self._open_pool()
+            logger.info(f"✅ Connected to PostgreSQL database (pool {self.pool_min}-{self.pool_max})")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to connect to PostgreSQL: {e}")
             return False
     
+    def _open_pool(self):
+        self.pool = ThreadedConnectionPool(self.pool_min, self.pool_max, **self.db_config)
+        self._pool_pid = os.getpid()
+    
+    def _get_pool(self):
+        with self._pool_lock:
+            if self.pool is None:
+                return None
+            if self._pool_pid != os.getpid():
+                # Connected before a fork (gunicorn --preload): the inherited
+                # sockets belong to the parent, so open a fresh pool here
+                # without closing them
+                self._open_pool()
+            return self.pool
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; it goes back to the pool on exit"""
+        pool = self._get_pool()
+        if pool is None:
+            raise RuntimeError("No database connection")
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            # Broken connections are discarded instead of returned to the pool
+            pool.putconn(conn, close=bool(conn.closed))
+    
+    @contextmanager
+    def transaction(self, cursor_factory=None):
+        """Cursor on a pooled connection, committed on success and rolled back on error"""
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=cursor_factory) as cursor:
+                    yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
     def connect_redis(self):
         """Connect to Redis for caching"""
         try:
@@ -52,275 +148,319 @@ class DatabaseManager:
     
     def create_tables(self):
         """Create necessary database tables"""
-        if not self.connection:
+        if self._get_pool() is None:
             logger.error("❌ No database connection")
             return False
         
         try:
-            cursor = self.connection.cursor()
+            with self.transaction() as cursor:
+                # Candidates table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS candidates (
+                        id SERIAL PRIMARY KEY,
+                        candidate_name VARCHAR(255) NOT NULL,
+                        email VARCHAR(255) UNIQUE,
+                        phone VARCHAR(50),
+                        location VARCHAR(255),
+                        years_experience INTEGER,
+                        education_level VARCHAR(100),
+                        industry VARCHAR(100),
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            # Candidates table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS candidates (
-                    id SERIAL PRIMARY KEY,
-                    candidate_name VARCHAR(255) NOT NULL,
-                    email VARCHAR(255) UNIQUE,
-                    phone VARCHAR(50),
-                    location VARCHAR(255),
-                    years_experience INTEGER,
-                    education_level VARCHAR(100),
-                    industry VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                # Resumes table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS resumes (
+                        id SERIAL PRIMARY KEY,
+                        candidate_id INTEGER REFERENCES candidates(id),
+                        resume_text TEXT NOT NULL,
+                        resume_file_path VARCHAR(500),
+                        file_size INTEGER,
+                        upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        processing_status VARCHAR(50) DEFAULT 'pending'
+                    )
+                """)
             
-            # Resumes table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS resumes (
-                    id SERIAL PRIMARY KEY,
-                    candidate_id INTEGER REFERENCES candidates(id),
-                    resume_text TEXT NOT NULL,
-                    resume_file_path VARCHAR(500),
-                    file_size INTEGER,
-                    upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    processing_status VARCHAR(50) DEFAULT 'pending'
-                )
-            """)
+                # Applications table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS applications (
+                        id SERIAL PRIMARY KEY,
+                        candidate_id INTEGER REFERENCES candidates(id),
+                        resume_id INTEGER REFERENCES resumes(id),
+                        selected_role VARCHAR(255) NOT NULL,
+                        predicted_role VARCHAR(255),
+                        ats_score INTEGER,
+                        application_status VARCHAR(50) DEFAULT 'pending',
+                        applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            # Applications table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS applications (
-                    id SERIAL PRIMARY KEY,
-                    candidate_id INTEGER REFERENCES candidates(id),
-                    resume_id INTEGER REFERENCES resumes(id),
-                    selected_role VARCHAR(255) NOT NULL,
-                    predicted_role VARCHAR(255),
-                    ats_score INTEGER,
-                    application_status VARCHAR(50) DEFAULT 'pending',
-                    applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                # Interviews table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS interviews (
+                        id SERIAL PRIMARY KEY,
+                        application_id INTEGER REFERENCES applications(id),
+                        interview_date TIMESTAMP,
+                        interview_type VARCHAR(50),
+                        status VARCHAR(50) DEFAULT 'scheduled',
+                        notes TEXT
+                    )
+                """)
             
-            # Interviews table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS interviews (
-                    id SERIAL PRIMARY KEY,
-                    application_id INTEGER REFERENCES applications(id),
-                    interview_date TIMESTAMP,
-                    interview_type VARCHAR(50),
-                    status VARCHAR(50) DEFAULT 'scheduled',
-                    notes TEXT
-                )
-            """)
+                # Interview questions table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS interview_questions (
+                        id SERIAL PRIMARY KEY,
+                        interview_id INTEGER REFERENCES interviews(id),
+                        question_text TEXT NOT NULL,
+                        question_type VARCHAR(50),
+                        question_order INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            # Interview questions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS interview_questions (
-                    id SERIAL PRIMARY KEY,
-                    interview_id INTEGER REFERENCES interviews(id),
-                    question_text TEXT NOT NULL,
-                    question_type VARCHAR(50),
-                    question_order INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                # Interview answers table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS interview_answers (
+                        id SERIAL PRIMARY KEY,
+                        question_id INTEGER REFERENCES interview_questions(id),
+                        answer_text TEXT NOT NULL,
+                        score DECIMAL(5,2),
+                        feedback TEXT,
+                        sentiment_score DECIMAL(3,2),
+                        length_score DECIMAL(3,2),
+                        relevance_score DECIMAL(3,2),
+                        answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            # Interview answers table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS interview_answers (
-                    id SERIAL PRIMARY KEY,
-                    question_id INTEGER REFERENCES interview_questions(id),
-                    answer_text TEXT NOT NULL,
-                    score DECIMAL(5,2),
-                    feedback TEXT,
-                    sentiment_score DECIMAL(3,2),
-                    length_score DECIMAL(3,2),
-                    relevance_score DECIMAL(3,2),
-                    answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                # Decisions table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS decisions (
+                        id SERIAL PRIMARY KEY,
+                        application_id INTEGER REFERENCES applications(id),
+                        final_decision VARCHAR(100) NOT NULL,
+                        final_score DECIMAL(5,2),
+                        decision_reasons TEXT,
+                        confidence_level VARCHAR(50),
+                        bias_flags TEXT[],
+                        decision_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        decision_maker VARCHAR(255)
+                    )
+                """)
             
-            # Decisions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS decisions (
-                    id SERIAL PRIMARY KEY,
-                    application_id INTEGER REFERENCES applications(id),
-                    final_decision VARCHAR(100) NOT NULL,
-                    final_score DECIMAL(5,2),
-                    decision_reasons TEXT,
-                    confidence_level VARCHAR(50),
-                    bias_flags TEXT[],
-                    decision_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    decision_maker VARCHAR(255)
-                )
-            """)
+                # Skills table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS skills (
+                        id SERIAL PRIMARY KEY,
+                        skill_name VARCHAR(255) UNIQUE NOT NULL,
+                        skill_category VARCHAR(100),
+                        skill_level VARCHAR(50),
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            # Skills table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS skills (
-                    id SERIAL PRIMARY KEY,
-                    skill_name VARCHAR(255) UNIQUE NOT NULL,
-                    skill_category VARCHAR(100),
-                    skill_level VARCHAR(50),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+                # Candidate skills mapping table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS candidate_skills (
+                        id SERIAL PRIMARY KEY,
+                        candidate_id INTEGER REFERENCES candidates(id),
+                        skill_id INTEGER REFERENCES skills(id),
+                        proficiency_level VARCHAR(50),
+                        years_experience INTEGER,
+                        verified BOOLEAN DEFAULT FALSE
+                    )
+                """)
             
-            # Candidate skills mapping table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS candidate_skills (
-                    id SERIAL PRIMARY KEY,
-                    candidate_id INTEGER REFERENCES candidates(id),
-                    skill_id INTEGER REFERENCES skills(id),
-                    proficiency_level VARCHAR(50),
-                    years_experience INTEGER,
-                    verified BOOLEAN DEFAULT FALSE
-                )
-            """)
+                # Model performance tracking table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS model_performance (
+                        id SERIAL PRIMARY KEY,
+                        model_name VARCHAR(255) NOT NULL,
+                        model_version VARCHAR(100),
+                        accuracy_score DECIMAL(5,4),
+                        precision_score DECIMAL(5,4),
+                        recall_score DECIMAL(5,4),
+                        f1_score DECIMAL(5,4),
+                        training_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        dataset_size INTEGER,
+                        features_count INTEGER
+                    )
+                """)
             
-            # Model performance tracking table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS model_performance (
-                    id SERIAL PRIMARY KEY,
-                    model_name VARCHAR(255) NOT NULL,
-                    model_version VARCHAR(100),
-                    accuracy_score DECIMAL(5,4),
-                    precision_score DECIMAL(5,4),
-                    recall_score DECIMAL(5,4),
-                    f1_score DECIMAL(5,4),
-                    training_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    dataset_size INTEGER,
-                    features_count INTEGER
-                )
-            """)
+                # Audit log table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS audit_log (
+                        id SERIAL PRIMARY KEY,
+                        action VARCHAR(100) NOT NULL,
+                        table_name VARCHAR(100),
+                        record_id INTEGER,
+                        old_values JSONB,
+                        new_values JSONB,
+                        user_id VARCHAR(255),
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        ip_address INET
+                    )
+                """)
             
-            # Audit log table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS audit_log (
-                    id SERIAL PRIMARY KEY,
-                    action VARCHAR(100) NOT NULL,
-                    table_name VARCHAR(100),
-                    record_id INTEGER,
-                    old_values JSONB,
-                    new_values JSONB,
-                    user_id VARCHAR(255),
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    ip_address INET
-                )
-            """)
-            
-            self.connection.commit()
             logger.info("✅ Database tables created successfully")
             return True
             
         except Exception as e:
             logger.error(f"❌ Failed to create tables: {e}")
-            self.connection.rollback()
             return False
-        finally:
-            cursor.close()
     
     def insert_candidate(self, candidate_data):
         """Insert a new candidate"""
-        if not self.connection:
+        if self._get_pool() is None:
             return None
         
         try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                INSERT INTO candidates (candidate_name, email, phone, location, years_experience, education_level, industry)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                candidate_data.get('candidate_name'),
-                candidate_data.get('email'),
-                candidate_data.get('phone'),
-                candidate_data.get('location'),
-                candidate_data.get('years_experience'),
-                candidate_data.get('education_level'),
-                candidate_data.get('industry')
-            ))
-            
-            candidate_id = cursor.fetchone()['id']
-            self.connection.commit()
-            
+            with self.transaction() as cursor:
+                candidate_id = self._insert_rows(cursor, 'candidates', CANDIDATE_COLUMNS,
+                                                 [_candidate_row(candidate_data)])[0]
             logger.info(f"✅ Candidate inserted with ID: {candidate_id}")
             return candidate_id
             
         except Exception as e:
             logger.error(f"❌ Failed to insert candidate: {e}")
-            self.connection.rollback()
             return None
-        finally:
-            cursor.close()
     
     def insert_resume(self, candidate_id, resume_data):
         """Insert resume data"""
-        if not self.connection:
+        if self._get_pool() is None:
             return None
         
         try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                INSERT INTO resumes (candidate_id, resume_text, resume_file_path, file_size)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id
-            """, (
-                candidate_id,
-                resume_data.get('resume_text'),
-                resume_data.get('file_path'),
-                resume_data.get('file_size')
-            ))
-            
-            resume_id = cursor.fetchone()['id']
-            self.connection.commit()
-            
+            with self.transaction() as cursor:
+                resume_id = self._insert_rows(cursor, 'resumes', RESUME_COLUMNS,
+                                              [_resume_row(candidate_id, resume_data)])[0]
             logger.info(f"✅ Resume inserted with ID: {resume_id}")
             return resume_id
             
         except Exception as e:
             logger.error(f"❌ Failed to insert resume: {e}")
-            self.connection.rollback()
             return None
-        finally:
-            cursor.close()
     
     def insert_application(self, candidate_id, resume_id, application_data):
         """Insert application data"""
-        if not self.connection:
+        if self._get_pool() is None:
             return None
         
         try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                INSERT INTO applications (candidate_id, resume_id, selected_role, predicted_role, ats_score)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                candidate_id,
-                resume_id,
-                application_data.get('selected_role'),
-                application_data.get('predicted_role'),
-                application_data.get('ats_score')
-            ))
-            
-            application_id = cursor.fetchone()['id']
-            self.connection.commit()
-            
+            with self.transaction() as cursor:
+                application_id = self._insert_rows(cursor, 'applications', APPLICATION_COLUMNS,
+                                                   [_application_row(candidate_id, resume_id, application_data)])[0]
             logger.info(f"✅ Application inserted with ID: {application_id}")
             return application_id
             
         except Exception as e:
             logger.error(f"❌ Failed to insert application: {e}")
-            self.connection.rollback()
             return None
-        finally:
-            cursor.close()
+    
+    def _insert_rows(self, cursor, table, columns, rows):
+        """Multi-row INSERT ... RETURNING id via execute_values; ids in row order"""
+        if not rows:
+            return []
+        # Postgres returns the rows of one INSERT ... VALUES in input order
+        ids = execute_values(
+            cursor,
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s RETURNING id",
+            rows, page_size=self.page_size, fetch=True
+        )
+        return [row[0] for row in ids]
+    
+    def _copy_rows(self, cursor, table, columns, rows):
+        """Stream rows with COPY FROM STDIN; used where no ids are needed"""
+        if not rows:
+            return 0
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row) + "\n")
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+        return len(rows)
+    
+    def bulk_insert_candidates(self, candidates):
+        """Insert many candidates in one transaction; returns their ids in order, or None"""
+        if self._get_pool() is None:
+            return None
+        
+        try:
+            with self.transaction() as cursor:
+                ids = self._insert_rows(cursor, 'candidates', CANDIDATE_COLUMNS,
+                                        [_candidate_row(c) for c in candidates])
+            logger.info(f"✅ Inserted {len(ids)} candidates")
+            return ids
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to insert candidates: {e}")
+            return None
+    
+    def bulk_insert_applications(self, records):
+        """Write candidates, resumes, applications and interview answers in one transaction
+        
+        Each record is a dict with ``candidate``, ``resume`` and ``application``
+        dicts (the same fields as the single-row inserts) and optionally
+        ``answers``: dicts with ``question``, ``answer``, ``score``,
+        ``feedback`` and ``sentiment_score``/``length_score``/``relevance_score``
+        (read from a nested ``analysis`` dict too). Answers are stored under one
+        interview per application. Every table is written with one multi-row
+        statement per ``DB_BULK_PAGE_SIZE`` rows; answers, which need no ids
+        back, are streamed with COPY.
+        
+        Returns one dict of ids per record, or None if the transaction failed
+        (nothing is written in that case).
+        """
+        if self._get_pool() is None:
+            return None
+        
+        try:
+            with self.transaction() as cursor:
+                candidate_ids = self._insert_rows(cursor, 'candidates', CANDIDATE_COLUMNS,
+                                                  [_candidate_row(r['candidate']) for r in records])
+                resume_ids = self._insert_rows(cursor, 'resumes', RESUME_COLUMNS, [
+                    _resume_row(candidate_id, r['resume'])
+                    for candidate_id, r in zip(candidate_ids, records)
+                ])
+                application_ids = self._insert_rows(cursor, 'applications', APPLICATION_COLUMNS, [
+                    _application_row(candidate_id, resume_id, r['application'])
+                    for candidate_id, resume_id, r in zip(candidate_ids, resume_ids, records)
+                ])
+                
+                interviewed = [(i, application_ids[i]) for i, r in enumerate(records) if r.get('answers')]
+                interview_ids = self._insert_rows(cursor, 'interviews', INTERVIEW_COLUMNS, [
+                    (application_id, datetime.now(), 'ai', 'completed') for _, application_id in interviewed
+                ])
+                questions, answers = [], []
+                for (i, _), interview_id in zip(interviewed, interview_ids):
+                    for order, answer in enumerate(records[i]['answers']):
+                        questions.append((interview_id, answer.get('question') or '', answer.get('question_type'), order))
+                        answers.append(answer)
+                question_ids = self._insert_rows(cursor, 'interview_questions', QUESTION_COLUMNS, questions)
+                self._copy_rows(cursor, 'interview_answers', ANSWER_COLUMNS, [
+                    _answer_row(question_id, answer) for question_id, answer in zip(question_ids, answers)
+                ])
+            
+            interview_by_record = dict(zip((i for i, _ in interviewed), interview_ids))
+            logger.info(f"✅ Inserted {len(records)} applications with {len(answers)} answers")
+            return [
+                {
+                    'candidate_id': candidate_id,
+                    'resume_id': resume_id,
+                    'application_id': application_id,
+                    'interview_id': interview_by_record.get(i)
+                }
+                for i, (candidate_id, resume_id, application_id)
+                in enumerate(zip(candidate_ids, resume_ids, application_ids))
+            ]
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to insert applications: {e}")
+            return None
     
     def cache_data(self, key, data, expire_time=3600):
         """Cache data in Redis"""
@@ -351,9 +491,10 @@ class DatabaseManager:
     
     def close_connections(self):
         """Close all database connections"""
-        if self.connection:
-            self.connection.close()
-            logger.info("✅ PostgreSQL connection closed")
+        if self.pool is not None and self._pool_pid == os.getpid():
+            self.pool.closeall()
+            self.pool = None
+            logger.info("✅ PostgreSQL connection pool closed")
         
         if self.redis_client:
             self.redis_client.close()
@@ -367,6 +508,12 @@ def init_database():
     # Connect to databases
     if db_manager.connect_postgres():
         db_manager.create_tables()
+        # Indexes and partitioning on top of the baseline tables
+        try:
+            from db_migrations import migrate
+            migrate(db_manager)
+        except Exception as e:
+            logger.error(f"❌ Failed to migrate database schema: {e}")
     
     if db_manager.connect_redis():
         logger.info("✅ Redis cache available")
@@ -394,6 +541,17 @@ if __name__ == "__main__":
         if candidate_id:
             print(f"✅ Test candidate inserted with ID: {candidate_id}")
         
+        # Test bulk insertion (one transaction for all tables)
+        records = [{
+            'candidate': {'candidate_name': f'Bulk Candidate {i}', 'email': f'bulk{i}.{datetime.now().timestamp()}@example.com'},
+            'resume': {'resume_text': 'Python developer with Flask and PostgreSQL experience'},
+            'application': {'selected_role': 'Backend Developer', 'predicted_role': 'Backend Developer', 'ats_score': 80},
+            'answers': [{'question': 'Tell me about your experience with python.', 'answer': 'I build APIs in Flask.', 'score': 7.5}]
+        } for i in range(100)]
+        ids = db.bulk_insert_applications(records)
+        if ids:
+            print(f"✅ Bulk inserted {len(ids)} applications, first: {ids[0]}")
+        
         # Test caching
         test_data = {'test': 'data', 'timestamp': datetime.now().isoformat()}
         if db.cache_data('test_key', test_data):
@@ -0,0 +1,341 @@
+"""
+Versioned schema migrations for the recruitment database.
+
+create_tables() builds the baseline schema; everything after it is a numbered
+migration recorded in ``schema_migrations``. Migrations are applied in order,
+each in its own transaction under an advisory lock so that several workers
+starting at once apply each migration exactly once. Migrations marked
+non-transactional (CREATE INDEX CONCURRENTLY) run in autocommit mode and
+hold a session-level advisory lock instead.
+
+audit_log and model_performance are range-partitioned by month. Every run of
+migrate() also creates the partitions for the next PARTITION_MONTHS_AHEAD
+months, so run it at deploy time and at least monthly (e.g. from cron):
+    python db_migrations.py
+"""
+import os
+import sys
+import argparse
+import logging
+from datetime import date
+
+from database_config import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock, shared by every process running migrations
+MIGRATION_LOCK_KEY = 746_372_019
+PARTITION_MONTHS_AHEAD = int(os.getenv('DB_PARTITION_MONTHS_AHEAD', 3))
+
+MIGRATIONS = []
+
+
+def migration(version, transactional=True):
+    """Register ``func(cursor)`` as migration ``version``; its docstring is the description"""
+    def register(func):
+        MIGRATIONS.append((version, func, transactional))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+
+# Time-partitioned tables: partition key and the columns of the partitioned
+# table (the primary key has to include the partition key)
+PARTITIONED_TABLES = {
+    'audit_log': {
+        'key': 'timestamp',
+        'columns': ['id', 'action', 'table_name', 'record_id', 'old_values', 'new_values',
+                    'user_id', 'timestamp', 'ip_address'],
+        'definition': """
+            id SERIAL,
+            action VARCHAR(100) NOT NULL,
+            table_name VARCHAR(100),
+            record_id INTEGER,
+            old_values JSONB,
+            new_values JSONB,
+            user_id VARCHAR(255),
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ip_address INET,
+            PRIMARY KEY (id, timestamp)
+        """,
+        'indexes': {
+            'idx_audit_log_record': '(table_name, record_id)',
+            'idx_audit_log_timestamp': '(timestamp)',
+        },
+    },
+    'model_performance': {
+        'key': 'training_date',
+        'columns': ['id', 'model_name', 'model_version', 'accuracy_score', 'precision_score',
+                    'recall_score', 'f1_score', 'training_date', 'dataset_size', 'features_count'],
+        'definition': """
+            id SERIAL,
+            model_name VARCHAR(255) NOT NULL,
+            model_version VARCHAR(100),
+            accuracy_score DECIMAL(5,4),
+            precision_score DECIMAL(5,4),
+            recall_score DECIMAL(5,4),
+            f1_score DECIMAL(5,4),
+            training_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            dataset_size INTEGER,
+            features_count INTEGER,
+            PRIMARY KEY (id, training_date)
+        """,
+        'indexes': {
+            'idx_model_performance_model_date': '(model_name, training_date DESC)',
+        },
+    },
+}
+
+# Foreign keys and the filters/orderings the application queries use
+INDEXES = {
+    'idx_resumes_candidate_id': ('resumes', '(candidate_id)'),
+    'idx_applications_candidate_id': ('applications', '(candidate_id)'),
+    'idx_applications_resume_id': ('applications', '(resume_id)'),
+    'idx_applications_role_date': ('applications', '(selected_role, applied_date DESC)'),
+    'idx_applications_status_date': ('applications', '(application_status, applied_date DESC)'),
+    'idx_interviews_application_id': ('interviews', '(application_id)'),
+    'idx_interview_questions_interview_order': ('interview_questions', '(interview_id, question_order)'),
+    'idx_interview_answers_question_id': ('interview_answers', '(question_id)'),
+    'idx_decisions_application_id': ('decisions', '(application_id)'),
+    'idx_decisions_date': ('decisions', '(decision_date)'),
+    'idx_candidate_skills_candidate_id': ('candidate_skills', '(candidate_id)'),
+    'idx_candidate_skills_skill_id': ('candidate_skills', '(skill_id)'),
+}
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(table, month):
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def _months(first_month, last_month):
+    month = first_month
+    while month <= last_month:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _create_partition(cursor, table, month):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {_partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        (month, _add_months(month, 1))
+    )
+
+
+def _relkind(cursor, table):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _partition_table(cursor, table):
+    """Replace ``table`` with a monthly range-partitioned copy of it"""
+    spec = PARTITIONED_TABLES[table]
+    kind = _relkind(cursor, table)
+    if kind == 'p':
+        return
+
+    legacy = f"{table}_unpartitioned"
+    if kind is not None:
+        # Free the default names so the new table can use them
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(f"ALTER INDEX IF EXISTS {table}_pkey RENAME TO {legacy}_pkey")
+        cursor.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq RENAME TO {legacy}_id_seq")
+
+    cursor.execute(f"CREATE TABLE {table} ({spec['definition']}) PARTITION BY RANGE ({spec['key']})")
+    # Catches rows outside the monthly partitions instead of failing the insert
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    for name, columns in spec['indexes'].items():
+        cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+
+    this_month = date.today().replace(day=1)
+    first_month = this_month
+    if kind is not None:
+        cursor.execute(f"SELECT MIN({spec['key']}) FROM {legacy}")
+        oldest = cursor.fetchone()[0]
+        if oldest is not None:
+            first_month = min(first_month, oldest.date().replace(day=1))
+    # Existing rows must land in monthly partitions, not the default one,
+    # or later partitions for those months could not be created
+    for month in _months(first_month, _add_months(this_month, PARTITION_MONTHS_AHEAD)):
+        _create_partition(cursor, table, month)
+
+    if kind is not None:
+        columns = ', '.join(spec['columns'])
+        selected = ', '.join(
+            f"COALESCE({column}, CURRENT_TIMESTAMP)" if column == spec['key'] else column
+            for column in spec['columns']
+        )
+        cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {selected} FROM {legacy}")
+        moved = cursor.rowcount
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)",
+            (table,)
+        )
+        cursor.execute(f"DROP TABLE {legacy}")
+        logger.info(f"✅ Partitioned {table} by month ({moved} rows moved)")
+
+
+def _create_index_concurrently(cursor, name, table, columns):
+    # A failed CONCURRENTLY build leaves an INVALID index that IF NOT EXISTS
+    # would skip; drop it so the build is retried
+    cursor.execute(
+        "SELECT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(%s)", (name,)
+    )
+    row = cursor.fetchone()
+    if row is not None and row[0]:
+        return
+    if row is not None:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cursor.execute(f"CREATE INDEX CONCURRENTLY {name} ON {table} {columns}")
+
+
+@migration(2, transactional=False)
+def add_query_indexes(cursor):
+    """Indexes on foreign keys and the role/status/date filters"""
+    for name, (table, columns) in INDEXES.items():
+        _create_index_concurrently(cursor, name, table, columns)
+        logger.info(f"   {name}")
+
+
+@migration(3)
+def partition_audit_log(cursor):
+    """Partition audit_log by month"""
+    _partition_table(cursor, 'audit_log')
+
+
+@migration(4)
+def partition_model_performance(cursor):
+    """Partition model_performance by month"""
+    _partition_table(cursor, 'model_performance')
+
+
+def ensure_partitions(cursor, months_ahead=PARTITION_MONTHS_AHEAD):
+    """Create the monthly partitions for the current and next ``months_ahead`` months"""
+    this_month = date.today().replace(day=1)
+    for table in PARTITIONED_TABLES:
+        if _relkind(cursor, table) != 'p':
+            continue
+        for month in _months(this_month, _add_months(this_month, months_ahead)):
+            cursor.execute("SAVEPOINT create_partition")
+            try:
+                _create_partition(cursor, table, month)
+                cursor.execute("RELEASE SAVEPOINT create_partition")
+            except Exception as e:
+                # Rows for this month already sit in the default partition;
+                # they stay there and the month keeps using it
+                cursor.execute("ROLLBACK TO SAVEPOINT create_partition")
+                logger.warning(f"⚠️ Could not create {_partition_name(table, month)}: {e}")
+
+
+def _ensure_migrations_table(db_manager):
+    with db_manager.transaction() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+
+def _applied(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _describe(func):
+    return (func.__doc__ or func.__name__).strip().splitlines()[0]
+
+
+def current_version(db_manager):
+    """Highest applied migration version (1 = baseline from create_tables)"""
+    _ensure_migrations_table(db_manager)
+    with db_manager.transaction() as cursor:
+        return max(_applied(cursor), default=1)
+
+
+def _apply(db_manager, version, func, transactional):
+    record = "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)"
+    if transactional:
+        with db_manager.transaction() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+            if version in _applied(cursor):
+                return False
+            func(cursor)
+            cursor.execute(record, (version, _describe(func)))
+        return True
+
+    with db_manager.connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+                try:
+                    if version in _applied(cursor):
+                        return False
+                    func(cursor)
+                    cursor.execute(record, (version, _describe(func)))
+                finally:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        finally:
+            conn.autocommit = False
+    return True
+
+
+def migrate(db_manager, target=None):
+    """Apply pending migrations up to ``target`` (default: all) and top up partitions
+
+    Returns the versions applied by this call.
+    """
+    _ensure_migrations_table(db_manager)
+    with db_manager.transaction() as cursor:
+        applied = _applied(cursor)
+
+    newly_applied = []
+    for version, func, transactional in MIGRATIONS:
+        if version in applied or (target is not None and version > target):
+            continue
+        logger.info(f"🔄 Applying migration {version}: {_describe(func)}")
+        if _apply(db_manager, version, func, transactional):
+            newly_applied.append(version)
+
+    with db_manager.transaction() as cursor:
+        ensure_partitions(cursor)
+
+    if newly_applied:
+        logger.info(f"✅ Schema migrated to version {max(newly_applied)}")
+    return newly_applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply recruitment database schema migrations")
+    parser.add_argument('--target', type=int, help="Stop after this migration version")
+    parser.add_argument('--status', action='store_true', help="Only print the applied and pending migrations")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect_postgres():
+        return 1
+    try:
+        if args.status:
+            _ensure_migrations_table(db_manager)
+            with db_manager.transaction() as cursor:
+                applied = _applied(cursor)
+            for version, func, _ in MIGRATIONS:
+                print(f"{'✅' if version in applied else '⏳'} {version}: {_describe(func)}")
+            return 0
+        db_manager.create_tables()
+        migrate(db_manager, args.target)
+        return 0
+    finally:
+        db_manager.close_connections()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Streaming accuracy drift detection, per model.
+
+Every tracked accuracy updates a model's monitor in constant time: a ring
+buffer of the last ``window`` accuracies with a running sum, an EWMA, and a
+Page-Hinkley test for a sustained drop in the mean. A monitor reports drift
+when the new accuracy falls more than ``threshold`` below the window mean
+(sudden degradation) or when Page-Hinkley fires (gradual degradation).
+Models are tracked independently, so interleaved events from many models do
+not push each other out of the window.
+
+RetrainGate debounces the trigger: a model already being retrained, or
+retrained within the cooldown, is not scheduled again.
+"""
+import os
+import time
+import threading
+from collections import deque
+
+
+class RollingWindow:
+    """Last ``size`` values with a running sum for an O(1) mean"""
+
+    __slots__ = ('values', 'total')
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+
+    def add(self, value):
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def mean(self):
+        return self.total / len(self.values) if self.values else None
+
+
+class EWMA:
+    """Exponentially weighted moving average"""
+
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+
+    def add(self, value):
+        self.value = value if self.value is None else self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class PageHinkley:
+    """Page-Hinkley test for a drop in the mean of a stream
+
+    ``delta`` is the change tolerated without accumulating evidence and
+    ``threshold`` the accumulated drop that raises an alarm; lower values
+    make the test more sensitive.
+    """
+
+    __slots__ = ('delta', 'threshold', 'count', 'mean', 'cumulative', 'minimum')
+
+    def __init__(self, delta=0.005, threshold=0.3):
+        self.delta = delta
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.cumulative = 0.0
+        self.minimum = 0.0
+
+    def add(self, value):
+        """Update with one value; True when a drop is detected"""
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        self.cumulative += self.mean - value - self.delta
+        self.minimum = min(self.minimum, self.cumulative)
+        return self.cumulative - self.minimum > self.threshold
+
+
+class ModelDriftMonitor:
+    """Rolling statistics and drift tests for one model's accuracy"""
+
+    def __init__(self, window=20, min_samples=5, threshold=0.05, ewma_alpha=0.1,
+                 ph_delta=0.005, ph_threshold=0.3):
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self.window = RollingWindow(window)
+        self.ewma = EWMA(ewma_alpha)
+        self.page_hinkley = PageHinkley(ph_delta, ph_threshold)
+        self.count = 0
+        self.last_drift = None
+
+    def update(self, accuracy):
+        """Add one accuracy; returns ``(reason, baseline)`` on drift, else None"""
+        baseline = self.window.mean
+        warmed_up = len(self.window) >= self.min_samples
+        self.window.add(accuracy)
+        self.ewma.add(accuracy)
+        self.count += 1
+        gradual = self.page_hinkley.add(accuracy)
+        if not warmed_up:
+            return None
+
+        if accuracy < baseline - self.threshold:
+            drift = ('degradation', baseline)
+        elif gradual:
+            drift = ('page_hinkley', self.page_hinkley.mean)
+        else:
+            return None
+        # Start collecting evidence afresh so one drop raises one alarm
+        self.page_hinkley.reset()
+        self.last_drift = drift[0]
+        return drift
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'window_mean': self.window.mean,
+            'ewma': self.ewma.value,
+            'page_hinkley': self.page_hinkley.cumulative - self.page_hinkley.minimum,
+            'last_drift': self.last_drift,
+        }
+
+
+class DriftDetector:
+    """A ModelDriftMonitor per model, created on first use"""
+
+    def __init__(self, **monitor_options):
+        self.monitor_options = monitor_options
+        self.monitors = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, threshold=0.05):
+        return cls(
+            window=int(os.environ.get('DRIFT_WINDOW', 20)),
+            min_samples=int(os.environ.get('DRIFT_MIN_SAMPLES', 5)),
+            threshold=float(os.environ.get('DRIFT_THRESHOLD', threshold)),
+            ewma_alpha=float(os.environ.get('DRIFT_EWMA_ALPHA', 0.1)),
+            ph_delta=float(os.environ.get('DRIFT_PH_DELTA', 0.005)),
+            ph_threshold=float(os.environ.get('DRIFT_PH_THRESHOLD', 0.3)),
+        )
+
+    def update(self, model_name, accuracy):
+        with self._lock:
+            monitor = self.monitors.get(model_name)
+            if monitor is None:
+                monitor = self.monitors[model_name] = ModelDriftMonitor(**self.monitor_options)
+            return monitor.update(accuracy)
+
+    def reset(self, model_name):
+        """Forget a model's statistics, e.g. after it was retrained"""
+        with self._lock:
+            self.monitors.pop(model_name, None)
+
+    def stats(self):
+        with self._lock:
+            return {name: monitor.stats() for name, monitor in self.monitors.items()}
+
+
+class RetrainGate:
+    """Lets one retrain per model run at a time, at most once per cooldown"""
+
+    def __init__(self, cooldown_seconds=3600):
+        self.cooldown_seconds = cooldown_seconds
+        self.running = set()
+        self.finished_at = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, model_name):
+        with self._lock:
+            if model_name in self.running:
+                return False
+            finished = self.finished_at.get(model_name)
+            if finished is not None and time.monotonic() - finished < self.cooldown_seconds:
+                return False
+            self.running.add(model_name)
+            return True
+
+    def release(self, model_name, attempted=True):
+        """End a retrain; the cooldown only starts if a fit was ``attempted``"""
+        with self._lock:
+            self.running.discard(model_name)
+            if attempted:
+                self.finished_at[model_name] = time.monotonic()
@@ -0,0 +1,254 @@
+"""
+Shared Gemini client used by gemini_service.
+
+One GenerativeModel (and so one underlying transport) is reused per model
+name. Calls run on a small thread pool so every call has a hard deadline,
+a semaphore caps in-flight requests across the process, transient failures
+are retried with jittered exponential backoff, and a circuit breaker stops
+calling Gemini while its error rate is high so callers fall back to the
+local scoring paths immediately.
+"""
+import asyncio
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import google.generativeai as genai
+
+
+class GeminiUnavailableError(RuntimeError):
+    """Gemini could not serve the request (busy, timed out or failing)"""
+
+
+class GeminiBusyError(GeminiUnavailableError):
+    """The local concurrency cap was reached before the deadline"""
+
+
+class CircuitOpenError(GeminiUnavailableError):
+    """The circuit breaker is open; the call was not attempted"""
+
+
+# Errors that indicate a bad request or blocked response rather than a
+# transient outage; retrying them cannot help
+NON_RETRYABLE_ERRORS = (ValueError, TypeError, KeyError)
+
+
+class CircuitBreaker:
+    """Open after the recent error rate crosses a threshold, probe after a cooldown"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window=20, min_calls=5, error_threshold=0.5, cooldown=30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            # Cooldown elapsed: let a single probe through
+            if self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._outcomes.append(True)
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Let another probe through without recording an outcome
+
+        For calls that were allowed but never reached Gemini.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN:
+                self._trip()
+                return
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_threshold:
+                self._trip()
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def error_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+
+class GeminiClient:
+    """Deadline-bounded, rate-limited and circuit-broken access to Gemini"""
+
+    def __init__(self, model_name, timeout=20.0, max_concurrency=4, max_retries=2,
+                 backoff_base=0.5, backoff_max=4.0, breaker=None):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._models = {}
+        self._executor = None
+        self._supports_request_options = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def model(self, model_name=None):
+        """Return the shared GenerativeModel for ``model_name``"""
+        model_name = model_name or self.model_name
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._models[model_name] = genai.GenerativeModel(model_name)
+            return model
+
+    def _get_executor(self):
+        # Created lazily so a gunicorn --preload master never forks with threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix='gemini'
+                )
+            return self._executor
+
+    def _call(self, model, prompt, timeout):
+        # Newer google-generativeai versions accept a transport-level timeout,
+        # which also frees the worker thread when our deadline passes, and let
+        # us turn off the library's own retries so ours are the only ones
+        if self._supports_request_options is None:
+            self._supports_request_options = 'request_options' in inspect.signature(model.generate_content).parameters
+        if self._supports_request_options:
+            response = model.generate_content(prompt, request_options={'timeout': timeout, 'retry': None})
+        else:
+            response = model.generate_content(prompt)
+        return response.text
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._semaphore.release()
+
+    def _attempt(self, model, prompt, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._semaphore.acquire(timeout=remaining):
+            with self._lock:
+                self.rejected += 1
+            raise GeminiBusyError("Too many concurrent Gemini requests")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(self._call, model, prompt, remaining)
+        except Exception:
+            self._release(None)
+            raise
+        # The slot is held until the call really finishes, even after a timeout,
+        # so the concurrency cap also bounds abandoned calls
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise GeminiUnavailableError("Gemini call exceeded its deadline")
+
+    def generate(self, prompt, timeout=None, model_name=None):
+        """Return the response text for ``prompt``
+
+        Raises CircuitOpenError without calling Gemini while the breaker is
+        open, and GeminiUnavailableError when the deadline or retries run out.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        model = self.model(model_name)
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError("Gemini circuit breaker is open")
+
+            with self._lock:
+                self.calls += 1
+            try:
+                text = self._attempt(model, prompt, deadline)
+            except GeminiBusyError:
+                # Local back-pressure says nothing about Gemini's health, but a
+                # half-open probe that never ran must not block later probes
+                self.breaker.release_probe()
+                raise
+            except NON_RETRYABLE_ERRORS:
+                # The service answered; the response itself was unusable
+                self.breaker.record_success()
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                with self._lock:
+                    self.failures += 1
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if attempt == self.max_retries or time.monotonic() + backoff >= deadline:
+                    raise
+                time.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            return text
+
+    async def generate_async(self, prompt, timeout=None, model_name=None):
+        """asyncio entry point; the blocking call runs off the event loop"""
+        return await asyncio.to_thread(self.generate, prompt, timeout, model_name)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'model': self.model_name,
+                'circuit_state': self.breaker.state,
+                'error_rate': round(self.breaker.error_rate(), 3),
+                'in_flight': self._in_flight,
+                'max_concurrency': self.max_concurrency,
+                'calls': self.calls,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+            }
@@ -3,9 +3,13 @@ Gemini AI Service for enhanced resume parsing, question generation, and feedback
 """
 import os
 import json
+import asyncio
 import google.generativeai as genai
 from typing import List, Dict, Optional, Tuple
 
+from gemini_client import GeminiClient, CircuitBreaker
+from prompt_cache import create_prompt_cache
+
 # Try to load from .env file if python-dotenv is available (for local development)
 try:
     from dotenv import load_dotenv
@@ -44,8 +48,15 @@ except Exception as e:
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
+# Optional endpoint override, e.g. a local fake Gemini server in tests
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+
 if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=GEMINI_API_KEY, transport='rest',
+                        client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=GEMINI_API_KEY)
     print(f"✅ Gemini API key configured (length: {len(GEMINI_API_KEY)} characters)")
 else:
     print("⚠️  GEMINI_API_KEY not found in environment")
@@ -54,13 +65,68 @@ else:
 # Use Gemini 1.5 Flash model
 MODEL_NAME = 'gemini-2.5-flash-lite'
 
+# One shared client per process: reused model/transport, per-call deadline,
+# capped concurrency, retries with jittered backoff and a circuit breaker.
+# While the breaker is open every call fails fast and app.py falls back to
+# the local ats_score / generate_questions / analyze_answer paths.
+gemini_client = GeminiClient(
+    MODEL_NAME,
+    timeout=float(os.getenv('GEMINI_TIMEOUT', 20)),
+    max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENCY', 4)),
+    max_retries=int(os.getenv('GEMINI_MAX_RETRIES', 2)),
+    breaker=CircuitBreaker(
+        error_threshold=float(os.getenv('GEMINI_BREAKER_ERROR_RATE', 0.5)),
+        cooldown=float(os.getenv('GEMINI_BREAKER_COOLDOWN', 30))
+    )
+)
+
+# Responses keyed by model name + normalized prompt hash, so identical
+# prompts (retries, refreshes, re-submissions) don't cost another call
+prompt_cache = create_prompt_cache()
+
 def get_gemini_model():
-    """Get the Gemini model instance"""
+    """Get the shared Gemini model instance"""
     if not GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY not found in environment variables")
-    return genai.GenerativeModel(MODEL_NAME)
+    return gemini_client.model()
+
+def generate_text(prompt: str) -> str:
+    """Send a prompt through the shared client and return the response text"""
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+    return gemini_client.generate(prompt)
+
+def _parse_json_response(response_text: str):
+    """Parse a JSON response, stripping markdown code fences if present"""
+    response_text = response_text.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]
+    if response_text.startswith('```'):
+        response_text = response_text[3:]
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]
+    return json.loads(response_text.strip())
 
-def analyze_resume_with_gemini(resume_text: str, selected_role: str) -> Dict:
+def generate_json(prompt: str, bypass_cache: bool = False):
+    """
+    Return the parsed JSON response for a prompt, served from the prompt cache when possible
+
+    With ``bypass_cache`` Gemini is always called and the fresh response
+    replaces the cached one. Only responses that parse are cached.
+    """
+    if not bypass_cache:
+        cached = prompt_cache.get(MODEL_NAME, prompt)
+        if cached is not None:
+            try:
+                return _parse_json_response(cached)
+            except ValueError:
+                pass
+    response_text = generate_text(prompt)
+    result = _parse_json_response(response_text)
+    prompt_cache.put(MODEL_NAME, prompt, response_text)
+    return result
+
+def analyze_resume_with_gemini(resume_text: str, selected_role: str, bypass_cache: bool = False) -> Dict:
     """
     Analyze resume using Gemini for better ATS scoring and parsing
     
@@ -68,8 +134,6 @@ def analyze_resume_with_gemini(resume_text: str, selected_role: str) -> Dict:
         Dict with ats_score, predicted_role, skills, and detailed analysis
     """
     try:
-        model = get_gemini_model()
-        
         # Limit text to avoid token limits
         resume_text_limited = resume_text[:4000]
         
@@ -99,19 +163,7 @@ Focus on:
 
 Return ONLY valid JSON, no additional text."""
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean response text (remove markdown code blocks if present)
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]
-        if response_text.startswith('```'):
-            response_text = response_text[3:]
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
+        result = generate_json(prompt, bypass_cache)
         
         # Ensure required fields exist
         return {
@@ -129,7 +181,8 @@ Return ONLY valid JSON, no additional text."""
         # Fallback to basic analysis
         return None
 
-def generate_interview_questions_with_gemini(resume_text: str, selected_role: str, skills: List[str]) -> List[str]:
+def generate_interview_questions_with_gemini(resume_text: str, selected_role: str, skills: List[str],
+                                            bypass_cache: bool = False) -> List[str]:
     """
     Generate intelligent interview questions using Gemini
     
@@ -137,13 +190,12 @@ def generate_interview_questions_with_gemini(resume_text: str, selected_role: st
         resume_text: Extracted resume text
         selected_role: Target job role
         skills: Extracted skills from resume
+        bypass_cache: Skip the prompt cache and ask Gemini again
     
     Returns:
         List of 5 interview questions
     """
     try:
-        model = get_gemini_model()
-        
         skills_text = ", ".join(skills[:5]) if skills else "Not specified"
         
         # Limit resume text to avoid token limits
@@ -171,19 +223,7 @@ Return ONLY a JSON array of 5 questions in this format:
 Each question should be clear, specific, and allow candidates to demonstrate their skills.
 No additional text, only the JSON array."""
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean response text
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]
-        if response_text.startswith('```'):
-            response_text = response_text[3:]
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        questions = json.loads(response_text)
+        questions = generate_json(prompt, bypass_cache)
         
         # Ensure we have exactly 5 questions
         if isinstance(questions, list) and len(questions) >= 5:
@@ -196,7 +236,8 @@ No additional text, only the JSON array."""
         print(f"Error in Gemini question generation: {e}")
         return None
 
-def analyze_answer_with_gemini(question: str, answer: str, selected_role: str, context: Optional[Dict] = None) -> Dict:
+def analyze_answer_with_gemini(question: str, answer: str, selected_role: str, context: Optional[Dict] = None,
+                               bypass_cache: bool = False) -> Dict:
     """
     Analyze interview answer using Gemini for detailed feedback
     
@@ -205,13 +246,12 @@ def analyze_answer_with_gemini(question: str, answer: str, selected_role: str, c
         answer: Candidate's answer
         selected_role: Target job role
         context: Optional context (resume info, previous answers, etc.)
+        bypass_cache: Skip the prompt cache and ask Gemini again
     
     Returns:
         Dict with score (0-10), detailed feedback, and analysis
     """
     try:
-        model = get_gemini_model()
-        
         context_info = ""
         if context:
             skills = context.get('skills', [])
@@ -246,38 +286,150 @@ Return ONLY a JSON object in this format:
 Be constructive and specific in your feedback. Focus on actionable insights.
 Return ONLY valid JSON, no additional text."""
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean response text
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]
-        if response_text.startswith('```'):
-            response_text = response_text[3:]
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
-        
-        score = float(result.get('score', 5.0))
-        # Ensure score is between 0-10
-        score = max(0, min(10, score))
-        
-        return {
-            'score': round(score, 2),
-            'feedback': result.get('feedback', 'Good answer, but could be more detailed.'),
-            'technical_accuracy': result.get('technical_accuracy', 'Moderate'),
-            'communication_clarity': result.get('communication_clarity', 'Moderate'),
-            'strengths': result.get('strengths', []),
-            'improvements': result.get('improvements', []),
-            'overall_assessment': result.get('overall_assessment', '')
-        }
+        result = generate_json(prompt, bypass_cache)
+        return _answer_feedback(result)
     except Exception as e:
         print(f"Error in Gemini answer analysis: {e}")
         return None
 
+def _answer_feedback(result: Dict) -> Dict:
+    """Normalize one answer evaluation from Gemini into the feedback dict"""
+    score = float(result.get('score', 5.0))
+    # Ensure score is between 0-10
+    score = max(0, min(10, score))
+    
+    return {
+        'score': round(score, 2),
+        'feedback': result.get('feedback', 'Good answer, but could be more detailed.'),
+        'technical_accuracy': result.get('technical_accuracy', 'Moderate'),
+        'communication_clarity': result.get('communication_clarity', 'Moderate'),
+        'strengths': result.get('strengths', []),
+        'improvements': result.get('improvements', []),
+        'overall_assessment': result.get('overall_assessment', '')
+    }
+
+# Batched answer evaluation: prompt size budget (roughly 4 characters per
+# token) and an upper bound on pairs per call so each response stays small
+BATCH_MAX_PROMPT_CHARS = int(os.getenv('GEMINI_BATCH_MAX_CHARS', 16000))
+BATCH_MAX_ITEMS = int(os.getenv('GEMINI_BATCH_MAX_ITEMS', 10))
+# Longer answers are truncated inside a batch so one essay can't starve the rest
+BATCH_MAX_ANSWER_CHARS = 3000
+
+def _chunk_answer_items(blocks: List[str], budget: int, max_items: int) -> List[List[int]]:
+    """Group item indexes so every chunk's blocks fit the character budget"""
+    chunks, current, size = [], [], 0
+    for index, block in enumerate(blocks):
+        if current and (size + len(block) > budget or len(current) >= max_items):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += len(block)
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _batch_answer_prompt(pairs_text: str, selected_role: str, context_info: str) -> str:
+    return f"""You are an expert interviewer evaluating a candidate's answers for a {selected_role} position.
+
+{context_info}
+Evaluate each question/answer pair below independently. For each one provide:
+1. A numerical score from 0 to 10 (where 10 is excellent)
+2. Detailed feedback on what was good and what could be improved
+3. Assessment of technical accuracy
+4. Assessment of communication clarity
+5. Suggestions for improvement
+
+Question/Answer Pairs:
+{pairs_text}
+Return ONLY a JSON array with one object per item, in this format:
+[
+    {{
+        "index": <item number>,
+        "score": <float 0-10>,
+        "feedback": "<detailed feedback text>",
+        "technical_accuracy": "<assessment>",
+        "communication_clarity": "<assessment>",
+        "strengths": ["strength1", "strength2"],
+        "improvements": ["improvement1", "improvement2"],
+        "overall_assessment": "<brief overall assessment>"
+    }}
+]
+
+Be constructive and specific in your feedback. Focus on actionable insights.
+Return ONLY valid JSON, no additional text."""
+
+async def _generate_json_all(prompts: List[str], bypass_cache: bool) -> list:
+    """generate_json for every prompt concurrently; failed prompts give their exception"""
+    return await asyncio.gather(
+        *(asyncio.to_thread(generate_json, prompt, bypass_cache) for prompt in prompts),
+        return_exceptions=True
+    )
+
+def analyze_answers_with_gemini(items: List[Dict], selected_role: str, context: Optional[Dict] = None,
+                                bypass_cache: bool = False) -> List[Optional[Dict]]:
+    """
+    Analyze several interview answers with as few Gemini calls as possible
+    
+    Question/answer pairs are packed into prompts that fit the batch budget
+    and Gemini returns one JSON array per prompt, tagged by item index. The
+    prompts are sent concurrently; each call has its own deadline and the
+    shared client caps how many are in flight.
+    
+    Args:
+        items: List of dicts with 'question' and 'answer'
+        selected_role: Target job role
+        context: Optional context (resume info, previous answers, etc.)
+        bypass_cache: Skip the prompt cache and ask Gemini again
+    
+    Returns:
+        List aligned with ``items``: the feedback dict for each answer (same
+        shape as analyze_answer_with_gemini), or None where a chunk failed or
+        Gemini left the item out, so the caller can fall back per item
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+    
+    context_info = ""
+    if context:
+        skills = context.get('skills', [])
+        if skills:
+            context_info = f"Candidate Skills: {', '.join(skills[:5])}\n"
+    
+    blocks = [
+        f"### Item {index}\nQuestion: {str(item.get('question') or '')}\n"
+        f"Candidate's Answer: {str(item.get('answer') or '')[:BATCH_MAX_ANSWER_CHARS]}\n"
+        for index, item in enumerate(items)
+    ]
+    
+    chunks = _chunk_answer_items(blocks, BATCH_MAX_PROMPT_CHARS, BATCH_MAX_ITEMS)
+    prompts = [
+        _batch_answer_prompt("\n".join(blocks[index] for index in chunk), selected_role, context_info)
+        for chunk in chunks
+    ]
+    responses = asyncio.run(_generate_json_all(prompts, bypass_cache))
+    
+    for chunk, evaluations in zip(chunks, responses):
+        if not isinstance(evaluations, list):
+            error = evaluations if isinstance(evaluations, Exception) else "Expected a JSON array of evaluations"
+            print(f"Error in Gemini batch answer analysis ({len(chunk)} answers): {error}")
+            continue
+        
+        for evaluation in evaluations:
+            try:
+                index = int(evaluation['index'])
+                if index in chunk and results[index] is None:
+                    results[index] = _answer_feedback(evaluation)
+            except (KeyError, TypeError, ValueError):
+                continue
+    
+    return results
+
 def is_gemini_available() -> bool:
     """Check if Gemini API is available"""
     return GEMINI_API_KEY is not None and GEMINI_API_KEY.strip() != ""
 
+def gemini_status() -> Dict:
+    """Client health (circuit state, error rate, in-flight calls) and cache stats for /api/health"""
+    return dict(gemini_client.stats(), cache=prompt_cache.stats())
+
@@ -0,0 +1,376 @@
+"""
+Background jobs for slow request work (resume analysis with Gemini).
+
+A job is submitted with a kind and a JSON-serializable payload and gets an ID
+immediately. Its state (queued -> running -> done | failed) is kept in a
+session-style store (SQLite by default, Redis with JOB_BACKEND=redis) so any
+worker can answer /api/jobs/<id>. With the default backend, jobs run on a
+small thread pool in the process that accepted them; with Redis they are
+pushed onto a list that worker threads in every process pop from.
+
+A job records the process that owns it. If that process exits (e.g. a
+gunicorn worker is restarted), the next read of the job finds its owner gone
+and fails it, instead of leaving it queued or running forever. Jobs on
+another host are failed once they have run longer than JOB_MAX_RUNTIME.
+"""
+import os
+import json
+import uuid
+import time
+import socket
+import threading
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from session_store import SQLiteSessionStore, RedisSessionStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_TTL = 3600  # finished jobs are kept for 1 hour
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+FINISHED_STATUSES = ('done', 'failed')
+DEFAULT_MAX_RUNTIME = 1800
+HOSTNAME = socket.gethostname()
+
+
+def _current_owner():
+    # Read per call: the pid changes when a gunicorn --preload master forks
+    return f"{HOSTNAME}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    """False only if ``owner`` is a process on this host that has exited"""
+    host, _, pid = owner.rpartition(':')
+    if host != HOSTNAME:
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail a job with a client-facing message"""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _percentiles(samples):
+    if not samples:
+        return {'avg': None, 'p50': None, 'p95': None, 'max': None}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'avg': round(sum(ordered) / len(ordered), 2),
+        'p50': round(pick(0.5), 2),
+        'p95': round(pick(0.95), 2),
+        'max': round(ordered[-1], 2),
+    }
+
+
+class JobMetrics:
+    """Counters and recent wait/run times (milliseconds) for this process"""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._wait_ms = deque(maxlen=window)
+        self._run_ms = deque(maxlen=window)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+
+    def record_submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def record_start(self, wait_ms):
+        with self._lock:
+            self.running += 1
+            self._wait_ms.append(wait_ms)
+
+    def record_finish(self, run_ms, ok):
+        with self._lock:
+            self.running -= 1
+            self._run_ms.append(run_ms)
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'wait_ms': _percentiles(self._wait_ms),
+                'run_ms': _percentiles(self._run_ms),
+            }
+
+
+class JobQueue(ABC):
+    """Shared job bookkeeping; subclasses decide where jobs are executed"""
+
+    backend = None
+
+    # Local jobs are owned by the submitting process from the start; Redis
+    # jobs only once a consumer pops them
+    owns_queued_jobs = False
+
+    def __init__(self, store, max_workers=4, ttl=DEFAULT_JOB_TTL, max_runtime=DEFAULT_MAX_RUNTIME):
+        self.store = store
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.max_runtime = max_runtime
+        self.handlers = {}
+        self.metrics = JobMetrics()
+        # Notified whenever a job run by this process changes state, so
+        # event streams in the same process don't have to wait for a poll
+        self._changed = threading.Condition()
+
+    def register(self, kind, handler):
+        """Run ``handler(payload) -> result dict`` for jobs of ``kind``"""
+        self.handlers[kind] = handler
+
+    def submit(self, kind, payload):
+        """Queue a job and return its record (status 'queued')"""
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': 'queued',
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'status_code': None,
+            'owner': _current_owner() if self.owns_queued_jobs else None,
+        }
+        self._save(job)
+        self.metrics.record_submit()
+        self._enqueue(job['id'], kind, payload)
+        return job
+
+    def get(self, job_id):
+        """The job record, or None if unknown or expired"""
+        job = self.store.get(job_id)
+        reason = self._orphan_reason(job) if job is not None else None
+        if reason:
+            logger.warning(f"⚠️ Job {job_id} left {job['status']}: {reason}; marked failed")
+            job.update(status='failed', error=f"Job was interrupted: {reason}",
+                       status_code=500, finished_at=time.time())
+            self._save(job)
+        return job
+
+    def _orphan_reason(self, job):
+        """Why an unfinished job can no longer finish, or None"""
+        if job['status'] in FINISHED_STATUSES or not job.get('owner'):
+            return None
+        if not _owner_alive(job['owner']):
+            return "its worker exited"
+        # A live owner on this host is still running the job; a process on
+        # another host can't be checked, so only the runtime limit applies
+        host = job['owner'].rpartition(':')[0]
+        started = job.get('started_at')
+        if host != HOSTNAME and self.max_runtime and started and time.time() - started > self.max_runtime:
+            return f"no result after {self.max_runtime}s"
+        return None
+
+    def wait(self, timeout):
+        """Block until a job in this process changes state or ``timeout`` passes"""
+        with self._changed:
+            self._changed.wait(timeout)
+
+    def _save(self, job):
+        self.store.set(job['id'], job, self.ttl)
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run(self, job_id, kind, payload):
+        job = self.get(job_id)
+        if job is None:
+            logger.warning(f"⚠️ Job {job_id} expired before it ran")
+            return
+        started = time.time()
+        wait_ms = (started - job['created_at']) * 1000
+        job.update(status='running', started_at=started, wait_ms=round(wait_ms, 2), owner=_current_owner())
+        self._save(job)
+        self.metrics.record_start(wait_ms)
+
+        ok = False
+        try:
+            job.update(status='done', result=self.handlers[kind](payload), status_code=200)
+            ok = True
+        except JobFailed as e:
+            job.update(status='failed', error=str(e), status_code=e.status_code)
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} ({kind}) failed: {e}")
+            job.update(status='failed', error='Internal server error', status_code=500)
+
+        finished = time.time()
+        job.update(finished_at=finished, run_ms=round((finished - started) * 1000, 2))
+        self._save(job)
+        self.metrics.record_finish((finished - started) * 1000, ok)
+
+    @abstractmethod
+    def _enqueue(self, job_id, kind, payload):
+        """Hand a saved job to whatever executes it"""
+
+    @abstractmethod
+    def depth(self):
+        """Jobs waiting to start"""
+
+    def stats(self):
+        return dict(self.metrics.snapshot(), backend=self.backend, workers=self.max_workers, depth=self.depth())
+
+
+class LocalJobQueue(JobQueue):
+    """Jobs run on a thread pool in the submitting process"""
+
+    backend = 'local'
+    owns_queued_jobs = True
+
+    def __init__(self, store, max_workers=4, ttl=DEFAULT_JOB_TTL, max_runtime=DEFAULT_MAX_RUNTIME):
+        super().__init__(store, max_workers, ttl, max_runtime)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    def _get_executor(self):
+        # Created lazily so a gunicorn --preload master never forks with threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            return self._executor
+
+    def _enqueue(self, job_id, kind, payload):
+        with self._lock:
+            self._queued += 1
+        self._get_executor().submit(self._start, job_id, kind, payload)
+
+    def _start(self, job_id, kind, payload):
+        with self._lock:
+            self._queued -= 1
+        self._run(job_id, kind, payload)
+
+    def depth(self):
+        return self._queued
+
+
+class RedisJobQueue(JobQueue):
+    """Jobs are pushed onto a Redis list and popped by workers in every process"""
+
+    backend = 'redis'
+
+    def __init__(self, db_manager, max_workers=4, ttl=DEFAULT_JOB_TTL, queue_key='jobs:queue',
+                 max_runtime=DEFAULT_MAX_RUNTIME):
+        super().__init__(RedisSessionStore(db_manager, ttl=ttl, prefix='job:'), max_workers, ttl, max_runtime)
+        self.redis = db_manager.redis_client
+        self.queue_key = queue_key
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start this process's consumer threads (idempotent, called lazily)"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.max_workers):
+                thread = threading.Thread(target=self._consume, name=f'job-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _enqueue(self, job_id, kind, payload):
+        self.start()
+        self.redis.lpush(self.queue_key, json.dumps({'id': job_id, 'kind': kind, 'payload': payload}))
+
+    def _consume(self):
+        while True:
+            try:
+                item = self.redis.brpop(self.queue_key, timeout=5)
+            except Exception as e:
+                logger.error(f"❌ Job queue read failed: {e}")
+                time.sleep(1)
+                continue
+            if item is None:
+                continue
+            message = json.loads(item[1])
+            if message['kind'] not in self.handlers:
+                logger.warning(f"⚠️ No handler for job kind {message['kind']}")
+                continue
+            self._run(message['id'], message['kind'], message['payload'])
+
+    def get(self, job_id):
+        self.start()
+        return super().get(job_id)
+
+    def depth(self):
+        self.start()
+        try:
+            return self.redis.llen(self.queue_key)
+        except Exception:
+            return None
+
+
+def job_events(job_queue, job_id, timeout=300, poll_interval=0.5, keepalive=15):
+    """Server-sent events for one job: an event per status change, then stop
+
+    Each event is named after the status and carries the job record as JSON.
+    Comment lines are sent every ``keepalive`` seconds so proxies keep the
+    connection open; after ``timeout`` seconds a ``timeout`` event ends it and
+    the client should reconnect (EventSource does so after ``retry``).
+    """
+    deadline = time.monotonic() + timeout
+    last_status, last_sent = None, time.monotonic()
+    yield "retry: 3000\n\n"
+    while True:
+        job = job_queue.get(job_id)
+        now = time.monotonic()
+        if job is None:
+            yield "event: failed\ndata: {\"error\": \"Job not found\"}\n\n"
+            return
+        if job['status'] != last_status:
+            last_status, last_sent = job['status'], now
+            yield f"event: {job['status']}\ndata: {json.dumps(job, default=str)}\n\n"
+            if job['status'] in FINISHED_STATUSES:
+                return
+        if now >= deadline:
+            yield "event: timeout\ndata: {}\n\n"
+            return
+        if now - last_sent >= keepalive:
+            last_sent = now
+            yield ": keepalive\n\n"
+        job_queue.wait(poll_interval)
+
+
+def create_job_queue():
+    """Build the job queue selected by JOB_BACKEND (default: local)"""
+    backend = os.getenv('JOB_BACKEND', 'local').lower()
+    workers = int(os.getenv('JOB_WORKERS', 4))
+    ttl = int(os.getenv('JOB_TTL', DEFAULT_JOB_TTL))
+    max_runtime = int(os.getenv('JOB_MAX_RUNTIME', DEFAULT_MAX_RUNTIME))
+
+    if backend == 'redis':
+        try:
+            from database_config import DatabaseManager
+            db_manager = DatabaseManager()
+            if db_manager.connect_redis():
+                logger.info("✅ Using Redis job queue")
+                return RedisJobQueue(db_manager, max_workers=workers, ttl=ttl, max_runtime=max_runtime)
+        except Exception as e:
+            logger.error(f"❌ Redis job queue unavailable: {e}")
+        logger.warning("⚠️ Falling back to local job queue")
+
+    store = SQLiteSessionStore(os.getenv('JOB_DB_PATH', DEFAULT_SQLITE_PATH), ttl=ttl)
+    return LocalJobQueue(store, max_workers=workers, ttl=ttl, max_runtime=max_runtime)
@@ -0,0 +1,225 @@
+"""
+Compiled keyword matcher for ATS scoring.
+
+All role keyword sets are compiled into one Aho-Corasick automaton, so a
+resume is scanned once no matter how many roles are scored. Keywords that
+are not found verbatim are looked up in a character-trigram index and
+confirmed with the same similarity ratio difflib.get_close_matches uses.
+
+Two modes are supported:
+
+* ``indexed`` (default): keywords must match on word boundaries and fuzzy
+  matching compares against the resume's words and word n-grams.
+* ``compat``: reproduces the original ``ats_score`` exactly -- plain substring
+  hits, then ``get_close_matches`` against the greedy phrase tokens.
+"""
+import re
+from collections import defaultdict, deque
+from difflib import SequenceMatcher, get_close_matches
+
+# The original tokenizer; only used in compat mode
+COMPAT_TOKEN_RE = re.compile(r"\b\w+[\w\s\-/\.]*\w*\b")
+WORD_RE = re.compile(r"\w+(?:[\-/\.]\w+)*")
+
+MATCH_MODES = ('indexed', 'compat')
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class KeywordMatcher:
+    """Score text against every role's keyword set in a single pass"""
+
+    # Fuzzy results depend only on the phrase, so they are memoized across
+    # resumes; the memo is reset once it holds this many phrases
+    PHRASE_MEMO_SIZE = 100000
+
+    def __init__(self, role_keywords, fuzzy_cutoff=0.85):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.role_keywords = {
+            role: list(dict.fromkeys(kw.lower() for kw in keywords))
+            for role, keywords in role_keywords.items()
+        }
+        self.keywords = sorted({kw for kws in self.role_keywords.values() for kw in kws})
+        self.max_words = max((len(kw.split()) for kw in self.keywords), default=1)
+        self._phrase_memo = {}
+        self._build_automaton()
+        self._build_fuzzy_index()
+
+    def _build_automaton(self):
+        # Trie transitions, failure links and per-state output keywords
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for kw in self.keywords:
+            state = 0
+            for ch in kw:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(kw)
+
+        # Breadth-first pass to fill in failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _build_fuzzy_index(self):
+        self._trigram_index = defaultdict(set)
+        for kw in self.keywords:
+            for gram in _trigrams(kw):
+                self._trigram_index[gram].add(kw)
+
+        # ratio = 2*M/(a+b) <= 2*min(a,b)/(a+b), so for each phrase length only
+        # keywords of a compatible length can possibly reach the cutoff
+        max_len = max((len(kw) for kw in self.keywords), default=0)
+        self._length_index = {}
+        for length in range(1, int(max_len * 2 / self.fuzzy_cutoff) + 2):
+            compatible = frozenset(
+                kw for kw in self.keywords
+                if 2 * min(len(kw), length) / (len(kw) + length) >= self.fuzzy_cutoff
+            )
+            if compatible:
+                self._length_index[length] = compatible
+
+    def find_all(self, text_lower):
+        """Return ``{keyword: [(start, end), ...]}`` for every substring hit"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = defaultdict(list)
+        state = 0
+        for i, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for kw in out[state]:
+                hits[kw].append((i - len(kw) + 1, i + 1))
+        return hits
+
+    @staticmethod
+    def _on_word_boundary(text, start, end):
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end] if end < len(text) else ' '
+        return not (before.isalnum() or before == '_') and not (after.isalnum() or after == '_')
+
+    def _fuzzy_candidates(self, phrase):
+        """Keywords sharing enough trigrams with ``phrase`` to possibly reach the cutoff"""
+        lp = len(phrase)
+        eligible = self._length_index.get(lp)
+        if not eligible:
+            return
+
+        shared = defaultdict(int)
+        for gram in _trigrams(phrase):
+            for kw in self._trigram_index.get(gram, ()):
+                if kw in eligible:
+                    shared[kw] += 1
+
+        for kw, count in shared.items():
+            lk = len(kw)
+            # ratio = 2*M/(lk+lp) needs M matching characters; each unmatched
+            # keyword character breaks at most 3 of its lk+1 padded trigrams
+            # and each unmatched phrase character at most 2
+            min_matches = self.fuzzy_cutoff * (lk + lp) / 2
+            if count < (lk + 1) - 3 * (lk - min_matches) - 2 * (lp - min_matches):
+                continue
+            yield kw
+
+    def _phrase_matches(self, phrase):
+        """Keywords within the fuzzy cutoff of ``phrase`` (memoized)"""
+        matches = self._phrase_memo.get(phrase)
+        if matches is None:
+            matches = []
+            for kw in self._fuzzy_candidates(phrase):
+                # Like get_close_matches, the keyword is seq2 (the cached side)
+                matcher = SequenceMatcher(None, phrase, kw)
+                if (matcher.real_quick_ratio() >= self.fuzzy_cutoff
+                        and matcher.quick_ratio() >= self.fuzzy_cutoff
+                        and matcher.ratio() >= self.fuzzy_cutoff):
+                    matches.append(kw)
+            matches = tuple(matches)
+            if len(self._phrase_memo) >= self.PHRASE_MEMO_SIZE:
+                self._phrase_memo.clear()
+            self._phrase_memo[phrase] = matches
+        return matches
+
+    def _fuzzy_indexed(self, text_lower, missing):
+        words = [m.group(0) for m in WORD_RE.finditer(text_lower)]
+        phrases = dict.fromkeys(words)
+        for n in range(2, self.max_words + 1):
+            for i in range(len(words) - n + 1):
+                phrases[" ".join(words[i:i + n])] = None
+
+        found = {}
+        for phrase in phrases:
+            for kw in self._phrase_matches(phrase):
+                if kw in missing and kw not in found:
+                    found[kw] = phrase
+        return found
+
+    def _fuzzy_compat(self, text_lower, missing):
+        tokens = set(COMPAT_TOKEN_RE.findall(text_lower))
+        found = {}
+        for kw in missing:
+            close = get_close_matches(kw, tokens, n=1, cutoff=self.fuzzy_cutoff)
+            if close:
+                found[kw] = close[0]
+        return found
+
+    def match(self, text, mode='indexed'):
+        """Return ``(exact_spans, fuzzy_hits)`` for all keywords in ``text``"""
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode}")
+        text_lower = text.lower()
+        hits = self.find_all(text_lower)
+        if mode == 'indexed':
+            hits = {
+                kw: [span for span in spans if self._on_word_boundary(text_lower, *span)]
+                for kw, spans in hits.items()
+            }
+            hits = {kw: spans for kw, spans in hits.items() if spans}
+
+        missing = [kw for kw in self.keywords if kw not in hits]
+        if mode == 'indexed':
+            fuzzy = self._fuzzy_indexed(text_lower, set(missing))
+        else:
+            fuzzy = self._fuzzy_compat(text_lower, missing)
+        return dict(hits), fuzzy
+
+    def score_all(self, text, mode='indexed'):
+        """Score ``text`` against every role
+
+        Returns ``{role: {'score': int, 'matched': {kw: spans}, 'fuzzy': {kw: token}}}``
+        where ``score`` is the percentage of the role's keywords found.
+        """
+        hits, fuzzy = self.match(text, mode)
+        results = {}
+        for role, keywords in self.role_keywords.items():
+            matched = {kw: hits[kw] for kw in keywords if kw in hits}
+            fuzzy_matched = {kw: fuzzy[kw] for kw in keywords if kw in fuzzy and kw not in hits}
+            found = len(matched) + len(fuzzy_matched)
+            results[role] = {
+                'score': int(100 * found / len(keywords)) if keywords else 0,
+                'matched': matched,
+                'fuzzy': fuzzy_matched,
+            }
+        return results
+
+    def score(self, text, role, mode='indexed'):
+        """ATS score (0-100) of ``text`` for a single role"""
+        if not self.role_keywords.get(role):
+            return 0
+        return self.score_all(text, mode)[role]['score']
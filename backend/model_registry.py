@@ -0,0 +1,281 @@
+"""
+Process-wide registry for the pickled ML artifacts used by the API.
+
+Artifacts are ``<name>.pkl`` (pickle) or ``<name>.joblib`` files. joblib files
+are loaded with their numpy arrays memory-mapped read-only, so the arrays
+live in the OS page cache and are shared by every worker process, including
+after a hot-swap.
+
+Each artifact is loaded once per process and handed out as an immutable
+ModelHandle. The registry re-stats the backing file at most every
+``check_interval`` seconds and, when it changed, loads the new file and swaps
+the handle atomically; requests already holding the old handle keep using it.
+Calling ``preload()`` at import time means that with ``gunicorn --preload`` the
+models are loaded once in the master and shared copy-on-write by the workers.
+
+Artifacts that only work together (a vectorizer and the classifier fitted on
+its output) are read with ``get_group()``: the files are re-checked under one
+lock and the handles are swapped as a set, only after every changed file has
+loaded and the set passes an optional compatibility check.
+"""
+import os
+import sys
+import pickle
+import threading
+import time
+import logging
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Searched in order: backend/model (Railway deployment), then the training output
+DEFAULT_MODEL_DIRS = [
+    os.path.join(BACKEND_DIR, 'model'),
+    os.path.join(os.path.dirname(BACKEND_DIR), 'ai_interviewer_project', 'model'),
+]
+
+ARTIFACT_EXTENSIONS = ('.pkl', '.joblib')
+
+
+def estimate_memory(obj, _seen=None):
+    """Approximate the in-memory size of a loaded model in bytes
+
+    numpy arrays and scipy sparse matrices dominate sklearn models, so their
+    buffers are counted exactly and everything else via sys.getsizeof.
+    Memory-mapped arrays are file-backed and shared, so they count as 0.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.memmap):
+        return 0
+    nbytes = getattr(obj, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if hasattr(obj, 'tocsr') and hasattr(obj, 'data'):
+        # scipy.sparse matrix: data plus index arrays
+        return sum(estimate_memory(getattr(obj, attr, None), _seen) for attr in ('data', 'indices', 'indptr'))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_memory(k, _seen) + estimate_memory(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_memory(item, _seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += estimate_memory(vars(obj), _seen)
+    return size
+
+
+def file_stamp(path):
+    """Return a value that changes whenever the file is replaced or rewritten"""
+    st = os.stat(path)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ModelHandle:
+    """Immutable snapshot of one loaded artifact"""
+
+    __slots__ = ('name', 'model', 'version', 'path', 'loaded_at', 'load_time_ms', 'memory_bytes', 'stamp')
+
+    def __init__(self, name, model, version, path, loaded_at, load_time_ms, memory_bytes, stamp):
+        self.name = name
+        self.model = model
+        self.version = version
+        self.path = path
+        self.loaded_at = loaded_at
+        self.load_time_ms = load_time_ms
+        self.memory_bytes = memory_bytes
+        self.stamp = stamp
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'path': self.path,
+            'loaded_at': self.loaded_at,
+            'load_time_ms': self.load_time_ms,
+            'memory_bytes': self.memory_bytes,
+        }
+
+
+class ModelRegistry:
+    """Load model artifacts once per process and hot-swap them on file change"""
+
+    def __init__(self, model_dirs=None, check_interval=5.0, mmap_mode='r'):
+        self.model_dirs = list(model_dirs or DEFAULT_MODEL_DIRS)
+        self.check_interval = check_interval
+        # Passed to joblib.load; None loads .joblib arrays into process memory
+        self.mmap_mode = mmap_mode
+        self._handles = {}
+        self._groups = {}
+        self._last_checked = {}
+        self._failed_stamps = {}
+        self._name_locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, name):
+        with self._locks_guard:
+            if name not in self._name_locks:
+                self._name_locks[name] = threading.Lock()
+            return self._name_locks[name]
+
+    def resolve_path(self, name):
+        """Return the first existing ``<name>.pkl`` or ``<name>.joblib`` in the model directories"""
+        for model_dir in self.model_dirs:
+            for extension in ARTIFACT_EXTENSIONS:
+                path = os.path.join(model_dir, f"{name}{extension}")
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def _load(self, name, path, stamp, version):
+        start = time.perf_counter()
+        if path.endswith('.joblib'):
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+        else:
+            with open(path, 'rb') as f:
+                model = pickle.load(f)
+        load_time_ms = (time.perf_counter() - start) * 1000
+
+        return ModelHandle(
+            name=name,
+            model=model,
+            version=version,
+            path=path,
+            loaded_at=time.time(),
+            load_time_ms=round(load_time_ms, 2),
+            memory_bytes=estimate_memory(model),
+            stamp=stamp,
+        )
+
+    def _refresh(self, name):
+        """Load or hot-swap ``name`` if its file changed since the last load"""
+        path = self.resolve_path(name)
+        current = self._handles.get(name)
+        if path is None:
+            if current is None and name not in self._failed_stamps:
+                logger.warning(f"⚠️ Model artifact '{name}' not found in {self.model_dirs}")
+                self._failed_stamps[name] = None
+            return current
+
+        try:
+            stamp = file_stamp(path)
+        except OSError:
+            return current
+
+        if current is not None and current.path == path and current.stamp == stamp:
+            return current
+        if self._failed_stamps.get(name) == stamp:
+            # Same broken file as last time (e.g. still being written)
+            return current
+
+        version = current.version + 1 if current is not None else 1
+        try:
+            handle = self._load(name, path, stamp, version)
+        except Exception as e:
+            logger.error(f"❌ Failed to load model '{name}' from {path}: {e}")
+            self._failed_stamps[name] = stamp
+            return current
+
+        self._failed_stamps.pop(name, None)
+        self._handles[name] = handle
+        if current is None:
+            logger.info(f"✅ Loaded model '{name}' v{version} in {handle.load_time_ms}ms")
+        else:
+            logger.info(f"🔄 Hot-swapped model '{name}' to v{version}")
+        return handle
+
+    def get(self, name):
+        """Return the current ModelHandle for ``name``, or None if it cannot be loaded"""
+        now = time.monotonic()
+        handle = self._handles.get(name)
+        if handle is not None and now - self._last_checked.get(name, 0) < self.check_interval:
+            return handle
+
+        with self._lock_for(name):
+            # Another thread may have refreshed while we waited for the lock
+            if now - self._last_checked.get(name, 0) < self.check_interval:
+                return self._handles.get(name)
+            handle = self._refresh(name)
+            self._last_checked[name] = time.monotonic()
+            return handle
+
+    def _refresh_group(self, names, validate):
+        """Reload a group if any member changed; swap it only as a consistent set"""
+        current = self._groups.get(names)
+        paths = [self.resolve_path(name) for name in names]
+        if None in paths:
+            if current is None and names not in self._failed_stamps:
+                missing = [name for name, path in zip(names, paths) if path is None]
+                logger.warning(f"⚠️ Model artifacts {missing} not found in {self.model_dirs}")
+                self._failed_stamps[names] = None
+            return current
+        try:
+            stamps = tuple(file_stamp(path) for path in paths)
+        except OSError:
+            return current
+        if self._failed_stamps.get(names) == stamps:
+            # Same broken or mismatched files as last time (e.g. still being written)
+            return current
+
+        handles = []
+        try:
+            for name, path, stamp in zip(names, paths, stamps):
+                previous = self._handles.get(name)
+                if previous is not None and previous.path == path and previous.stamp == stamp:
+                    handles.append(previous)
+                    continue
+                version = previous.version + 1 if previous is not None else 1
+                handles.append(self._load(name, path, stamp, version))
+            handles = tuple(handles)
+            if handles == current:
+                return current
+            if validate is not None and not validate(*(handle.model for handle in handles)):
+                raise ValueError("artifacts do not belong together")
+        except Exception as e:
+            logger.error(f"❌ Failed to load model group {list(names)}: {e}")
+            self._failed_stamps[names] = stamps
+            return current
+
+        self._failed_stamps.pop(names, None)
+        self._groups[names] = handles
+        for handle in handles:
+            self._handles[handle.name] = handle
+        versions = ', '.join(f"'{handle.name}' v{handle.version}" for handle in handles)
+        logger.info(f"{'✅ Loaded' if current is None else '🔄 Hot-swapped'} model group {versions}")
+        return handles
+
+    def get_group(self, names, validate=None):
+        """Return ModelHandles for ``names`` that are always swapped together
+
+        ``validate(*models)`` must return True for a new set to replace the
+        current one; until then the previous set keeps being served. Returns
+        None if the group has never loaded.
+        """
+        names = tuple(names)
+        now = time.monotonic()
+        handles = self._groups.get(names)
+        if handles is not None and now - self._last_checked.get(names, 0) < self.check_interval:
+            return handles
+
+        with self._lock_for(names):
+            if now - self._last_checked.get(names, 0) < self.check_interval:
+                return self._groups.get(names)
+            handles = self._refresh_group(names, validate)
+            self._last_checked[names] = time.monotonic()
+            return handles
+
+    def preload(self, names):
+        """Eagerly load ``names``; call before forking workers to share pages"""
+        for name in names:
+            self.get(name)
+
+    def stats(self):
+        """Per-model load time, memory and version for the health endpoint"""
+        return {name: handle.to_dict() for name, handle in self._handles.items()}
@@ -0,0 +1,192 @@
+"""
+Streaming classification metrics from prediction/outcome pairs.
+
+A ConfusionMatrix keeps per-label counts (support, predicted, correct), so
+adding or removing one pair is O(1) and accuracy plus weighted precision,
+recall and F1 are derived on demand. The weighted averages match sklearn's
+``average='weighted', zero_division=0``.
+
+Each model gets a cumulative matrix, a sliding window over the last
+``window_size`` pairs and a tumbling window of ``tumbling_seconds``; when a
+tumbling window closes its metrics are handed back to the caller.
+"""
+import os
+import time
+import threading
+from collections import deque
+
+
+class ConfusionMatrix:
+    """Per-label counts of one stream of (prediction, actual) pairs"""
+
+    __slots__ = ('total', 'correct', 'support', 'predicted', 'true_positives')
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.support = {}         # label -> times it was the actual value
+        self.predicted = {}       # label -> times it was predicted
+        self.true_positives = {}  # label -> times predicted and actual
+
+    @classmethod
+    def from_pairs(cls, predictions, actual_values):
+        matrix = cls()
+        for prediction, actual in zip(predictions, actual_values):
+            matrix.add(prediction, actual)
+        return matrix
+
+    def add(self, prediction, actual, count=1):
+        self.total += count
+        self.support[actual] = self.support.get(actual, 0) + count
+        self.predicted[prediction] = self.predicted.get(prediction, 0) + count
+        if prediction == actual:
+            self.correct += count
+            self.true_positives[actual] = self.true_positives.get(actual, 0) + count
+
+    def remove(self, prediction, actual):
+        self.add(prediction, actual, count=-1)
+
+    def __len__(self):
+        return self.total
+
+    def metrics(self):
+        """accuracy and support-weighted precision, recall and f1_score"""
+        if not self.total:
+            return {'accuracy': 0.0, 'precision': 0.0, 'recall': 0.0, 'f1_score': 0.0, 'sample_count': 0}
+        precision = recall = f1 = 0.0
+        # Labels that were only ever predicted have no support and weight 0
+        for label, support in self.support.items():
+            if not support:
+                continue
+            tp = self.true_positives.get(label, 0)
+            predicted = self.predicted.get(label, 0)
+            label_precision = tp / predicted if predicted else 0.0
+            label_recall = tp / support
+            denominator = label_precision + label_recall
+            precision += support * label_precision
+            recall += support * label_recall
+            f1 += support * (2 * label_precision * label_recall / denominator if denominator else 0.0)
+        return {
+            'accuracy': self.correct / self.total,
+            'precision': precision / self.total,
+            'recall': recall / self.total,
+            'f1_score': f1 / self.total,
+            'sample_count': self.total,
+        }
+
+
+class SlidingWindow:
+    """Confusion matrix over the last ``size`` pairs"""
+
+    def __init__(self, size):
+        self.pairs = deque()
+        self.size = size
+        self.matrix = ConfusionMatrix()
+
+    def add(self, prediction, actual):
+        self.pairs.append((prediction, actual))
+        self.matrix.add(prediction, actual)
+        if len(self.pairs) > self.size:
+            self.matrix.remove(*self.pairs.popleft())
+
+
+class TumblingWindow:
+    """Confusion matrix over consecutive, non-overlapping periods of ``seconds``"""
+
+    def __init__(self, seconds, clock=time.time):
+        self.seconds = seconds
+        self.clock = clock
+        self.started_at = clock()
+        self.matrix = ConfusionMatrix()
+        self.last_closed = None
+
+    def add(self, prediction, actual):
+        """Add one pair; returns the metrics of the window it closed, if any"""
+        closed = self.roll()
+        self.matrix.add(prediction, actual)
+        return closed
+
+    def roll(self):
+        """Close the current window if its period is over"""
+        now = self.clock()
+        if now - self.started_at < self.seconds:
+            return None
+        closed = None
+        if self.matrix.total:
+            closed = dict(self.matrix.metrics(), window_start=self.started_at, window_end=now)
+            self.last_closed = closed
+        self.matrix = ConfusionMatrix()
+        self.started_at = now
+        return closed
+
+
+class ModelMetrics:
+    """Cumulative, sliding and tumbling matrices of one model"""
+
+    def __init__(self, window_size, tumbling_seconds):
+        self.cumulative = ConfusionMatrix()
+        self.sliding = SlidingWindow(window_size)
+        self.tumbling = TumblingWindow(tumbling_seconds)
+
+    def add(self, prediction, actual):
+        self.cumulative.add(prediction, actual)
+        self.sliding.add(prediction, actual)
+        return self.tumbling.add(prediction, actual)
+
+
+class OnlineMetrics:
+    """Streaming metrics for every model, created on first use"""
+
+    WINDOWS = ('cumulative', 'sliding', 'tumbling')
+
+    def __init__(self, window_size=1000, tumbling_seconds=3600):
+        self.window_size = window_size
+        self.tumbling_seconds = tumbling_seconds
+        self.models = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            window_size=int(os.environ.get('ONLINE_METRICS_WINDOW', 1000)),
+            tumbling_seconds=int(os.environ.get('ONLINE_METRICS_TUMBLING_SECONDS', 3600)),
+        )
+
+    def _model(self, model_name):
+        model = self.models.get(model_name)
+        if model is None:
+            model = self.models[model_name] = ModelMetrics(self.window_size, self.tumbling_seconds)
+        return model
+
+    def record(self, model_name, prediction, actual):
+        """Add one pair; returns the metrics of a tumbling window it closed, if any"""
+        with self._lock:
+            return self._model(model_name).add(prediction, actual)
+
+    def record_batch(self, model_name, predictions, actual_values):
+        """Add a batch of pairs; returns the tumbling windows it closed"""
+        closed = []
+        with self._lock:
+            model = self._model(model_name)
+            for prediction, actual in zip(predictions, actual_values):
+                window = model.add(prediction, actual)
+                if window:
+                    closed.append(window)
+        return closed
+
+    def metrics(self, model_name, window='sliding'):
+        """Metrics of one model's ``cumulative``, ``sliding`` or ``tumbling`` window
+
+        ``tumbling`` is the last closed window, or None before the first closes.
+        """
+        if window not in self.WINDOWS:
+            raise ValueError(f"Unknown window: {window}")
+        with self._lock:
+            model = self.models.get(model_name)
+            if model is None:
+                return None
+            if window == 'cumulative':
+                return model.cumulative.metrics()
+            if window == 'sliding':
+                return model.sliding.matrix.metrics()
+            return model.tumbling.last_closed
@@ -0,0 +1,341 @@
+"""
+Bounded PDF text extraction for uploaded resumes.
+
+Uploads are streamed in chunks into a spooled temp file (hashed on the way in)
+and rejected as soon as they exceed the byte limit. Text is extracted on a
+bounded process pool so one huge or pathological PDF cannot monopolise the
+request thread: small PDFs as one task, larger ones split into per-page
+tasks. Each file gets one deadline for all its pages, and per-page timings
+are reported with the text. Only with PDF_WORKERS=0 are pages extracted
+inline, without a deadline. Batches of PDFs are extracted file-parallel on the same pool
+(extract_many).
+
+Requests lease the pool. After a timeout the leased pool is retired: new
+requests get a fresh pool, and the retired one (with its stuck worker) is
+terminated only once its last lease is returned, so a slow file never kills
+pages of other requests.
+
+Pool workers are started from a forkserver (spawn where that is missing),
+never forked from the API worker itself: it runs request, job and Gemini
+threads, and a forked child could inherit a lock one of them held.
+Like any spawned pool, the workers re-import ``__main__``, so scripts that
+extract PDFs need an ``if __name__ == '__main__'`` guard.
+"""
+import os
+import queue
+import hashlib
+import tempfile
+import time
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from functools import lru_cache
+
+import PyPDF2
+
+CHUNK_SIZE = 64 * 1024
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PDFExtractionError(ValueError):
+    """The PDF could not be accepted for extraction"""
+
+
+class PDFTooLargeError(PDFExtractionError):
+    """The PDF exceeds the configured byte or page limit"""
+
+
+class SpooledUpload:
+    """Uploaded file spooled to memory/disk with its size and SHA-256"""
+
+    def __init__(self, memory_limit):
+        self.file = tempfile.SpooledTemporaryFile(max_size=memory_limit)
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._path = None
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+
+    @property
+    def digest(self):
+        return self._sha256.hexdigest()
+
+    def open(self):
+        """Rewind and return the spooled file for reading"""
+        self.file.seek(0)
+        return self.file
+
+    def path(self):
+        """A real path for worker processes, written on first use"""
+        if self._path is None:
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+                source = self.open()
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                    f.write(chunk)
+                self._path = f.name
+        return self._path
+
+    def close(self):
+        self.file.close()
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@lru_cache(maxsize=4)
+def _open_reader(path):
+    # Cached per worker process so consecutive pages of one PDF share the parse
+    return PyPDF2.PdfReader(path)
+
+
+def _extract_page(path, index):
+    """Worker task: extract one page, returning (text, milliseconds)"""
+    start = time.perf_counter()
+    text = _open_reader(path).pages[index].extract_text() or ''
+    return text, (time.perf_counter() - start) * 1000
+
+
+def _extract_document(path, max_pages):
+    """Worker task: extract a whole PDF, returning the same dict as PDFExtractor.extract"""
+    start = time.perf_counter()
+    try:
+        reader = PyPDF2.PdfReader(path)
+        page_count = len(reader.pages)
+    except Exception as e:
+        raise PDFExtractionError(f"Unreadable PDF: {e}") from None
+    if page_count > max_pages:
+        raise PDFTooLargeError(f"PDF has {page_count} pages (limit {max_pages})")
+
+    pages, page_times = [], []
+    for page in reader.pages:
+        page_start = time.perf_counter()
+        pages.append(page.extract_text() or '')
+        page_times.append(round((time.perf_counter() - page_start) * 1000, 2))
+    return {
+        'text': "".join(pages),
+        'page_count': page_count,
+        'page_times_ms': page_times,
+        'timed_out_pages': [],
+        'total_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+class PDFExtractor:
+    """Extract resume text with byte/page limits and per-page timeouts"""
+
+    def __init__(self, max_bytes=10 * 1024 * 1024, max_pages=50, page_timeout=10.0,
+                 max_workers=2, parallel_min_pages=4, memory_limit=1024 * 1024, file_timeout=60.0):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.file_timeout = file_timeout
+        self.max_workers = max_workers
+        self.parallel_min_pages = parallel_min_pages
+        self.memory_limit = memory_limit
+        self._pool = None
+        self._pool_users = {}
+        self._retired_pools = set()
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_bytes=int(os.environ.get('PDF_MAX_BYTES', 10 * 1024 * 1024)),
+            max_pages=int(os.environ.get('PDF_MAX_PAGES', 50)),
+            page_timeout=float(os.environ.get('PDF_PAGE_TIMEOUT', 10)),
+            max_workers=int(os.environ.get('PDF_WORKERS', 2)),
+            file_timeout=float(os.environ.get('PDF_FILE_TIMEOUT', 60)),
+        )
+
+    def spool(self, stream, memory_limit=None):
+        """Copy ``stream`` into a SpooledUpload, enforcing the byte limit"""
+        upload = SpooledUpload(self.memory_limit if memory_limit is None else memory_limit)
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                upload.write(chunk)
+                if upload.size > self.max_bytes:
+                    raise PDFTooLargeError(f"PDF exceeds {self.max_bytes} bytes")
+        except Exception:
+            upload.close()
+            raise
+        return upload
+
+    @contextmanager
+    def _lease_pool(self):
+        """Yield ``(pool, retire)``; call ``retire()`` after a timeout
+
+        A retired pool is replaced for new callers and terminated when its
+        last lease ends, so a stuck page cannot hold a worker forever.
+        """
+        # Created lazily so a gunicorn --preload master never forks with it
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = multiprocessing.get_context(START_METHOD).Pool(self.max_workers)
+            pool = self._pool
+            self._pool_users[pool] = self._pool_users.get(pool, 0) + 1
+
+        def retire():
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+                    self._retired_pools.add(pool)
+
+        try:
+            yield pool, retire
+        finally:
+            with self._pool_lock:
+                self._pool_users[pool] -= 1
+                finished = pool in self._retired_pools and not self._pool_users[pool]
+                if finished:
+                    self._retired_pools.discard(pool)
+                    del self._pool_users[pool]
+            if finished:
+                pool.terminate()
+
+    @staticmethod
+    def _submit(pool, retire, func, args, **kwargs):
+        try:
+            return pool.apply_async(func, args, **kwargs)
+        except ValueError as e:
+            # "Pool not running": replace it for the next request
+            retire()
+            raise PDFExtractionError(f"PDF extraction pool unavailable: {e}") from e
+
+    def extract(self, upload):
+        """Extract text from a SpooledUpload
+
+        Returns a dict with ``text``, ``page_count``, ``page_times_ms``,
+        ``timed_out_pages`` and ``total_ms``.
+        """
+        start = time.perf_counter()
+        try:
+            reader = PyPDF2.PdfReader(upload.open())
+            page_count = len(reader.pages)
+        except Exception as e:
+            raise PDFExtractionError(f"Unreadable PDF: {e}") from e
+        if page_count > self.max_pages:
+            raise PDFTooLargeError(f"PDF has {page_count} pages (limit {self.max_pages})")
+
+        if self.max_workers < 1:
+            pages, page_times, timed_out = self._extract_inline(reader)
+        elif page_count < self.parallel_min_pages:
+            pages, page_times, timed_out = self._extract_whole(upload.path(), page_count)
+        else:
+            pages, page_times, timed_out = self._extract_parallel(upload.path(), page_count)
+
+        return {
+            'text': "".join(pages),
+            'page_count': page_count,
+            'page_times_ms': [round(ms, 2) for ms in page_times],
+            'timed_out_pages': timed_out,
+            'total_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def _extract_inline(self, reader):
+        pages, page_times = [], []
+        for page in reader.pages:
+            page_start = time.perf_counter()
+            pages.append(page.extract_text() or '')
+            page_times.append((time.perf_counter() - page_start) * 1000)
+        return pages, page_times, []
+
+    def _extract_whole(self, path, page_count):
+        # One pool task for the file, under the same deadline as _extract_parallel
+        budget = min(self.page_timeout * page_count, self.file_timeout)
+        with self._lease_pool() as (pool, retire):
+            result = self._submit(pool, retire, _extract_document, (path, self.max_pages))
+            try:
+                document = result.get(timeout=budget)
+            except multiprocessing.TimeoutError:
+                retire()
+                return [''] * page_count, [budget * 1000] * page_count, list(range(page_count))
+            except PDFExtractionError:
+                raise
+            except Exception as e:
+                raise PDFExtractionError(f"Unreadable PDF: {e}") from e
+        return [document['text']], document['page_times_ms'], []
+
+    def _extract_parallel(self, path, page_count):
+        # One deadline for the whole file: page_timeout per page, capped at file_timeout
+        budget = min(self.page_timeout * page_count, self.file_timeout)
+        deadline = time.monotonic() + budget
+        with self._lease_pool() as (pool, retire):
+            pending = [self._submit(pool, retire, _extract_page, (path, index)) for index in range(page_count)]
+            pages, page_times, timed_out = [], [], []
+            for index, result in enumerate(pending):
+                text, ms = '', 0.0
+                try:
+                    text, ms = result.get(timeout=max(deadline - time.monotonic(), 0))
+                except multiprocessing.TimeoutError:
+                    ms = budget * 1000
+                    timed_out.append(index)
+                except Exception as e:
+                    print(f"Error extracting PDF page {index}: {e}")
+                pages.append(text)
+                page_times.append(ms)
+            if timed_out:
+                retire()
+        return pages, page_times, timed_out
+
+    def extract_many(self, uploads):
+        """Extract a batch of SpooledUploads, one pool task per file
+
+        ``uploads`` maps keys to uploads. Yields lists of ``(key, result)`` as
+        files finish, where ``result`` is an extract() dict or a
+        PDFExtractionError; everything that finished while the caller was
+        busy comes back in one list. If no file finishes within
+        ``file_timeout`` seconds, the rest fail and the pool is retired.
+        """
+        if not uploads:
+            return
+        if self.max_workers < 1:
+            for key, upload in uploads.items():
+                try:
+                    yield [(key, self.extract(upload))]
+                except PDFExtractionError as e:
+                    yield [(key, e)]
+            return
+
+        done = queue.Queue()
+        with self._lease_pool() as (pool, retire):
+            for key, upload in uploads.items():
+                self._submit(
+                    pool, retire, _extract_document, (upload.path(), self.max_pages),
+                    callback=lambda result, key=key: done.put((key, result)),
+                    error_callback=lambda error, key=key: done.put((key, error))
+                )
+
+            pending = set(uploads)
+            while pending:
+                try:
+                    finished = [done.get(timeout=self.file_timeout)]
+                except queue.Empty:
+                    retire()
+                    yield [(key, PDFExtractionError(f"Extraction timed out after {self.file_timeout}s"))
+                           for key in pending]
+                    return
+                while True:
+                    try:
+                        finished.append(done.get_nowait())
+                    except queue.Empty:
+                        break
+
+                batch = []
+                for key, result in finished:
+                    pending.discard(key)
+                    if isinstance(result, Exception) and not isinstance(result, PDFExtractionError):
+                        result = PDFExtractionError(f"Unreadable PDF: {result}")
+                    batch.append((key, result))
+                yield batch
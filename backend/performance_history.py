@@ -0,0 +1,360 @@
+"""
+Append-only store for model performance history.
+
+Entries are written as JSON lines to monthly segment files
+(``history-YYYY-MM-NNNN.jsonl``) in one directory, so tracking an event is a
+single appended line no matter how long the history is. A segment is rolled
+over when the month changes or it reaches ``segment_max_bytes``.
+
+Retention works on whole segments: segments from months entirely before the
+cutoff are deleted, and expired entries in the remaining segments are skipped
+on load. compact() merges each month's closed segments into one file and
+drops expired entries. History is read from disk only on first access.
+
+Loaded entries are kept sorted by timestamp, overall and per model, with
+parallel lists of parsed timestamps, so a time window is two bisects and each
+timestamp is parsed once. aggregate() summarizes every model in one pass over
+a window.
+"""
+import os
+import json
+import threading
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = 'history-'
+SEGMENT_SUFFIX = '.jsonl'
+METRICS = ('accuracy', 'precision', 'recall', 'f1_score')
+# Change in accuracy between the first and last entry of a window that
+# counts as improving/declining
+TREND_THRESHOLD = 0.02
+
+
+def _segment_month(path):
+    # history-2026-10-0003.jsonl -> '2026-10'
+    return path.name[len(SEGMENT_PREFIX):len(SEGMENT_PREFIX) + 7]
+
+
+def _segment_index(path):
+    return int(path.name[len(SEGMENT_PREFIX) + 8:-len(SEGMENT_SUFFIX)])
+
+
+def performance_trend(first_accuracy, last_accuracy, count):
+    """'improving', 'declining', 'stable' or 'insufficient_data'"""
+    if count < 2:
+        return "insufficient_data"
+    if last_accuracy > first_accuracy + TREND_THRESHOLD:
+        return "improving"
+    if last_accuracy < first_accuracy - TREND_THRESHOLD:
+        return "declining"
+    return "stable"
+
+
+class MetricSummary:
+    """Running count, metric sums and first/last entry of a time-ordered group"""
+
+    __slots__ = ('count', 'sums', 'first', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.sums = dict.fromkeys(METRICS, 0.0)
+        self.first = None
+        self.last = None
+
+    def add(self, entry):
+        self.count += 1
+        for metric in METRICS:
+            self.sums[metric] += entry[metric]
+        if self.first is None:
+            self.first = entry
+        self.last = entry
+
+    def to_dict(self):
+        """Same shape as ContinuousLearningSystem.get_performance_summary"""
+        return {
+            'total_entries': self.count,
+            'date_range': {'start': self.first['timestamp'], 'end': self.last['timestamp']},
+            'average_metrics': {metric: total / self.count for metric, total in self.sums.items()},
+            'performance_trend': performance_trend(self.first['accuracy'], self.last['accuracy'], self.count)
+        }
+
+
+def summarize(entries):
+    """Summary dict of time-ordered entries, or None if there are none"""
+    summary = MetricSummary()
+    for entry in entries:
+        summary.add(entry)
+    return summary.to_dict() if summary.count else None
+
+
+class TimeIndex:
+    """Entries sorted by timestamp with a parallel list of datetimes for bisect"""
+
+    __slots__ = ('keys', 'entries')
+
+    def __init__(self):
+        self.keys = []
+        self.entries = []
+
+    def add(self, key, entry):
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.entries.append(entry)
+        else:
+            index = bisect_right(self.keys, key)
+            self.keys.insert(index, key)
+            self.entries.insert(index, entry)
+
+    def window(self, since=None, until=None):
+        """Entries with ``since < timestamp < until`` (either bound optional)"""
+        lo = bisect_right(self.keys, since) if since is not None else 0
+        hi = bisect_left(self.keys, until) if until is not None else len(self.keys)
+        return self.entries[lo:hi]
+
+
+class PerformanceHistoryStore:
+    """Performance entries in append-only JSONL segments, loaded lazily"""
+
+    def __init__(self, directory, retention_days=730, segment_max_bytes=8 * 1024 * 1024, legacy_file=None):
+        self.directory = Path(directory)
+        self.retention_days = retention_days
+        self.segment_max_bytes = segment_max_bytes
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self._entries = None  # TimeIndex of all entries once loaded
+        self._by_model = {}
+        self._legacy_checked = False
+        self._lock = threading.RLock()
+        self._active_path = None
+        self._active_file = None
+
+    @classmethod
+    def from_env(cls, directory, legacy_file=None):
+        return cls(
+            directory,
+            retention_days=int(os.environ.get('PERFORMANCE_RETENTION_DAYS', 730)),
+            segment_max_bytes=int(os.environ.get('PERFORMANCE_SEGMENT_MB', 8)) * 1024 * 1024,
+            legacy_file=legacy_file
+        )
+
+    def segments(self):
+        """Segment paths, oldest first"""
+        if not self.directory.exists():
+            return []
+        return sorted(
+            (p for p in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")),
+            key=lambda p: (_segment_month(p), _segment_index(p))
+        )
+
+    def _cutoff(self):
+        if not self.retention_days:
+            return None
+        return (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+
+    def append(self, entry):
+        """Write one entry to the active segment"""
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._import_legacy()
+            handle = self._segment_for(entry['timestamp'][:7], len(line))
+            handle.write(line)
+            handle.flush()
+            if self._entries is not None:
+                self._index(datetime.fromisoformat(entry['timestamp']), entry)
+        return entry
+
+    def _index(self, key, entry):
+        self._entries.add(key, entry)
+        model_index = self._by_model.get(entry['model_name'])
+        if model_index is None:
+            model_index = self._by_model[entry['model_name']] = TimeIndex()
+        model_index.add(key, entry)
+
+    def _segment_for(self, month, incoming_bytes):
+        """Open handle on the segment the next line goes to, rolling over if needed"""
+        if self._active_file is not None:
+            if (_segment_month(self._active_path) == month
+                    and self._active_file.tell() + incoming_bytes <= self.segment_max_bytes):
+                return self._active_file
+            self._active_file.close()
+            self._active_file = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        same_month = [p for p in self.segments() if _segment_month(p) == month]
+        if same_month and same_month[-1].stat().st_size + incoming_bytes <= self.segment_max_bytes:
+            path = same_month[-1]
+        else:
+            index = _segment_index(same_month[-1]) + 1 if same_month else 0
+            path = self.directory / f"{SEGMENT_PREFIX}{month}-{index:04d}{SEGMENT_SUFFIX}"
+        self._active_path = path
+        # O_APPEND keeps each line intact when several processes track at once
+        self._active_file = open(path, 'a', encoding='utf-8')
+        return self._active_file
+
+    def flush(self):
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+                self._active_path = None
+
+    def _loaded(self):
+        with self._lock:
+            if self._entries is None:
+                self._import_legacy()
+                self._load()
+            return self._entries
+
+    def entries(self):
+        """All entries within retention, oldest first (loaded on first call)"""
+        return self._loaded().entries
+
+    def __len__(self):
+        return len(self.entries())
+
+    def window(self, model_name=None, since=None, until=None):
+        """Entries of one model (or all) with ``since < timestamp < until``, oldest first"""
+        index = self._loaded()
+        if model_name is not None:
+            index = self._by_model.get(model_name)
+            if index is None:
+                return []
+        return index.window(since, until)
+
+    def aggregate(self, since=None, until=None):
+        """``{model_name: summary}`` for every model, in one pass over the window"""
+        summaries = {}
+        for entry in self.window(since=since, until=until):
+            summary = summaries.get(entry['model_name'])
+            if summary is None:
+                summary = summaries[entry['model_name']] = MetricSummary()
+            summary.add(entry)
+        return {model_name: summary.to_dict() for model_name, summary in summaries.items()}
+
+    def latest(self, predicate):
+        """Newest entry matching ``predicate``, or None (scans from the end)"""
+        for entry in reversed(self.entries()):
+            if predicate(entry):
+                return entry
+        return None
+
+    def _read_segment(self, path, cutoff=None):
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write
+                    logger.warning(f"⚠️ Skipping unreadable line {number} in {path.name}")
+                    continue
+                if cutoff is None or entry.get('timestamp', '') >= cutoff:
+                    entries.append(entry)
+        return entries
+
+    def _load(self):
+        self.apply_retention()
+        cutoff = self._cutoff()
+        keyed = []
+        for path in self.segments():
+            keyed.extend(
+                (datetime.fromisoformat(entry['timestamp']), entry)
+                for entry in self._read_segment(path, cutoff)
+            )
+        # Segments are nearly in order already, so this sort is close to linear
+        keyed.sort(key=lambda pair: pair[0])
+        self._entries = TimeIndex()
+        self._by_model = {}
+        for key, entry in keyed:
+            self._index(key, entry)
+        logger.info(f"✅ Loaded performance history with {len(keyed)} entries")
+
+    def _import_legacy(self):
+        """Move entries from the old single-file performance_history.json into segments"""
+        if self._legacy_checked:
+            return
+        self._legacy_checked = True
+        if self.legacy_file is None or not self.legacy_file.exists() or self.segments():
+            return
+        try:
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+            for entry in sorted(legacy, key=lambda e: e['timestamp']):
+                self.append(entry)
+            self.close()
+            self.legacy_file.rename(self.legacy_file.with_name(self.legacy_file.name + '.migrated'))
+            logger.info(f"✅ Imported {len(legacy)} entries from {self.legacy_file.name}")
+        except Exception as e:
+            logger.error(f"❌ Failed to import legacy performance history: {e}")
+
+    def apply_retention(self):
+        """Delete segments from months entirely before the retention cutoff"""
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return 0
+        removed = 0
+        with self._lock:
+            for path in self.segments():
+                if _segment_month(path) < cutoff[:7] and path != self._active_path:
+                    path.unlink()
+                    removed += 1
+            if removed:
+                logger.info(f"🗑️ Removed {removed} expired performance history segments")
+        return removed
+
+    def compact(self):
+        """Merge each month's closed segments into one and drop expired entries
+
+        The segment currently appended to is left alone. Returns the number
+        of segment files removed.
+        """
+        with self._lock:
+            removed = self.apply_retention()
+            cutoff = self._cutoff()
+            by_month = {}
+            for path in self.segments():
+                if path != self._active_path:
+                    by_month.setdefault(_segment_month(path), []).append(path)
+
+            for month, paths in by_month.items():
+                partial = cutoff is not None and month == cutoff[:7]
+                if len(paths) < 2 and not partial:
+                    continue
+                merged = paths[0]
+                tmp_path = merged.with_name(merged.name + '.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as out:
+                    for path in paths:
+                        for entry in self._read_segment(path, cutoff):
+                            out.write(json.dumps(entry, default=str) + "\n")
+                # Readers see either the old or the merged segment, never a partial one
+                os.replace(tmp_path, merged)
+                for path in paths[1:]:
+                    path.unlink()
+                    removed += 1
+
+            if self._entries is not None:
+                # Reloaded on next access
+                self._entries = None
+                self._by_model = {}
+            if removed:
+                logger.info(f"✅ Compacted performance history ({removed} segments removed)")
+            return removed
+
+    def stats(self):
+        segments = self.segments()
+        return {
+            'segments': len(segments),
+            'bytes': sum(p.stat().st_size for p in segments),
+            'loaded_entries': len(self._entries.entries) if self._entries is not None else None,
+            'retention_days': self.retention_days,
+        }
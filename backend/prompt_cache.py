@@ -0,0 +1,169 @@
+"""
+Two-level cache of Gemini responses keyed by model name and prompt.
+
+Prompts are normalized (surrounding whitespace stripped, whitespace runs
+collapsed) and hashed together with the model name, so the same resume/role
+or question/answer sent again -- a retry, a page refresh, a re-submission --
+is answered from the cache instead of spending another Gemini call.
+
+The first level is an in-process LRU with per-entry expiry. The optional
+second level reuses the session store backends (SQLite file or Redis), so
+cached responses survive restarts and are shared between gunicorn workers.
+Select it with GEMINI_CACHE_BACKEND=memory|sqlite|redis.
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL = 24 * 3600  # 1 day
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gemini_cache.db')
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return WHITESPACE_RE.sub(" ", prompt).strip()
+
+
+def prompt_key(model_name, prompt):
+    """SHA-256 of the model name and normalized prompt"""
+    payload = f"{model_name}\n{normalize_prompt(prompt)}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class PromptCache:
+    """In-process LRU of response texts with an optional shared second tier"""
+
+    def __init__(self, max_entries=512, ttl=DEFAULT_CACHE_TTL, store=None, backend='memory'):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.store_errors = 0
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, text = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return text
+
+    def _put_memory(self, key, text, expires_at):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, model_name, prompt):
+        """Return the cached response text for ``prompt``, or None"""
+        key = prompt_key(model_name, prompt)
+        text = self._get_memory(key)
+        if text is not None:
+            return text
+
+        if self.store is not None:
+            try:
+                entry = self.store.get(key)
+            except Exception as e:
+                entry = None
+                with self._lock:
+                    self.store_errors += 1
+                logger.warning(f"⚠️ Gemini cache lookup failed: {e}")
+            if entry is not None:
+                # Promote to the in-process tier for the rest of its lifetime
+                self._put_memory(key, entry['text'], entry['expires_at'])
+                with self._lock:
+                    self.store_hits += 1
+                return entry['text']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, model_name, prompt, text, ttl=None):
+        """Cache ``text`` as the response to ``prompt``"""
+        key = prompt_key(model_name, prompt)
+        ttl = ttl or self.ttl
+        expires_at = time.time() + ttl
+        self._put_memory(key, text, expires_at)
+        with self._lock:
+            self.writes += 1
+
+        if self.store is not None:
+            try:
+                self.store.set(key, {'text': text, 'expires_at': expires_at}, ttl)
+            except Exception as e:
+                with self._lock:
+                    self.store_errors += 1
+                logger.warning(f"⚠️ Gemini cache write failed: {e}")
+
+    def clear(self):
+        """Drop the in-process tier (the shared tier expires on its own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.store_hits + self.misses
+            return {
+                'backend': self.backend,
+                'entries': len(self._entries),
+                'memory_hits': self.memory_hits,
+                'store_hits': self.store_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.store_hits) / lookups, 3) if lookups else 0.0,
+                'writes': self.writes,
+                'store_errors': self.store_errors,
+            }
+
+
+def create_prompt_cache():
+    """Build the cache selected by GEMINI_CACHE_BACKEND (default: memory only)"""
+    backend = os.getenv('GEMINI_CACHE_BACKEND', 'memory').lower()
+    ttl = int(os.getenv('GEMINI_CACHE_TTL', DEFAULT_CACHE_TTL))
+    max_entries = int(os.getenv('GEMINI_CACHE_MAX_ENTRIES', 512))
+
+    store = None
+    if backend == 'redis':
+        try:
+            from database_config import DatabaseManager
+            from session_store import RedisSessionStore
+            db_manager = DatabaseManager()
+            if db_manager.connect_redis():
+                logger.info("✅ Using Redis for the Gemini response cache")
+                store = RedisSessionStore(db_manager, ttl=ttl, prefix='gemini:')
+        except Exception as e:
+            logger.error(f"❌ Redis Gemini cache unavailable: {e}")
+        if store is None:
+            logger.warning("⚠️ Falling back to SQLite Gemini cache")
+            backend = 'sqlite'
+
+    if backend == 'sqlite':
+        from session_store import SQLiteSessionStore
+        store = SQLiteSessionStore(os.getenv('GEMINI_CACHE_DB_PATH', DEFAULT_SQLITE_PATH), ttl=ttl)
+    elif store is None:
+        backend = 'memory'
+
+    return PromptCache(max_entries=max_entries, ttl=ttl, store=store, backend=backend)
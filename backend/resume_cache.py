@@ -0,0 +1,68 @@
+"""
+In-process LRU cache of resume analyses keyed by the SHA-256 of the PDF bytes
+(computed while the upload is spooled, see pdf_extraction.SpooledUpload).
+
+An entry holds everything derived from the file that does not depend on the
+role the candidate picked -- extracted text, TF-IDF vector, classifier
+probabilities, and ATS scores and skills for every role -- plus Gemini
+analyses filled in per role as they are requested. Re-uploading the same PDF,
+or the same PDF for a different role, is then served without recomputation.
+"""
+import threading
+from collections import OrderedDict
+
+from model_registry import estimate_memory
+
+
+class ResumeAnalysisCache:
+    """Thread-safe LRU cache bounded by entry count and approximate bytes"""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest):
+        """Return the cached analysis for ``digest`` (marking it recently used) or None"""
+        with self._lock:
+            analysis = self._entries.get(digest)
+            if analysis is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return analysis
+
+    def put(self, digest, analysis):
+        """Insert or replace an analysis, evicting least recently used entries"""
+        size = estimate_memory(analysis)
+        with self._lock:
+            if digest in self._entries:
+                self._total_bytes -= self._sizes.pop(digest)
+                del self._entries[digest]
+            if size > self.max_bytes:
+                # Never cache a single entry bigger than the whole budget
+                return
+            self._entries[digest] = analysis
+            self._sizes[digest] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
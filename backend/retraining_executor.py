@@ -0,0 +1,241 @@
+"""
+Out-of-process retraining with shadow evaluation and atomic promotion.
+
+RetrainingExecutor.run() pickles the training data into a scratch directory
+next to the live artifact and starts this module as a child process. The
+child lowers its priority, applies CPU-time and address-space limits,
+splits off a holdout set, fits EnhancedResumeTrainer's feature pipeline and
+ensemble on the rest, and scores both the candidate and the live pipeline on
+the holdout. The serving process only waits on the child, so a fit never
+holds its GIL.
+
+If the candidate is at least ``min_improvement`` more accurate than the live
+model, it is renamed over the live artifact. The rename is atomic and gives
+the file a new inode, so ModelRegistry hot-swaps it in every worker on its
+next check without a restart. The replaced artifact is kept as
+``<name>.previous`` for rollback().
+
+    python retraining_executor.py --data data.pkl --live model/resume_pipeline.joblib --output-dir /tmp/x
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+TRAINING_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'ai_interviewer_project')
+
+# resume_pipeline.PIPELINE_FILENAME (not imported here to keep sklearn out of the parent)
+PIPELINE_ARTIFACT = 'resume_pipeline.joblib'
+CANDIDATE_FILENAME = 'candidate.joblib'
+RESULT_FILENAME = 'result.json'
+LOG_FILENAME = 'train.log'
+
+
+class RetrainingError(Exception):
+    """The retraining child failed, was killed by a limit, or timed out"""
+
+
+class RetrainingExecutor:
+    """Retrain the resume pipeline in a resource-limited child process"""
+
+    def __init__(self, live_path, cpu_seconds=3600, memory_mb=4096, timeout=7200, n_jobs=1,
+                 holdout_fraction=0.2, min_improvement=0.0):
+        self.live_path = Path(live_path)
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self.n_jobs = n_jobs
+        self.holdout_fraction = holdout_fraction
+        self.min_improvement = min_improvement
+
+    @classmethod
+    def from_env(cls, live_path):
+        return cls(
+            live_path,
+            cpu_seconds=int(os.environ.get('RETRAIN_CPU_SECONDS', 3600)),
+            memory_mb=int(os.environ.get('RETRAIN_MEMORY_MB', 4096)),
+            timeout=int(os.environ.get('RETRAIN_TIMEOUT', 7200)),
+            n_jobs=int(os.environ.get('RETRAIN_N_JOBS', 1)),
+            holdout_fraction=float(os.environ.get('RETRAIN_HOLDOUT_FRACTION', 0.2)),
+            min_improvement=float(os.environ.get('RETRAIN_MIN_IMPROVEMENT', 0.0)),
+        )
+
+    @property
+    def previous_path(self):
+        return self.live_path.with_name(self.live_path.name + '.previous')
+
+    def run(self, training_data):
+        """Train, shadow-evaluate and maybe promote a candidate
+
+        Returns the child's result (candidate and live holdout metrics) with
+        ``promoted`` set. Raises RetrainingError if the child fails.
+        """
+        self.live_path.parent.mkdir(parents=True, exist_ok=True)
+        # Same filesystem as the live artifact, so promotion is a rename
+        work_dir = Path(tempfile.mkdtemp(prefix='.retrain-', dir=self.live_path.parent))
+        try:
+            data_path = work_dir / 'training_data.pkl'
+            training_data.to_pickle(data_path)
+
+            start = time.perf_counter()
+            self._run_child(data_path, work_dir)
+            with open(work_dir / RESULT_FILENAME) as f:
+                result = json.load(f)
+            result['seconds'] = round(time.perf_counter() - start, 2)
+
+            result['promoted'] = self.should_promote(result['candidate'], result.get('live'))
+            if result['promoted']:
+                self.promote(work_dir / CANDIDATE_FILENAME)
+            return result
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _run_child(self, data_path, work_dir):
+        command = [
+            sys.executable, os.path.abspath(__file__),
+            '--data', str(data_path),
+            '--live', str(self.live_path),
+            '--output-dir', str(work_dir),
+            '--holdout-fraction', str(self.holdout_fraction),
+            '--cpu-seconds', str(self.cpu_seconds),
+            '--memory-mb', str(self.memory_mb),
+            '--n-jobs', str(self.n_jobs),
+        ]
+        env = dict(os.environ)
+        # Keep BLAS from using every core the serving workers need
+        env.setdefault('OMP_NUM_THREADS', str(max(self.n_jobs, 1)))
+        log_path = work_dir / LOG_FILENAME
+        with open(log_path, 'w') as log:
+            try:
+                completed = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT,
+                                           env=env, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                raise RetrainingError(f"Retraining timed out after {self.timeout}s")
+        if completed.returncode != 0:
+            with open(log_path, errors='replace') as f:
+                tail = f.read()[-2000:]
+            reason = (f"killed by signal {-completed.returncode}" if completed.returncode < 0
+                      else f"exited with status {completed.returncode}")
+            raise RetrainingError(f"Retraining process {reason}:\n{tail}")
+
+    def should_promote(self, candidate, live):
+        if live is None:
+            return True
+        return candidate['accuracy'] >= live['accuracy'] + self.min_improvement
+
+    def promote(self, candidate_path):
+        """Rename the candidate over the live artifact, keeping the old one as .previous"""
+        if self.live_path.exists():
+            backup_tmp = self.previous_path.with_name(self.previous_path.name + '.tmp')
+            if backup_tmp.exists():
+                backup_tmp.unlink()
+            try:
+                os.link(self.live_path, backup_tmp)
+            except OSError:
+                shutil.copy2(self.live_path, backup_tmp)
+            os.replace(backup_tmp, self.previous_path)
+        os.replace(candidate_path, self.live_path)
+        logger.info(f"✅ Promoted retrained model to {self.live_path}")
+
+    def rollback(self):
+        """Put the artifact replaced by the last promotion back in place"""
+        if not self.previous_path.exists():
+            return False
+        os.replace(self.previous_path, self.live_path)
+        logger.info(f"🔄 Rolled back {self.live_path} to the previous model")
+        return True
+
+
+def _apply_limits(cpu_seconds, memory_mb):
+    try:
+        os.nice(10)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _evaluate(pipeline, holdout):
+    from online_metrics import ConfusionMatrix
+    predictions = pipeline.predict(holdout)
+    return ConfusionMatrix.from_pairs(list(predictions), list(holdout['selected'])).metrics()
+
+
+def train_candidate(data_path, live_path, output_dir, holdout_fraction=0.2, n_jobs=1):
+    """Child side: fit a candidate pipeline and score it and the live one on a holdout"""
+    sys.path.append(TRAINING_DIR)
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from enhanced_training import EnhancedResumeTrainer
+    from resume_pipeline import build_pipeline, save_pipeline, load_pipeline
+
+    df = pd.read_pickle(data_path)
+    train_df, holdout_df = train_test_split(df, test_size=holdout_fraction, random_state=42)
+
+    trainer = EnhancedResumeTrainer(n_jobs=n_jobs)
+    X = trainer.create_advanced_features(train_df)
+    trainer.train_ensemble_models(X, train_df['selected'].values)
+    pipeline = build_pipeline(trainer.features, trainer.ensemble)
+
+    result = {
+        'train_rows': len(train_df),
+        'holdout_rows': len(holdout_df),
+        'candidate': _evaluate(pipeline, holdout_df),
+        'live': None,
+    }
+    if os.path.exists(live_path):
+        try:
+            result['live'] = _evaluate(load_pipeline(live_path)['pipeline'], holdout_df)
+        except Exception as e:
+            # An unreadable or incompatible live model is replaced
+            result['live_error'] = str(e)
+
+    save_pipeline(pipeline, os.path.join(output_dir, CANDIDATE_FILENAME), metadata={
+        'members': list(trainer.ensemble.estimators),
+        'n_features': trainer.features.n_features_out_,
+        'dtype': trainer.dtype.name,
+        'ensemble_accuracy': trainer.ensemble_accuracy,
+        'holdout_accuracy': result['candidate']['accuracy'],
+        'stage_times': dict(trainer.stage_times)
+    })
+    with open(os.path.join(output_dir, RESULT_FILENAME), 'w') as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the resume pipeline (run by RetrainingExecutor)")
+    parser.add_argument('--data', required=True, help="Pickled DataFrame of training records")
+    parser.add_argument('--live', required=True, help="Live pipeline artifact to compare against")
+    parser.add_argument('--output-dir', required=True)
+    parser.add_argument('--holdout-fraction', type=float, default=0.2)
+    parser.add_argument('--cpu-seconds', type=int, default=0, help="RLIMIT_CPU (0 = unlimited)")
+    parser.add_argument('--memory-mb', type=int, default=0, help="RLIMIT_AS (0 = unlimited)")
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    _apply_limits(args.cpu_seconds, args.memory_mb)
+    result = train_candidate(args.data, args.live, args.output_dir, args.holdout_fraction, args.n_jobs)
+    print(f"✅ Candidate accuracy {result['candidate']['accuracy']:.4f}"
+          + (f", live {result['live']['accuracy']:.4f}" if result['live'] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Precomputed per-role scoring for resumes and interview answers.
+
+Every role's keywords are lowercased and compiled into word-boundary regexes
+once, when the app starts; multi-word keywords ("machine learning", "test
+case") match across any run of whitespace. ATS scores come from the shared
+KeywordMatcher automaton. Skill extraction and answer relevance use the
+per-role keyword sets here, so all three paths agree on a role's keywords.
+Answers are lowercased once, and a batch of answers gets its sentiment from
+a single polarity_batch call.
+"""
+import re
+from collections import Counter
+
+WORD_RE = re.compile(r"\b\w+\b")
+
+STOPWORDS = frozenset([
+    "the", "and", "for", "with", "you", "are", "but", "all", "can", "has", "have", "from", "that",
+    "this", "was", "will", "your", "not", "use", "our", "who", "his", "her", "she", "him", "their",
+    "they", "them", "its", "it's", "had", "been", "were", "which", "what", "how", "why", "when",
+    "where", "also", "more", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"
+])
+
+
+def _keyword_pattern(keyword):
+    words = keyword.split()
+    return re.compile(r"(?<!\w)" + r"\s+".join(re.escape(word) for word in words) + r"(?!\w)")
+
+
+class RoleKeywords:
+    """One role's lowercased keywords, in order, with a compiled pattern each"""
+
+    __slots__ = ('keywords', 'keyword_set', 'patterns')
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(kw.lower() for kw in keywords))
+        self.keyword_set = frozenset(self.keywords)
+        self.patterns = tuple(_keyword_pattern(kw) for kw in self.keywords)
+
+    def matched(self, text_lower, mode='indexed'):
+        """Keywords found in already lowercased text
+
+        ``compat`` mode keeps the original plain substring test.
+        """
+        if mode == 'compat':
+            return [kw for kw in self.keywords if kw in text_lower]
+        return [kw for kw, pattern in zip(self.keywords, self.patterns) if pattern.search(text_lower)]
+
+
+class RoleScorer:
+    """ATS score, skills and answer scores for every role, built once at startup"""
+
+    # Answers with this many words get the full length score
+    FULL_LENGTH_WORDS = 20
+
+    def __init__(self, matcher, polarity, polarity_batch=None, mode='indexed'):
+        self.matcher = matcher
+        self.mode = mode
+        self.polarity = polarity
+        self.polarity_batch = polarity_batch or (lambda texts: [polarity(text) for text in texts])
+        self.roles = {role: RoleKeywords(keywords) for role, keywords in matcher.role_keywords.items()}
+        self._empty = RoleKeywords([])
+
+    def role(self, role):
+        return self.roles.get(role, self._empty)
+
+    def keywords(self, role):
+        return self.role(role).keywords
+
+    def ats_score(self, resume_text, role):
+        """ATS compatibility score (0-100) with the compiled keyword matcher"""
+        return self.matcher.score(resume_text, role, mode=self.mode)
+
+    def extract_skills(self, resume_text, role, limit=5):
+        """The role's keywords, topped up with the resume's most frequent words"""
+        role_keywords = self.role(role)
+        combined = list(role_keywords.keywords[:limit])
+        if len(combined) >= limit:
+            # Resume words could only come after the role keywords
+            return combined
+
+        freq = Counter(w for w in WORD_RE.findall(resume_text.lower()) if len(w) > 2)
+        top_resume_skills = [
+            w for w, _ in freq.most_common() if w not in STOPWORDS and not w.isdigit()
+        ][:10]
+        combined += [w for w in top_resume_skills if w not in role_keywords.keyword_set]
+        return combined[:limit]
+
+    def _score(self, answer, role_keywords, polarity):
+        length_score = min(len(answer.split()) / self.FULL_LENGTH_WORDS, 1.0)
+        keywords = role_keywords.keywords
+        relevance_score = len(role_keywords.matched(answer.lower(), self.mode)) / len(keywords) if keywords else 0
+        clarity_score = (polarity + 1) / 2  # scale to 0-1
+        total = 0.4 * length_score + 0.4 * relevance_score + 0.2 * clarity_score
+        return total, length_score, relevance_score, clarity_score
+
+    def score_answer(self, answer, role):
+        """``(total, length_score, relevance_score, clarity_score)`` for one answer"""
+        return self._score(answer, self.role(role), self.polarity(answer))
+
+    def score_answers(self, answers, role):
+        """score_answer for a list of answers, with one batched sentiment call"""
+        role_keywords = self.role(role)
+        polarities = self.polarity_batch(answers)
+        return [self._score(answer, role_keywords, float(p)) for answer, p in zip(answers, polarities)]
@@ -0,0 +1,240 @@
+"""
+Query latency of the recruitment schema before and after the migrations.
+
+Builds the baseline schema (create_tables) in a scratch PostgreSQL schema,
+seeds it server-side with generate_series, times the hot queries, applies
+db_migrations.migrate() and times them again. Uses the DB_* settings of
+DatabaseManager; only the scratch schema is created and dropped.
+
+    python schema_benchmark.py --applications 1000000 --repeats 50
+"""
+import re
+import sys
+import time
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from database_config import DatabaseManager
+from db_migrations import migrate
+
+ROLES = ['Backend Developer', 'Frontend Developer', 'Data Scientist', 'DevOps Engineer',
+         'Full Stack Developer', 'Machine Learning Engineer', 'Mobile Developer', 'QA Engineer']
+STATUSES = ['pending', 'reviewed', 'interviewing', 'rejected', 'hired']
+MODEL_NAMES = ['naive_bayes', 'random_forest', 'gradient_boosting', 'logistic_regression']
+
+
+def seed(db_manager, applications, audit_rows, model_rows):
+    """Fill a fresh baseline schema with synthetic rows (ids start at 1)"""
+    candidates = max(1, applications // 2)
+    interviews = max(1, applications // 5)
+    params = {
+        'candidates': candidates, 'applications': applications, 'interviews': interviews,
+        'audit_rows': audit_rows, 'model_rows': model_rows,
+        'roles': ROLES, 'statuses': STATUSES, 'models': MODEL_NAMES,
+    }
+    steps = [
+        ('candidates', """
+            INSERT INTO candidates (candidate_name, email, location, years_experience, education_level, industry, created_at)
+            SELECT 'Candidate ' || g, 'candidate' || g || '@example.com', 'City ' || (g % 100), g % 20,
+                   'Bachelor', 'Technology', now() - (g % 365) * interval '1 day'
+            FROM generate_series(1, %(candidates)s) g
+        """),
+        ('resumes', """
+            INSERT INTO resumes (candidate_id, resume_text, file_size)
+            SELECT g, 'Synthetic resume ' || g, 1000 + g % 50000
+            FROM generate_series(1, %(candidates)s) g
+        """),
+        ('applications', """
+            INSERT INTO applications (candidate_id, resume_id, selected_role, predicted_role, ats_score,
+                                      application_status, applied_date)
+            SELECT 1 + g % %(candidates)s, 1 + g % %(candidates)s,
+                   (%(roles)s::text[])[1 + g % array_length(%(roles)s::text[], 1)],
+                   (%(roles)s::text[])[1 + (g / 7) % array_length(%(roles)s::text[], 1)],
+                   g % 101,
+                   (%(statuses)s::text[])[1 + (g / 3) % array_length(%(statuses)s::text[], 1)],
+                   now() - random() * interval '365 days'
+            FROM generate_series(1, %(applications)s) g
+        """),
+        ('interviews', """
+            INSERT INTO interviews (application_id, interview_date, interview_type, status)
+            SELECT 1 + (g - 1) * 5, now() - random() * interval '365 days', 'ai', 'completed'
+            FROM generate_series(1, %(interviews)s) g
+        """),
+        ('interview_questions', """
+            INSERT INTO interview_questions (interview_id, question_text, question_type, question_order)
+            SELECT i, 'Question ' || q, 'technical', q
+            FROM generate_series(1, %(interviews)s) i, generate_series(1, 5) q
+        """),
+        ('interview_answers', """
+            INSERT INTO interview_answers (question_id, answer_text, score, feedback, length_score, relevance_score)
+            SELECT id, 'Synthetic answer', round((random() * 10)::numeric, 2), 'ok',
+                   round(random()::numeric, 2), round(random()::numeric, 2)
+            FROM interview_questions
+        """),
+        ('decisions', """
+            INSERT INTO decisions (application_id, final_decision, final_score, confidence_level, decision_date)
+            SELECT g, CASE WHEN g % 3 = 0 THEN 'Selected' ELSE 'Rejected' END,
+                   round((random() * 100)::numeric, 2), 'High', now() - random() * interval '365 days'
+            FROM generate_series(1, %(applications)s, 2) g
+        """),
+        ('audit_log', """
+            INSERT INTO audit_log (action, table_name, record_id, user_id, timestamp)
+            SELECT 'update', 'applications', 1 + g % %(applications)s, 'system',
+                   now() - random() * interval '365 days'
+            FROM generate_series(1, %(audit_rows)s) g
+        """),
+        ('model_performance', """
+            INSERT INTO model_performance (model_name, model_version, accuracy_score, f1_score, training_date,
+                                           dataset_size, features_count)
+            SELECT (%(models)s::text[])[1 + g % array_length(%(models)s::text[], 1)], 'v' || (g / 100),
+                   round((0.7 + random() * 0.29)::numeric, 4), round((0.7 + random() * 0.29)::numeric, 4),
+                   now() - random() * interval '365 days', 1000, 1015
+            FROM generate_series(1, %(model_rows)s) g
+        """),
+    ]
+    for table, sql in steps:
+        start = time.perf_counter()
+        with db_manager.transaction() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.rowcount
+        print(f"   {table}: {rows} rows in {time.perf_counter() - start:.1f}s")
+    return params
+
+
+def hot_queries(params):
+    """(name, sql, params_factory) for the lookups the application makes"""
+    now = datetime.now()
+
+    def window(days):
+        end = now - timedelta(days=random.uniform(0, 300))
+        return end - timedelta(days=days), end
+
+    return [
+        ('applications by candidate',
+         "SELECT * FROM applications WHERE candidate_id = %s",
+         lambda: (random.randint(1, params['candidates']),)),
+        ('latest applications for role',
+         "SELECT id, candidate_id, ats_score FROM applications WHERE selected_role = %s "
+         "ORDER BY applied_date DESC LIMIT 50",
+         lambda: (random.choice(ROLES),)),
+        ('pending applications',
+         "SELECT id, candidate_id FROM applications WHERE application_status = %s "
+         "ORDER BY applied_date DESC LIMIT 50",
+         lambda: (random.choice(STATUSES),)),
+        ('answers for application',
+         "SELECT q.question_order, a.answer_text, a.score FROM interviews i "
+         "JOIN interview_questions q ON q.interview_id = i.id "
+         "JOIN interview_answers a ON a.question_id = q.id "
+         "WHERE i.application_id = %s ORDER BY q.question_order",
+         lambda: (1 + 5 * random.randint(0, params['interviews'] - 1),)),
+        ('decision for application',
+         "SELECT final_decision, final_score FROM decisions WHERE application_id = %s",
+         lambda: (1 + 2 * random.randint(0, params['applications'] // 2 - 1),)),
+        ('audit log, one day',
+         "SELECT count(*) FROM audit_log WHERE timestamp >= %s AND timestamp < %s",
+         lambda: window(1)),
+        ('model history, 30 days',
+         "SELECT * FROM model_performance WHERE model_name = %s AND training_date >= %s "
+         "AND training_date < %s ORDER BY training_date DESC LIMIT 100",
+         lambda: (random.choice(MODEL_NAMES),) + window(30)),
+    ]
+
+
+def time_queries(db_manager, queries, repeats):
+    """Median and p95 latency in milliseconds per query"""
+    results = {}
+    with db_manager.transaction() as cursor:
+        for name, sql, make_params in queries:
+            cursor.execute(sql, make_params())  # warm-up
+            cursor.fetchall()
+            samples = []
+            for _ in range(repeats):
+                query_params = make_params()
+                start = time.perf_counter()
+                cursor.execute(sql, query_params)
+                cursor.fetchall()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            results[name] = {
+                'p50_ms': round(samples[len(samples) // 2], 3),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            }
+    return results
+
+
+def analyze(db_manager):
+    with db_manager.transaction() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot queries before and after the schema migrations")
+    parser.add_argument('--applications', type=int, default=1_000_000)
+    parser.add_argument('--audit-rows', type=int, default=1_000_000)
+    parser.add_argument('--model-rows', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=50, help="Timed runs per query")
+    parser.add_argument('--schema', default='schema_benchmark', help="Scratch schema (dropped and recreated)")
+    parser.add_argument('--output', help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if not re.fullmatch(r'[a-z_][a-z0-9_]*', args.schema) or args.schema == 'public':
+        print(f"❌ Invalid scratch schema name: {args.schema}")
+        return 1
+
+    db_manager = DatabaseManager()
+    db_manager.db_config['options'] = f'-c search_path={args.schema}'
+    if not db_manager.connect_postgres():
+        return 1
+
+    try:
+        with db_manager.transaction() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {args.schema}")
+        if not db_manager.create_tables():
+            return 1
+
+        print(f"🔄 Seeding {args.applications} applications in schema '{args.schema}'...")
+        params = seed(db_manager, args.applications, args.audit_rows, args.model_rows)
+        analyze(db_manager)
+        queries = hot_queries(params)
+
+        print("⏱️  Timing baseline schema...")
+        before = time_queries(db_manager, queries, args.repeats)
+
+        print("🔄 Applying migrations...")
+        start = time.perf_counter()
+        migrate(db_manager)
+        migration_seconds = time.perf_counter() - start
+        print(f"   migrated in {migration_seconds:.1f}s")
+        analyze(db_manager)
+
+        print("⏱️  Timing migrated schema...")
+        after = time_queries(db_manager, queries, args.repeats)
+
+        print(f"\n{'query':<32}{'before p50':>12}{'after p50':>12}{'before p95':>12}{'after p95':>12}{'speedup':>10}")
+        for name, _, _ in queries:
+            b, a = before[name], after[name]
+            speedup = b['p50_ms'] / a['p50_ms'] if a['p50_ms'] else float('inf')
+            print(f"{name:<32}{b['p50_ms']:>10.2f}ms{a['p50_ms']:>10.2f}ms"
+                  f"{b['p95_ms']:>10.2f}ms{a['p95_ms']:>10.2f}ms{speedup:>9.1f}x")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({
+                    'applications': args.applications,
+                    'audit_rows': args.audit_rows,
+                    'model_rows': args.model_rows,
+                    'repeats': args.repeats,
+                    'migration_seconds': round(migration_seconds, 2),
+                    'before': before,
+                    'after': after,
+                }, f, indent=2)
+        return 0
+    finally:
+        db_manager.close_connections()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
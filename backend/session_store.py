@@ -0,0 +1,206 @@
+"""
+Session storage backends for interview sessions.
+
+Every backend reads and writes one session at a time and expires each key
+independently after its TTL, so request cost no longer grows with the number
+of stored sessions. Select the backend with SESSION_BACKEND=sqlite|redis.
+"""
+import os
+import json
+import random
+import sqlite3
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_TTL = 3600  # 1 hour
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db')
+
+
+class SessionStore(ABC):
+    """Interface shared by all session backends"""
+
+    def __init__(self, ttl=DEFAULT_SESSION_TTL):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, key):
+        """Return the session dict for ``key``, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key, data, ttl=None):
+        """Store ``data`` under ``key`` and reset its expiry"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove ``key`` if it exists"""
+
+    @abstractmethod
+    def update(self, key, updater, ttl=None):
+        """Atomically apply ``updater(session) -> session`` and store the result
+
+        Concurrent updates of the same key must not lose each other's
+        changes. ``updater`` may be called more than once, so it must only
+        depend on the session it is given. Returns the updated session, or
+        None if ``key`` does not exist.
+        """
+
+
+class SQLiteSessionStore(SessionStore):
+    """Embedded SQLite store in WAL mode, safe across gunicorn workers"""
+
+    # Expired rows are purged after this many writes
+    PURGE_EVERY = 100
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, ttl=DEFAULT_SESSION_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, conn, key, data, ttl):
+        conn.execute(
+            """
+            INSERT INTO sessions (key, data, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at
+            """,
+            (key, json.dumps(data, default=str), time.time() + (ttl or self.ttl))
+        )
+
+    def set(self, key, data, ttl=None):
+        conn = self._connection()
+        self._write(conn, key, data, ttl)
+        self._maybe_purge(conn)
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def update(self, key, updater, ttl=None):
+        conn = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent
+        # read-modify-write cycles from other workers cannot interleave
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            session = updater(json.loads(row[0]))
+            self._write(conn, key, session, ttl)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_purge(conn)
+        return session
+
+    def _maybe_purge(self, conn):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired(conn)
+
+    def purge_expired(self, conn=None):
+        """Delete expired sessions; returns the number of rows removed"""
+        conn = conn or self._connection()
+        return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class RedisSessionStore(SessionStore):
+    """Redis-backed store reusing DatabaseManager's cache helpers"""
+
+    def __init__(self, db_manager, ttl=DEFAULT_SESSION_TTL, prefix='session:'):
+        super().__init__(ttl)
+        self.db_manager = db_manager
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.db_manager.get_cached_data(self.prefix + key)
+
+    def set(self, key, data, ttl=None):
+        if not self.db_manager.cache_data(self.prefix + key, data, expire_time=int(ttl or self.ttl)):
+            raise RuntimeError(f"Failed to store session {key} in Redis")
+
+    def delete(self, key):
+        if self.db_manager.redis_client:
+            self.db_manager.redis_client.delete(self.prefix + key)
+
+    # Optimistic update attempts before giving up on a heavily contended key
+    MAX_UPDATE_ATTEMPTS = 50
+
+    def update(self, key, updater, ttl=None):
+        # Imported here so the default SQLite backend doesn't need redis installed
+        import redis
+
+        client = self.db_manager.redis_client
+        if client is None:
+            raise RuntimeError("Redis is not connected")
+        full_key = self.prefix + key
+        for attempt in range(self.MAX_UPDATE_ATTEMPTS):
+            with client.pipeline() as pipe:
+                try:
+                    # WATCH makes EXEC fail if another worker writes the key
+                    # between our read and our write; then we read again
+                    pipe.watch(full_key)
+                    raw = pipe.get(full_key)
+                    if raw is None:
+                        return None
+                    session = updater(json.loads(raw))
+                    pipe.multi()
+                    pipe.setex(full_key, int(ttl or self.ttl), json.dumps(session, default=str))
+                    pipe.execute()
+                    return session
+                except redis.WatchError:
+                    # Jittered backoff so contending workers don't retry in lockstep
+                    time.sleep(random.uniform(0, min(0.1, 0.002 * 2 ** attempt)))
+        raise RuntimeError(f"Session {key} changed on every update attempt")
+
+
+def create_session_store():
+    """Build the session store selected by SESSION_BACKEND (default: sqlite)"""
+    backend = os.getenv('SESSION_BACKEND', 'sqlite').lower()
+    ttl = int(os.getenv('SESSION_TTL', DEFAULT_SESSION_TTL))
+
+    if backend == 'redis':
+        try:
+            from database_config import DatabaseManager
+            db_manager = DatabaseManager()
+            if db_manager.connect_redis():
+                logger.info("✅ Using Redis session store")
+                return RedisSessionStore(db_manager, ttl=ttl)
+        except Exception as e:
+            logger.error(f"❌ Redis session store unavailable: {e}")
+        logger.warning("⚠️ Falling back to SQLite session store")
+
+    return SQLiteSessionStore(os.getenv('SESSION_DB_PATH', DEFAULT_SQLITE_PATH), ttl=ttl)
@@ -0,0 +1,162 @@
+"""
+Role and interview question templates, parsed once per file version.
+
+question_templates.json is read and compiled into an immutable snapshot: the
+role list, each template pre-split around its ``{skill}`` slots, and an ETag
+derived from the file contents. The file is re-stat'ed at most every
+``check_interval`` seconds and reloaded only when it changed, so /api/roles
+and question generation never touch the JSON on the request path.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+
+from model_registry import file_stamp
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Searched in order: backend/data (Railway deployment), then the training data
+DEFAULT_TEMPLATE_PATHS = [
+    os.path.join(BACKEND_DIR, 'data', 'question_templates.json'),
+    os.path.join(os.path.dirname(BACKEND_DIR), 'ai_interviewer_project', 'data', 'question_templates.json'),
+]
+
+SKILL_SLOT = "{skill}"
+
+
+class QuestionTemplate:
+    """A question template split around its ``{skill}`` slots"""
+
+    __slots__ = ('text', 'parts')
+
+    def __init__(self, text):
+        self.text = text
+        parts = text.split(SKILL_SLOT)
+        self.parts = tuple(parts) if len(parts) > 1 else None
+
+    @property
+    def has_skill(self):
+        return self.parts is not None
+
+    def render(self, skill):
+        """Fill every slot with ``skill`` (same result as str.replace)"""
+        return skill.join(self.parts) if self.parts else self.text
+
+
+class TemplateSnapshot:
+    """One parsed version of the templates file"""
+
+    __slots__ = ('roles', 'templates', 'skill_templates', 'static_templates', 'etag', 'path', 'stamp', 'loaded_at')
+
+    def __init__(self, raw, etag, path=None, stamp=None):
+        self.roles = tuple(raw.keys())
+        self.templates = {
+            role: tuple(QuestionTemplate(text) for text in texts)
+            for role, texts in raw.items()
+        }
+        self.skill_templates = {
+            role: tuple(t for t in templates if t.has_skill)
+            for role, templates in self.templates.items()
+        }
+        self.static_templates = {
+            role: tuple(t for t in templates if not t.has_skill)
+            for role, templates in self.templates.items()
+        }
+        self.etag = etag
+        self.path = path
+        self.stamp = stamp
+        self.loaded_at = time.time()
+
+
+EMPTY_SNAPSHOT = TemplateSnapshot({}, etag=hashlib.sha256(b'{}').hexdigest()[:16])
+
+
+class TemplateStore:
+    """Serve the current TemplateSnapshot, reloading when the file changes"""
+
+    def __init__(self, paths=None, check_interval=5.0):
+        self.paths = list(paths or DEFAULT_TEMPLATE_PATHS)
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._last_checked = 0.0
+        self._failed = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def resolve_path(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def snapshot(self):
+        """Return the current snapshot, re-checking the file if the interval passed"""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._last_checked < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._snapshot is not None and now - self._last_checked < self.check_interval:
+                return self._snapshot
+            self._snapshot = self._refresh(self._snapshot)
+            self._last_checked = time.monotonic()
+            return self._snapshot
+
+    def _refresh(self, current):
+        path = self.resolve_path()
+        if path is None:
+            if current is None:
+                logger.error("❌ question_templates.json not found")
+            return current or EMPTY_SNAPSHOT
+
+        stamp = None
+        try:
+            stamp = file_stamp(path)
+            if current is not None and current.path == path and current.stamp == stamp:
+                return current
+            if self._failed == (path, stamp):
+                # Already failed to parse this version; wait for the next write
+                return current or EMPTY_SNAPSHOT
+            with open(path, 'rb') as f:
+                content = f.read()
+            snapshot = TemplateSnapshot(
+                json.loads(content),
+                etag=hashlib.sha256(content).hexdigest()[:16],
+                path=path,
+                stamp=stamp
+            )
+        except Exception as e:
+            # Keep serving the last good version
+            self._failed = (path, stamp)
+            logger.error(f"❌ Error loading question templates from {path}: {e}")
+            return current or EMPTY_SNAPSHOT
+
+        if current is not None:
+            self.reloads += 1
+            logger.info(f"🔄 Reloaded question templates from {path}")
+        return snapshot
+
+    def roles(self):
+        return list(self.snapshot().roles)
+
+    def templates(self, role):
+        return self.snapshot().templates.get(role, ())
+
+    def etag(self):
+        return self.snapshot().etag
+
+    def stats(self):
+        snapshot = self.snapshot()
+        return {
+            'path': snapshot.path,
+            'roles': len(snapshot.roles),
+            'etag': snapshot.etag,
+            'reloads': self.reloads,
+        }
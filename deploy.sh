@@ -111,7 +111,7 @@ Type=simple
 User=$USER
 WorkingDirectory=/opt/ai-recruitment/backend
 Environment=PATH=/opt/ai-recruitment/backend/venv/bin
-ExecStart=/opt/ai-recruitment/backend/venv/bin/gunicorn --workers 4 --bind 0.0.0.0:5000 app:app
+ExecStart=/opt/ai-recruitment/backend/venv/bin/gunicorn --workers 4 --worker-class gthread --threads 8 --timeout 330 --bind 0.0.0.0:5000 app:app
 Restart=always
 RestartSec=10
 